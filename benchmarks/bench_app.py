@@ -0,0 +1,85 @@
+"""Time headless runs of the Streamlit app and one form edit in each edit mode.
+
+In live mode every edit reruns the whole page: all three form sections,
+the ComicPrompt construction and the reference sidebar. In batched mode
+(COMIC_PROMPT_EDIT_MODE=batched) an edit reruns only the fragment of the
+edited section. AppTest always runs whole scripts, so the batched cost is
+measured by running the edited section on its own, which is what the
+fragment rerun executes. The page's run counters (see
+`ui.story_form.count_run`) are saved in `extra_info`.
+"""
+from itertools import count
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+
+from comic_prompt_gen.ui.story_form import EDIT_MODE_ENV, RUN_COUNTS_KEY
+
+testing = pytest.importorskip("streamlit.testing.v1")
+
+PAGE_SCRIPT = "from comic_prompt_gen.app import main\nmain()\n"
+
+# What a batched edit of each section reruns, and the text input edited
+SECTIONS = {
+    "story": ("render_story_section(t)", lambda app: app.text_input[0]),
+    "panels": ("render_panel_section(t, get_layout())", lambda app: app.text_input(key="p1_text")),
+    "style": ("render_style_section(t, get_layout())", lambda app: app.text_input(key="line_color")),
+}
+SECTION_PRELUDE = (
+    "from comic_prompt_gen.core.layouts import get_layout\n"
+    "from comic_prompt_gen.ui.story_form import render_panel_section, render_story_section, render_style_section\n"
+    "from comic_prompt_gen.utils.translations import get_translator\n"
+    "t = get_translator('English')\n"
+)
+
+EDITS = 20
+
+
+def write_script(directory: Path, name: str, body: str) -> str:
+    path = directory / f"{name}.py"
+    path.write_text(body, encoding="utf-8")
+    return str(path)
+
+
+def time_edits(benchmark, script: str, select: Callable[[Any], Any]) -> Any:
+    """Edit one text input EDITS times, timing the rerun after each edit."""
+    app = testing.AppTest.from_file(script, default_timeout=60).run()
+    edits = count()
+
+    def edit() -> tuple:
+        select(app).set_value(f"edit {next(edits)}")
+        return (), {}
+
+    benchmark.pedantic(app.run, setup=edit, rounds=EDITS)
+    assert not app.exception, app.exception
+    return app
+
+
+@pytest.mark.benchmark(group="app")
+def test_first_run(benchmark, tmp_path: Path) -> None:
+    page = write_script(tmp_path, "page", PAGE_SCRIPT)
+    benchmark.pedantic(lambda: testing.AppTest.from_file(page, default_timeout=60).run(), rounds=3)
+
+
+@pytest.mark.benchmark(group="app")
+def test_rerun(benchmark, tmp_path: Path) -> None:
+    app = testing.AppTest.from_file(write_script(tmp_path, "page", PAGE_SCRIPT), default_timeout=60).run()
+    benchmark.pedantic(app.run, rounds=5)
+
+
+@pytest.mark.benchmark(group="edit")
+@pytest.mark.parametrize("mode", ["live", "batched"])
+def test_edit_full_page(benchmark, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mode: str) -> None:
+    """Edit a panel's text on the whole page (what AppTest runs in either mode)."""
+    monkeypatch.setenv(EDIT_MODE_ENV, mode)
+    app = time_edits(benchmark, write_script(tmp_path, "page", PAGE_SCRIPT), SECTIONS["panels"][1])
+    benchmark.extra_info["run_counts"] = dict(app.session_state[RUN_COUNTS_KEY])
+
+
+@pytest.mark.benchmark(group="edit")
+@pytest.mark.parametrize("section", list(SECTIONS))
+def test_edit_batched_fragment(benchmark, tmp_path: Path, section: str) -> None:
+    """Edit a section rerunning only that section, as its fragment does."""
+    call, select = SECTIONS[section]
+    time_edits(benchmark, write_script(tmp_path, section, SECTION_PRELUDE + call + "\n"), select)
@@ -0,0 +1,74 @@
+"""Time the archive backend against one JSON file per prompt.
+
+The disk usage per prompt of each backend is saved in `extra_info`.
+"""
+import random
+from itertools import count
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from comic_prompt_gen.core.models import ComicPrompt
+from comic_prompt_gen.core.prompt_generator import generate_prompt
+from comic_prompt_gen.storage.prompt_storage import create_storage
+from tests.factories import iter_prompts
+
+pytestmark = pytest.mark.benchmark(group="archive")
+
+BACKENDS = ["json", "archive"]
+PROMPTS = 1000
+
+
+def disk_usage(path: Path) -> int:
+    """Total size of the files below a directory."""
+    return sum(entry.stat().st_size for entry in path.rglob("*") if entry.is_file())
+
+
+def rendered_prompts(count: int) -> List[ComicPrompt]:
+    prompts = list(iter_prompts(count))
+    for prompt in prompts:
+        prompt.generated_prompt = generate_prompt(prompt)
+    return prompts
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_save(benchmark, backend: str, tmp_path: Path) -> None:
+    prompts = rendered_prompts(PROMPTS)
+    rounds = count()
+
+    def setup() -> tuple:
+        storage = create_storage(backend, str(tmp_path / f"{backend}-{next(rounds)}"))
+        return (storage, [prompt.model_copy() for prompt in prompts]), {}
+
+    def save(storage, copies: List[ComicPrompt]) -> None:
+        for prompt in copies:
+            storage.save_prompt(prompt)
+
+    benchmark.pedantic(save, setup=setup, rounds=3)
+    benchmark.extra_info["bytes_per_prompt"] = round(disk_usage(tmp_path / f"{backend}-0") / PROMPTS)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_random_load(benchmark, backend: str, tmp_path: Path) -> None:
+    storage = create_storage(backend, str(tmp_path / backend))
+    ids = [storage.save_prompt(prompt) for prompt in rendered_prompts(PROMPTS)]
+    random.Random(0).shuffle(ids)
+
+    benchmark(lambda: [storage.load_prompt(prompt_id) for prompt_id in ids])
+
+
+def test_compact(benchmark, tmp_path: Path) -> None:
+    """Compact an archive in which every prompt was saved twice."""
+    prompts = rendered_prompts(PROMPTS)
+    for n, prompt in enumerate(prompts):
+        prompt.id = f"prompt-{n}"
+    rounds = count()
+
+    def setup() -> tuple:
+        storage = create_storage("archive", str(tmp_path / f"compact-{next(rounds)}"))
+        for prompt in prompts * 2:
+            storage.save_prompt(prompt.model_copy())
+        return (storage.archive,), {}
+
+    benchmark.pedantic(lambda archive: archive.compact(), setup=setup, rounds=3)
@@ -0,0 +1,65 @@
+"""Time serial prompt loads against AsyncPromptStorage.aload_many.
+
+The page cache is warm after saving, so without read latency loads are CPU
+bound and this measures the overhead of the thread pool. The latency cases
+add a sleep to every load to stand in for a cold disk or a network
+filesystem, which is where overlapping reads pays off.
+"""
+import asyncio
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import pytest
+
+from comic_prompt_gen.core.models import ComicPrompt
+from comic_prompt_gen.storage.async_storage import AsyncPromptStorage
+from comic_prompt_gen.storage.prompt_storage import create_storage
+from tests.factories import iter_prompts
+
+pytestmark = pytest.mark.benchmark(group="async_load")
+
+PROMPTS = 500
+
+# Simulated latency per load (ms)
+LATENCIES = [0.0, 0.5]
+
+
+class SlowStorage:
+    """Storage wrapper adding a fixed delay to every load."""
+
+    def __init__(self, storage, latency: float):
+        self.storage = storage
+        self.latency = latency
+
+    def load_prompt(self, prompt_id: str, trusted: bool = False) -> Optional[ComicPrompt]:
+        time.sleep(self.latency)
+        return self.storage.load_prompt(prompt_id, trusted)
+
+
+@pytest.fixture(scope="module", params=["json", "sqlite", "archive"])
+def saved(request: pytest.FixtureRequest, tmp_path_factory: pytest.TempPathFactory) -> tuple:
+    storage = create_storage(request.param, str(tmp_path_factory.mktemp("async") / "prompts"))
+    ids = [storage.save_prompt(prompt) for prompt in iter_prompts(PROMPTS)]
+    return storage, ids
+
+
+@pytest.mark.parametrize("latency", LATENCIES)
+def test_serial_load(benchmark, saved: tuple, latency: float) -> None:
+    storage, ids = saved
+    storage = SlowStorage(storage, latency / 1000)
+    benchmark(lambda: [storage.load_prompt(prompt_id, trusted=True) for prompt_id in ids])
+
+
+@pytest.mark.parametrize("workers", [1, 4, 8, 32])
+@pytest.mark.parametrize("latency", LATENCIES)
+def test_aload_many(benchmark, saved: tuple, latency: float, workers: int) -> None:
+    storage, ids = saved
+    async_storage = AsyncPromptStorage(SlowStorage(storage, latency / 1000), max_workers=workers)
+    loop = asyncio.new_event_loop()
+    try:
+        prompts: List = benchmark(lambda: loop.run_until_complete(async_storage.aload_many(ids)))
+    finally:
+        async_storage.close()
+        loop.close()
+    assert all(prompt is not None for prompt in prompts)
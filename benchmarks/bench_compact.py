@@ -0,0 +1,30 @@
+"""Time compact prompts and record their token savings per layout and budget.
+
+Token counts are the `estimate_tokens` estimates used by the budget; they
+are saved in each case's `extra_info`. The compact form also renders the
+full prompt for its report, so compare it with `generate_prompt` in the
+generate_prompt group.
+"""
+from typing import Optional
+
+import pytest
+
+from comic_prompt_gen.core.compact import render_compact
+from comic_prompt_gen.core.layouts import LAYOUTS
+from tests.factories import make_prompt
+
+pytestmark = pytest.mark.benchmark(group="render_compact")
+
+
+@pytest.mark.parametrize("budget", [None, 600, 400, 300])
+@pytest.mark.parametrize("lang", ["en", "zh"])
+@pytest.mark.parametrize("layout", list(LAYOUTS))
+def test_render_compact(benchmark, layout: str, lang: str, budget: Optional[int]) -> None:
+    prompt = make_prompt(1, lang, layout)
+    result = benchmark(render_compact, prompt, budget)
+    benchmark.extra_info.update(
+        full_tokens=result.full_tokens,
+        tokens=result.tokens,
+        trimmed=len(result.trimmed),
+        over_budget=result.over_budget,
+    )
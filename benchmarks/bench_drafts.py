@@ -0,0 +1,81 @@
+"""Time draft autosave with many sessions typing into the form at once.
+
+Each keystroke is one `DraftWriter.update` with the single field that
+changed; the writer coalesces them and writes each draft at most once per
+interval. The round's `extra_info` records the journal writes and bytes
+written against what saving the whole `ComicPrompt` as JSON on every edit
+would write.
+"""
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from comic_prompt_gen.storage.drafts import DraftStore, DraftWriter, new_draft_id
+from tests.factories import make_prompt
+
+pytestmark = pytest.mark.benchmark(group="drafts")
+
+SESSIONS = 100
+EDITS = 20
+INTERVAL = 0.5
+
+# Keystrokes per second of one typing user
+TYPING_RATE = 8.0
+
+
+def type_into(writer: DraftWriter, draft_id: str, spent: List[float]) -> None:
+    """Type EDITS characters into one field, one update per keystroke."""
+    text = ""
+    total = 0.0
+    for i in range(EDITS):
+        text += "abcdefghij"[i % 10]
+        start = time.perf_counter()
+        writer.update(draft_id, {"p1_desc": text})
+        total += time.perf_counter() - start
+        time.sleep(1 / TYPING_RATE)
+    spent.append(total)
+
+
+def test_typing_sessions(benchmark, tmp_path: Path) -> None:
+    store = DraftStore(str(tmp_path))
+    writer = DraftWriter(store, INTERVAL)
+    draft_ids = [new_draft_id() for _ in range(SESSIONS)]
+    spent: List[float] = []
+
+    def run() -> None:
+        threads = [threading.Thread(target=type_into, args=(writer, d, spent)) for d in draft_ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        writer.close()
+
+    benchmark.pedantic(run, rounds=1)
+
+    # What a full dump per edit would write: the prompt as the storage saves it
+    prompt = make_prompt()
+    full_bytes = 0
+    for _ in range(EDITS):
+        prompt.panels["1"].desc += "x"
+        full_bytes += len(prompt.model_dump_json().encode("utf-8"))
+    edits = SESSIONS * EDITS
+    benchmark.extra_info.update(
+        update_us_per_edit=round(sum(spent) / edits * 1e6, 1),
+        journal_writes=writer.writes,
+        bytes_written=sum(path.stat().st_size for path in tmp_path.iterdir()),
+        full_dump_bytes=full_bytes * SESSIONS,
+    )
+
+
+def test_restore(benchmark, tmp_path: Path) -> None:
+    store = DraftStore(str(tmp_path))
+    draft_id = new_draft_id()
+    text = ""
+    for i in range(EDITS * 4):
+        text += "abcdefghij"[i % 10]
+        store.append(draft_id, {"p1_desc": text})
+
+    benchmark(lambda: DraftStore(str(tmp_path)).load(draft_id))
@@ -0,0 +1,27 @@
+"""Time the compiled-template generate_prompt against the original f-string version."""
+from typing import Callable, List
+
+import pytest
+
+from comic_prompt_gen.core.models import ComicPrompt
+from comic_prompt_gen.core.prompt_generator import generate_prompt
+from tests.baselines import legacy_generate_prompt
+from tests.factories import make_prompt
+
+pytestmark = pytest.mark.benchmark(group="generate_prompt")
+
+IMPLEMENTATIONS = {"legacy f-string": legacy_generate_prompt, "compiled template": generate_prompt}
+
+
+def render_all(func: Callable[[ComicPrompt], str], prompts: List[ComicPrompt]) -> None:
+    for prompt in prompts:
+        func(prompt)
+
+
+@pytest.mark.parametrize("lang", ["en", "zh"])
+@pytest.mark.parametrize("implementation", list(IMPLEMENTATIONS))
+def test_generate_prompt(benchmark, implementation: str, lang: str) -> None:
+    """Render 64 different prompts per round."""
+    prompts = [make_prompt(n, lang) for n in range(64)]
+    benchmark.extra_info["prompts_per_round"] = len(prompts)
+    benchmark(render_all, IMPLEMENTATIONS[implementation], prompts)
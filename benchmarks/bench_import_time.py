@@ -0,0 +1,64 @@
+"""Time the import of the non-UI modules and check them against a budget.
+
+Each round imports the module in a fresh interpreter with
+`python -X importtime`; the timed figure includes interpreter startup, the
+`import_ms` in `extra_info` is the fastest import itself. A headless module
+whose import takes longer than `--import-budget-ms` fails. The app is
+measured too, for comparison.
+"""
+import os
+import subprocess
+import sys
+from typing import List, Set, Tuple
+
+import pytest
+
+from tests.factories import SRC_DIR
+from tests.test_imports import HEADLESS_MODULES
+
+pytestmark = pytest.mark.benchmark(group="import_time")
+
+APP_MODULE = "comic_prompt_gen.app"
+
+
+def import_time(module: str) -> Tuple[float, Set[str]]:
+    """Import `module` in a fresh interpreter.
+
+    Returns:
+        (milliseconds spent importing the package and everything it pulled
+        in, names of the top-level packages imported)
+    """
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us = 0
+    packages = set()
+    started = False
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        packages.add(name.strip().split(".")[0])
+        # Only top-level entries from our own import on; earlier ones are
+        # interpreter startup (site, encodings, ...)
+        if name.startswith("  "):
+            continue
+        started = started or name.strip().startswith("comic_prompt_gen")
+        if started:
+            total_us += int(cumulative)
+    return total_us / 1000, packages
+
+
+@pytest.mark.parametrize("module", [*HEADLESS_MODULES, APP_MODULE])
+def test_import_time(benchmark, request: pytest.FixtureRequest, module: str) -> None:
+    runs: List[float] = []
+    benchmark.pedantic(lambda: runs.append(import_time(module)[0]), rounds=5)
+    benchmark.extra_info["import_ms"] = round(min(runs), 1)
+    if module != APP_MODULE:
+        budget = request.config.getoption("import_budget_ms")
+        assert min(runs) <= budget, f"{module} takes {min(runs):.0f} ms to import (budget {budget:.0f} ms)"
@@ -0,0 +1,29 @@
+"""Time incremental section re-rendering against a full render per edit.
+
+Each round renders a sequence of prompts that differ from the previous one
+in a single field (panel text, a style field or the scene), the way the
+Streamlit editing loop does between two clicks of the generate button.
+"""
+import pytest
+
+from comic_prompt_gen.core.layouts import LAYOUTS
+from comic_prompt_gen.core.prompt_generator import IncrementalRenderer, generate_prompt
+from tests.factories import edit_sequence
+
+pytestmark = pytest.mark.benchmark(group="incremental")
+
+EDITS = 300
+
+
+@pytest.mark.parametrize("layout", list(LAYOUTS))
+def test_full_render(benchmark, layout: str) -> None:
+    edits = edit_sequence(EDITS, layout)
+    benchmark(lambda: [generate_prompt(prompt) for prompt in edits])
+
+
+@pytest.mark.parametrize("layout", list(LAYOUTS))
+def test_incremental_render(benchmark, layout: str) -> None:
+    edits = edit_sequence(EDITS, layout)
+    renderer = IncrementalRenderer()
+    benchmark(lambda: [renderer.render(prompt) for prompt in edits])
+    benchmark.extra_info["share_of_sections_rendered"] = round(renderer.rendered / (renderer.rendered + renderer.reused), 3)
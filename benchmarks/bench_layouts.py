@@ -0,0 +1,19 @@
+"""Time generate_prompt across the registered layouts.
+
+Templates are compiled once per layout, so a render costs a fixed amount
+for the header and style profile plus a constant amount per panel.
+"""
+import pytest
+
+from comic_prompt_gen.core.layouts import LAYOUTS
+from comic_prompt_gen.core.prompt_generator import generate_prompt
+from tests.factories import make_prompt
+
+pytestmark = pytest.mark.benchmark(group="layouts")
+
+
+@pytest.mark.parametrize("layout", list(LAYOUTS))
+def test_generate_prompt_layout(benchmark, layout: str) -> None:
+    prompt = make_prompt(1, "zh", layout)
+    benchmark.extra_info["panels"] = LAYOUTS[layout].panel_count
+    benchmark.extra_info["chars"] = len(benchmark(generate_prompt, prompt))
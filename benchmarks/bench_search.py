@@ -0,0 +1,77 @@
+"""Time full-text search over a large number of saved prompts.
+
+The index holds `--search-prompts` prompts (20000 by default); building,
+persisting and loading it are timed once, queries repeatedly.
+"""
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+from comic_prompt_gen.core.models import ComicPrompt
+from comic_prompt_gen.storage.prompt_index import extract_metadata
+from comic_prompt_gen.storage.search_index import SearchIndex
+from tests.factories import iter_prompts
+
+pytestmark = pytest.mark.benchmark(group="search")
+
+QUERIES = [
+    "12345",  # one prompt (variant number)
+    "tabby laptop",  # every English prompt
+    "主人 注意",  # every Chinese prompt
+    "猫",  # single CJK character, matched against bigrams
+    "mimi 99998",  # rare term combined with a common one
+]
+
+Indexed = List[Tuple[ComicPrompt, dict]]
+
+
+@pytest.fixture(scope="module")
+def prompts(request: pytest.FixtureRequest) -> Indexed:
+    prompts = []
+    for n, prompt in enumerate(iter_prompts(request.config.getoption("search_prompts"))):
+        prompt.id = f"prompt-{n}"
+        prompts.append((prompt, extract_metadata(prompt.model_dump())))
+    return prompts
+
+
+@pytest.fixture(scope="module")
+def index(prompts: Indexed, tmp_path_factory: pytest.TempPathFactory) -> SearchIndex:
+    index = SearchIndex(tmp_path_factory.mktemp("search") / "search.idx")
+    for prompt, meta in prompts:
+        index.add(prompt, meta)
+    return index
+
+
+def build(prompts: Indexed) -> SearchIndex:
+    index = SearchIndex(None)
+    for prompt, meta in prompts:
+        index.add(prompt, meta)
+    return index
+
+
+def test_build(benchmark, prompts: Indexed) -> None:
+    index = benchmark.pedantic(build, args=(prompts,), rounds=1)
+    postings = sum(values.buffer_info()[1] * values.itemsize for columns in index._postings.values() for values in columns)
+    benchmark.extra_info.update(prompts=len(prompts), terms=len(index._postings), postings_bytes=postings)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_search(benchmark, index: SearchIndex, query: str) -> None:
+    benchmark(index.search, query, limit=25)
+    benchmark.extra_info["matches"] = len(index.search(query))
+
+
+def test_persist(benchmark, index: SearchIndex) -> None:
+    def persist() -> None:
+        index._dirty = True
+        index._persist()
+
+    benchmark.pedantic(persist, rounds=1)
+    benchmark.extra_info["file_bytes"] = index.path.stat().st_size
+
+
+def test_load(benchmark, index: SearchIndex) -> None:
+    index._dirty = True
+    index._persist()
+    benchmark.pedantic(SearchIndex, args=(Path(index.path),), rounds=1)
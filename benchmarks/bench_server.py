@@ -0,0 +1,129 @@
+"""Time the HTTP API with and without keep-alive connections.
+
+Starts `python -m comic_prompt_gen.server` in a subprocess with a temporary
+storage directory and drives POST /generate and GET /prompts/{id} from
+asyncio clients. A round is REQUESTS requests spread over CONNECTIONS
+concurrent clients; the latency percentiles of the last round are saved in
+`extra_info`.
+"""
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Iterator, List, Tuple
+
+import pytest
+
+from tests.factories import SRC_DIR, make_prompt
+
+pytestmark = pytest.mark.benchmark(group="server")
+
+REQUESTS = 1000
+CONNECTIONS = 16
+
+SPEC = json.dumps(make_prompt(1).model_dump(mode="json")).encode("utf-8")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def http_request(method: str, path: str, body: bytes = b"", keep_alive: bool = True) -> bytes:
+    connection = "keep-alive" if keep_alive else "close"
+    head = f"{method} {path} HTTP/1.1\r\nHost: bench\r\nConnection: {connection}\r\nContent-Length: {len(body)}\r\n\r\n"
+    return head.encode("latin-1") + body
+
+
+async def read_response(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    length = next(int(line.split(":")[1]) for line in lines if line.lower().startswith("content-length"))
+    return int(lines[0].split(" ")[1]), await reader.readexactly(length)
+
+
+async def client(port: int, request: bytes, count: int, keep_alive: bool, latencies: List[float]) -> None:
+    """Send requests one after another, on one connection or a new one each."""
+    reader = writer = None
+    for _ in range(count):
+        start = time.perf_counter()
+        if writer is None:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(request)
+        status, _ = await read_response(reader)
+        assert status < 300, status
+        if not keep_alive:
+            writer.close()
+            await writer.wait_closed()
+            writer = None
+        latencies.append(time.perf_counter() - start)
+    if writer is not None:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def wait_for_server(port: int) -> None:
+    for _ in range(100):
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            await asyncio.sleep(0.1)
+            continue
+        writer.close()
+        return
+    raise RuntimeError("server did not start")
+
+
+async def save_prompt(port: int, spec: bytes) -> str:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(http_request("POST", "/prompts", spec))
+    _, saved = await read_response(reader)
+    writer.close()
+    return json.loads(saved)["id"]
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory: pytest.TempPathFactory) -> Iterator[Tuple[int, str]]:
+    """The port of a running server and the ID of a prompt saved in it."""
+    port = free_port()
+    storage = tmp_path_factory.mktemp("server") / "prompts"
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR), COMIC_PROMPT_STORAGE_PATH=str(storage))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "comic_prompt_gen.server", "--port", str(port)],
+        env=env,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        asyncio.run(wait_for_server(port))
+        yield port, asyncio.run(save_prompt(port, SPEC))
+    finally:
+        process.terminate()
+        process.wait()
+
+
+@pytest.mark.parametrize("keep_alive", [True, False], ids=["keep-alive", "new-connection"])
+@pytest.mark.parametrize("route", ["POST /generate", "GET /prompts/{id}"])
+def test_requests(benchmark, server: Tuple[int, str], route: str, keep_alive: bool) -> None:
+    port, prompt_id = server
+    if route == "POST /generate":
+        request = http_request("POST", "/generate", SPEC, keep_alive)
+    else:
+        request = http_request("GET", f"/prompts/{prompt_id}", b"", keep_alive)
+    latencies: List[float] = []
+
+    async def run() -> None:
+        latencies.clear()
+        per_client = REQUESTS // CONNECTIONS
+        await asyncio.gather(*(client(port, request, per_client, keep_alive, latencies) for _ in range(CONNECTIONS)))
+
+    benchmark.pedantic(lambda: asyncio.run(run()), rounds=3, warmup_rounds=1)
+    latencies.sort()
+    benchmark.extra_info.update(
+        requests_per_round=len(latencies),
+        p50_ms=round(latencies[len(latencies) // 2] * 1e3, 3),
+        p99_ms=round(latencies[int(len(latencies) * 0.99)] * 1e3, 3),
+    )
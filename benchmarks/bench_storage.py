@@ -0,0 +1,81 @@
+"""Time JSON backend saves, loads and listing pages at several store sizes.
+
+Stores are filled once per size (`--store-sizes`) and shared by the cases.
+"""
+import random
+from itertools import count, islice
+from pathlib import Path
+
+import pytest
+
+from comic_prompt_gen.storage.prompt_storage import PromptStorage
+from tests.factories import iter_prompts, make_prompt
+
+pytestmark = pytest.mark.benchmark(group="storage")
+
+# Prompts per batch when filling a store
+FILL_BATCH = 1000
+
+SAVES, LOADS, LISTS = 100, 200, 100
+
+
+@pytest.fixture(scope="module")
+def store(store_size: int, tmp_path_factory: pytest.TempPathFactory) -> PromptStorage:
+    storage = PromptStorage(str(tmp_path_factory.mktemp(f"store-{store_size}")))
+    prompts = iter_prompts(store_size)
+    while storage.save_many(islice(prompts, FILL_BATCH)):
+        pass
+    return storage
+
+
+def test_save_prompt(benchmark, store: PromptStorage) -> None:
+    # Fresh prompts for every round
+    numbers = count()
+
+    def setup() -> tuple:
+        return ([make_prompt(n, "zh" if n % 2 else "en") for n in islice(numbers, SAVES)],), {}
+
+    def save(prompts: list) -> None:
+        for prompt in prompts:
+            store.save_prompt(prompt)
+
+    benchmark.extra_info["ops_per_round"] = SAVES
+    benchmark.pedantic(save, setup=setup, rounds=5, warmup_rounds=1)
+
+
+def test_load_prompt(benchmark, store: PromptStorage, store_size: int) -> None:
+    ids = [meta["id"] for meta in store.list_prompts()]
+    rng = random.Random(store_size)
+
+    def load() -> None:
+        for prompt_id in rng.sample(ids, LOADS):
+            store.load_prompt(prompt_id)
+
+    benchmark.extra_info["ops_per_round"] = LOADS
+    benchmark(load)
+
+
+def test_list_prompts_page(benchmark, store: PromptStorage) -> None:
+    """One page of the saved prompts view, as the UI requests it."""
+    def list_pages() -> None:
+        for _ in range(LISTS):
+            store.list_prompts(offset=0, limit=20)
+
+    benchmark.extra_info["ops_per_round"] = LISTS
+    benchmark(list_pages)
+
+
+def test_count_prompts(benchmark, store: PromptStorage) -> None:
+    benchmark(store.count_prompts, approved=False, query="cat")
+
+
+def test_first_listing_of_reopened_store(benchmark, store: PromptStorage) -> None:
+    """A new process listing the store: load the persisted index, then check the directory."""
+    from comic_prompt_gen.storage.prompt_index import PromptIndex
+
+    def reopen() -> None:
+        index = PromptIndex(Path(store.storage_dir))
+        index.refresh()
+        index.page(0, 20)
+
+    benchmark.pedantic(reopen, rounds=3)
@@ -0,0 +1,38 @@
+"""Time translator lookups against the original nested dict fallback chain."""
+from typing import Callable, List
+
+import pytest
+
+from comic_prompt_gen.utils.translations import en_translations, get_translator, translations
+from tests.baselines import legacy_get_translator
+
+pytestmark = pytest.mark.benchmark(group="translations")
+
+FACTORIES = {"legacy dict chain": legacy_get_translator, "merged tables": get_translator}
+
+
+def rerun(factory: Callable[[str], Callable[[str], str]], keys: List[str]) -> None:
+    """Create the translator of every language and look up 300 keys, like a rerun does."""
+    for lang in translations:
+        t = factory(lang)
+        for key in keys:
+            t(key)
+
+
+@pytest.mark.parametrize("implementation", list(FACTORIES))
+def test_translator_lookups(benchmark, implementation: str) -> None:
+    keys = (list(en_translations) * 2)[:300]
+    benchmark.extra_info["lookups_per_round"] = len(keys) * len(translations)
+    benchmark(rerun, FACTORIES[implementation], keys)
+
+
+@pytest.mark.parametrize("lang", list(translations))
+def test_every_key(benchmark, lang: str) -> None:
+    keys = list(en_translations)
+
+    def run() -> None:
+        t = get_translator(lang)
+        for key in keys:
+            t(key)
+
+    benchmark(run)
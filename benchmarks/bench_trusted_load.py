@@ -0,0 +1,59 @@
+"""Time validated vs trusted prompt loading and the listing record types.
+
+The allocations of one round (peak bytes and blocks still alive) are
+measured once under tracemalloc and saved in each case's `extra_info`.
+"""
+import json
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+from comic_prompt_gen.core.models import PromptRecord
+from comic_prompt_gen.storage.base import prompt_from_data, prompt_from_json
+from comic_prompt_gen.storage.prompt_storage import PromptStorage
+from tests.factories import iter_prompts
+
+pytestmark = pytest.mark.benchmark(group="trusted_load")
+
+PROMPTS = 500
+
+
+def allocations(func: Callable[[], Any], count: int) -> Dict[str, float]:
+    """Run `func` under tracemalloc and return its allocations per item."""
+    tracemalloc.start()
+    result = func()
+    snapshot = tracemalloc.take_snapshot()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+    del result
+    return {"peak_bytes_per_item": round(peak / count), "live_blocks_per_item": round(blocks / count, 1)}
+
+
+@pytest.fixture(scope="module")
+def saved(tmp_path_factory: pytest.TempPathFactory) -> tuple:
+    storage = PromptStorage(str(tmp_path_factory.mktemp("trusted")))
+    ids = [storage.save_prompt(prompt) for prompt in iter_prompts(PROMPTS)]
+    return storage, ids
+
+
+def _cases(storage: PromptStorage, ids: List[str]) -> Dict[str, Callable[[], Any]]:
+    raw = [(storage.storage_dir / f"{prompt_id}.json").read_bytes() for prompt_id in ids]
+    metadata = storage.list_prompts()
+    return {
+        "validated load": lambda: [storage.load_prompt(prompt_id) for prompt_id in ids],
+        "trusted load": lambda: [storage.load_prompt(prompt_id, trusted=True) for prompt_id in ids],
+        # Parsing and validation alone, without file I/O
+        "loads+validate": lambda: [prompt_from_data(json.loads(data)) for data in raw],
+        "validate_json": lambda: [prompt_from_json(data, trusted=True) for data in raw],
+        "listing dicts": lambda: [dict(meta) for meta in metadata],
+        "listing records": lambda: [PromptRecord.from_metadata(meta) for meta in metadata],
+    }
+
+
+@pytest.mark.parametrize("case", ["validated load", "trusted load", "loads+validate", "validate_json", "listing dicts", "listing records"])
+def test_load(benchmark, saved: tuple, case: str) -> None:
+    func = _cases(*saved)[case]
+    benchmark.extra_info.update(allocations(func, PROMPTS), items_per_round=PROMPTS)
+    benchmark(func)
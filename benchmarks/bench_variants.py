@@ -0,0 +1,41 @@
+"""Time PromptSweep against building and rendering each variant separately."""
+from itertools import islice
+
+import pytest
+
+from comic_prompt_gen.core.prompt_generator import generate_prompt
+from comic_prompt_gen.core.variants import PromptSweep
+from tests.factories import make_prompt
+
+pytestmark = pytest.mark.benchmark(group="variants")
+
+AXES = {
+    "style.style_name": [f"Style {i}" for i in range(20)],
+    "style.palette_style": ["Flat Colors", "Cell Shading", "Watercolor", "Black and White"],
+    "style.overall_tone": [f"tone {i}" for i in range(10)],
+    "panels.1.comp": ["Close-up", "Medium shot", "Long shot", "POV (Point of View)", "Bird's-eye view"],
+    "panels.4.comp": ["Close-up", "Medium shot", "Long shot", "POV (Point of View)", "Bird's-eye view"],
+    "reader_feeling": ["amused", "touched", "surprised", "nostalgic"],
+}
+
+# Variants rendered per round
+VARIANTS = 1000
+
+
+@pytest.fixture(scope="module")
+def sweep() -> PromptSweep:
+    return PromptSweep(make_prompt(1, "zh"), AXES)
+
+
+def test_copy_and_generate(benchmark, sweep: PromptSweep) -> None:
+    """Baseline: a full ComicPrompt per variant, rendered from scratch."""
+    values = [variant.values for variant in islice(sweep.sample(len(sweep), seed=0), VARIANTS)]
+    benchmark(lambda: [generate_prompt(sweep.prompt_for(v)) for v in values])
+
+
+def test_sweep_product(benchmark, sweep: PromptSweep) -> None:
+    benchmark(lambda: list(islice(sweep, VARIANTS)))
+
+
+def test_sweep_sample(benchmark, sweep: PromptSweep) -> None:
+    benchmark(lambda: list(sweep.sample(VARIANTS, seed=1)))
@@ -0,0 +1,74 @@
+"""Time JSON backend saves under each fsync policy.
+
+Each policy is measured three ways: one save at a time (per-save latency),
+several threads saving at once (what group commit is for) and one
+`save_many` burst. Use `--bench-dir` to run on the disk you care about;
+fsync is almost free on tmpfs.
+"""
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List
+
+import pytest
+
+from comic_prompt_gen.core.models import ComicPrompt
+from comic_prompt_gen.storage.durability import FSYNC_POLICIES
+from comic_prompt_gen.storage.prompt_storage import PromptStorage
+from tests.factories import iter_prompts
+
+pytestmark = pytest.mark.benchmark(group="write_policies")
+
+# Prompts saved per round, and threads saving at once in the concurrent runs
+PROMPTS = 200
+THREADS = 8
+
+
+def run_sequential(storage: PromptStorage, prompts: List[ComicPrompt]) -> None:
+    for prompt in prompts:
+        storage.save_prompt(prompt)
+
+
+def run_threads(storage: PromptStorage, prompts: List[ComicPrompt]) -> None:
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        list(pool.map(storage.save_prompt, prompts))
+
+
+def run_burst(storage: PromptStorage, prompts: List[ComicPrompt]) -> None:
+    storage.save_many(prompts)
+
+
+MODES: Dict[str, Callable[[PromptStorage, List[ComicPrompt]], None]] = {
+    "sequential": run_sequential,
+    f"{THREADS} threads": run_threads,
+    "save_many": run_burst,
+}
+
+
+@pytest.fixture
+def bench_dir(request: pytest.FixtureRequest, tmp_path: Path) -> Iterator[Path]:
+    directory = request.config.getoption("bench_dir")
+    if directory is None:
+        yield tmp_path
+        return
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        yield Path(tmp)
+
+
+@pytest.mark.parametrize("mode", list(MODES))
+@pytest.mark.parametrize("policy", FSYNC_POLICIES)
+def test_save(benchmark, bench_dir: Path, policy: str, mode: str) -> None:
+    rounds = count()
+    storages: List[PromptStorage] = []
+
+    def setup() -> tuple:
+        storage = PromptStorage(str(bench_dir / f"{policy}-{next(rounds)}"), fsync=policy)
+        storages.append(storage)
+        return (storage, list(iter_prompts(PROMPTS))), {}
+
+    benchmark.extra_info["saves_per_round"] = PROMPTS
+    benchmark.pedantic(MODES[mode], setup=setup, rounds=3)
+    group = storages[-1]._group_commit
+    if group is not None:
+        benchmark.extra_info.update(writes=group.writes, flushes=group.batches)
@@ -0,0 +1,29 @@
+"""Options and fixtures of the timing suite (run with `pytest benchmarks`).
+
+Every case uses pytest-benchmark's `benchmark` fixture, so the usual
+`--benchmark-autosave`, `--benchmark-compare` and `--benchmark-compare-fail`
+options save results and catch regressions between commits. Correctness of
+the code paths timed here is checked by the tests in `tests/`.
+"""
+from typing import List
+
+import pytest
+
+from tests.conftest import isolated_paths  # noqa: F401  (autouse)
+
+
+def _sizes(value: str) -> List[int]:
+    return [int(size) for size in value.split(",") if size]
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("comic_prompt_gen", "comic prompt generator benchmarks")
+    group.addoption("--store-sizes", type=_sizes, default=[1000, 10000], help="Comma-separated store sizes for the storage cases (default: 1000,10000)")
+    group.addoption("--search-prompts", type=int, default=20_000, help="Prompts in the search index (default: 20000)")
+    group.addoption("--bench-dir", default=None, help="Directory the write policy cases write in (default: the pytest temp dir); fsync is almost free on tmpfs")
+    group.addoption("--import-budget-ms", type=float, default=300.0, help="Import time budget per headless module (default: 300)")
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
+    if "store_size" in metafunc.fixturenames:
+        metafunc.parametrize("store_size", metafunc.config.getoption("store_sizes"), scope="module")
@@ -1,15 +1,27 @@
 """Main Streamlit application for Comic Prompt Generator."""
 import streamlit as st
 
+from .ui.drafts import autosave_draft, restore_draft
 from .ui.header import render_header, render_sidebar
-from .ui.story_form import render_story_section, render_panel_section, render_style_section
+from .ui.story_form import render_story_section, render_layout_select, render_panel_section, render_style_section
+from .ui.story_form import batched_section_values, count_run, edit_mode, render_sections_batched
 from .ui.prompt_display import display_prompt, render_saved_prompts, save_prompt
 from .ui.reference_sidebar import render_reference_sidebar
 from .core.models import ComicPrompt
-from .core.prompt_generator import generate_prompt
+from .core.prompt_generator import IncrementalRenderer
+from .core.render_cache import get_render_cache
+from .utils.reference_images import prepare_reference_thumbnails
+from .utils.reporting import set_error_reporter
 from .utils.translations import get_translator, translations # Import translator
 
 
+def get_session_renderer() -> IncrementalRenderer:
+    """Get this session's incremental prompt renderer (creates it if needed)."""
+    if "prompt_renderer" not in st.session_state:
+        st.session_state.prompt_renderer = IncrementalRenderer()
+    return st.session_state.prompt_renderer
+
+
 def create_new_prompt(t):
     """Create a new comic prompt.
     
@@ -20,34 +32,54 @@ def create_new_prompt(t):
     col1, col2 = st.columns([2, 1])  # Main input area and reference sidebar
 
     with col1:
-        # Render story, panel, and style sections using the translator
-        story_data = render_story_section(t)
-        panels = render_panel_section(t)
-        style = render_style_section(t)
-        
-        # Create a comic prompt object
-        comic_prompt = ComicPrompt(
-            **story_data,
-            panels=panels,
-            style=style
-        )
+        if edit_mode() == "batched":
+            # Edits rerun only their own section; the prompt object is
+            # built from the sections' latest values when generating
+            render_sections_batched(t)
+            comic_prompt = None
+        else:
+            # Render story, panel, and style sections using the translator
+            story_data = render_story_section(t)
+            layout = render_layout_select(t)
+            panels = render_panel_section(t, layout)
+            style = render_style_section(t, layout)
+            
+            # Create a comic prompt object
+            comic_prompt = ComicPrompt(
+                **story_data,
+                panels=panels,
+                style=style
+            )
         
         # Generate button
         if st.button(t("prompt_generating"), type="primary"):
-            with st.spinner(t("prompt_generating")):
-                # Generate the prompt text
-                prompt_text = generate_prompt(comic_prompt)
+            if comic_prompt is None:
+                values = batched_section_values()
+                if values is None:
+                    # A section fragment has not run in this session yet
+                    st.warning(t("prompt_form_incomplete"))
+                else:
+                    story_data, panels, style = values
+                    comic_prompt = ComicPrompt(**story_data, panels=panels, style=style)
+            if comic_prompt is not None:
+                with st.spinner(t("prompt_generating")):
+                    # Generate the prompt text (reused if identical content was
+                    # rendered before; otherwise only the edited sections re-render)
+                    prompt_text = get_render_cache().render(comic_prompt, get_session_renderer().render)
                 
-                # Store the generated prompt in the object
-                comic_prompt.generated_prompt = prompt_text
+                    # Store the generated prompt in the object
+                    comic_prompt.generated_prompt = prompt_text
                 
-                # Display the prompt and get approval status
-                is_approved = display_prompt(t, prompt_text)
+                    # Display the prompt and get approval status
+                    is_approved = display_prompt(t, prompt_text)
                 
-                # If approved, save it
-                if is_approved:
-                    comic_prompt.is_approved = True
-                    save_prompt(t, comic_prompt)
+                    # If approved, save it
+                    if is_approved:
+                        comic_prompt.is_approved = True
+                        save_prompt(t, comic_prompt)
+
+        # Queue the edits of this run for the session's draft
+        autosave_draft()
 
     # Reference sidebar
     with col2:
@@ -63,10 +95,18 @@ def main():
     
     # Initialize language state if not present
     from .utils.translations import initialize_language
+    # Bring back the form of the draft in the URL (its language included)
+    restore_draft()
     initialize_language()
+    count_run("script")
     initial_lang = st.session_state.language
     initial_t = get_translator(initial_lang)
     st.set_page_config(page_title=initial_t("page_title"), layout="wide")
+    # Show errors the storage layer recovers from on the page
+    set_error_reporter(st.error)
+    # Build the reference thumbnails on the first run; later reruns find
+    # them in memory
+    prepare_reference_thumbnails()
     
     # Now render sidebar to get the potentially updated language and page
     page_key, lang = render_sidebar() # Returns page key and language
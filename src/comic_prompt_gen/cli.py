@@ -0,0 +1,349 @@
+"""Headless command line interface for bulk prompt generation.
+
+Usage:
+    python -m comic_prompt_gen.cli generate specs.jsonl -o prompts.jsonl --workers 4
+    python -m comic_prompt_gen.cli generate specs.csv > prompts.jsonl
+    python -m comic_prompt_gen.cli sweep base.json --axis "style.style_name=Gag Manga|Chibi / Cute" \
+        --axis "panels.1.comp=Close-up|Long shot" --sample 100 --seed 7
+
+With `--compact` (or `--token-budget N`), prompts are rendered in the
+compact form of `core.compact`: empty optional fields are left out and,
+given a budget, the least important lines are trimmed to fit it. Each output
+line then also holds a "compact" report of the character and token savings.
+
+Input specs are ComicPrompt objects, one per JSONL line or CSV row. CSV
+columns use dotted names for nested fields, e.g. `panels.1.desc` or
+`style.style_name`. Every spec produces one JSON line on the output, in input
+order, holding either the generated prompt or the validation error.
+
+`sweep` renders variants of one base spec along axes of variation (the same
+dotted field names, each with `|`-separated values), streaming the full
+Cartesian product or a seeded random sample as JSON lines.
+"""
+import argparse
+import csv
+import json
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+from pathlib import Path
+from typing import Any, ContextManager, Deque, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from pydantic import ValidationError
+
+from .core.compact import render_compact
+from .core.models import ComicPrompt
+from .core.render_cache import get_render_cache, render_prompt
+from .core.variants import PromptSweep
+
+# (1-based record number, raw JSON line or CSV row)
+SpecRecord = Tuple[int, Any]
+
+
+def detect_format(path: str, explicit: Optional[str] = None) -> str:
+    """Work out the input format from an explicit choice or the file extension.
+
+    Args:
+        path: The input path ("-" for stdin)
+        explicit: Format given on the command line, if any
+
+    Returns:
+        "jsonl" or "csv"
+    """
+    if explicit:
+        return explicit
+    return "csv" if Path(path).suffix.lower() == ".csv" else "jsonl"
+
+
+def iter_spec_records(stream: TextIO, fmt: str) -> Iterator[SpecRecord]:
+    """Lazily read raw spec records from an input stream.
+
+    JSONL lines are passed on unparsed so that parsing happens in the workers;
+    blank lines are skipped but still counted.
+
+    Args:
+        stream: The input text stream
+        fmt: "jsonl" or "csv"
+
+    Yields:
+        (record number, raw record) tuples
+    """
+    if fmt == "csv":
+        for number, row in enumerate(csv.DictReader(stream), start=1):
+            yield number, row
+        return
+
+    for number, line in enumerate(stream, start=1):
+        if line.strip():
+            yield number, line
+
+
+def unflatten_row(row: Dict[str, str]) -> Dict[str, Any]:
+    """Turn a CSV row with dotted column names into nested spec data.
+
+    Args:
+        row: The CSV row, e.g. {"panels.1.desc": "...", "style.style_name": "..."}
+
+    Returns:
+        The nested dictionary, e.g. {"panels": {"1": {"desc": "..."}}, ...}
+
+    Raises:
+        ValueError: If a column names a field another column nests under,
+            e.g. both "panels" and "panels.1.desc"
+    """
+    data: Dict[str, Any] = {}
+    for column, value in row.items():
+        if column is None or value is None:
+            continue
+        target = data
+        *parents, leaf = column.strip().split(".")
+        for depth, part in enumerate(parents, start=1):
+            target = target.setdefault(part, {})
+            if not isinstance(target, dict):
+                raise ValueError(f"Column {column!r} conflicts with column {'.'.join(parents[:depth])!r}")
+        if isinstance(target.get(leaf), dict):
+            raise ValueError(f"Column {column!r} conflicts with the columns under it")
+        target[leaf] = value
+    return data
+
+
+def render_record(
+    record: SpecRecord,
+    fmt: str,
+    full: bool = False,
+    compact: bool = False,
+    token_budget: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Validate and render a single spec record.
+
+    Args:
+        record: (record number, raw JSON line or CSV row)
+        fmt: "jsonl" or "csv"
+        full: Include the whole validated spec in the result
+        compact: Render the compact prompt and report its savings
+        token_budget: Token budget of the compact prompt (None: untrimmed)
+
+    Returns:
+        The output record, with either "generated_prompt" or "error"
+    """
+    number, raw = record
+    try:
+        data = unflatten_row(raw) if fmt == "csv" else json.loads(raw)
+        comic_prompt = ComicPrompt.model_validate(data)
+    except (ValueError, ValidationError) as e:
+        return {"record": number, "error": str(e)}
+
+    report = None
+    if compact:
+        compacted = render_compact(comic_prompt, token_budget)
+        comic_prompt.generated_prompt = compacted.text
+        report = compacted.report()
+    else:
+        # Identical specs within a worker are rendered once
+        comic_prompt.generated_prompt = render_prompt(comic_prompt)
+    if full:
+        result = comic_prompt.model_dump(mode="json")
+        result["record"] = number
+    else:
+        result = {
+            "record": number,
+            "id": comic_prompt.id,
+            "core_concept": comic_prompt.core_concept,
+            "generated_prompt": comic_prompt.generated_prompt,
+        }
+    if report is not None:
+        result["compact"] = report
+    return result
+
+
+def _render_chunk(
+    chunk: List[SpecRecord], fmt: str, full: bool, compact: bool, token_budget: Optional[int],
+) -> List[Dict[str, Any]]:
+    """Render a chunk of records in a worker process."""
+    return [render_record(record, fmt, full, compact, token_budget) for record in chunk]
+
+
+def render_records(
+    records: Iterable[SpecRecord],
+    fmt: str,
+    workers: int = 1,
+    chunk_size: int = 256,
+    full: bool = False,
+    compact: bool = False,
+    token_budget: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Render a stream of spec records, in order.
+
+    With several workers, records are sent to a process pool in chunks. At
+    most `2 * workers` chunks are in flight at a time, so memory use stays
+    bounded no matter how long the input is.
+
+    Args:
+        records: The raw spec records
+        fmt: "jsonl" or "csv"
+        workers: Number of worker processes (1 renders in this process)
+        chunk_size: Records sent to a worker per task
+        full: Include the whole validated spec in each result
+        compact: Render compact prompts (see `render_record`)
+        token_budget: Token budget of each compact prompt
+
+    Yields:
+        Output records in input order
+    """
+    if workers <= 1:
+        for record in records:
+            yield render_record(record, fmt, full, compact, token_budget)
+        return
+
+    records = iter(records)
+    max_pending = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Future] = deque()
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if chunk:
+                pending.append(pool.submit(_render_chunk, chunk, fmt, full, compact, token_budget))
+            if not pending:
+                break
+            if not chunk or len(pending) >= max_pending:
+                yield from pending.popleft().result()
+
+
+def _open_input(path: str) -> ContextManager[TextIO]:
+    if path == "-":
+        sys.stdin.reconfigure(encoding="utf-8", newline="")
+        return nullcontext(sys.stdin)
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def _open_output(path: str) -> ContextManager[TextIO]:
+    if path == "-":
+        sys.stdout.reconfigure(encoding="utf-8")
+        return nullcontext(sys.stdout)
+    return open(path, "w", encoding="utf-8")
+
+
+def run_generate(args: argparse.Namespace) -> int:
+    """Run the `generate` command."""
+    fmt = detect_format(args.input, args.input_format)
+    compact = args.compact or args.token_budget is not None
+    rendered = errors = 0
+    tokens = full_tokens = trimmed = over_budget = 0
+
+    with _open_input(args.input) as source, _open_output(args.output) as sink:
+        records = iter_spec_records(source, fmt)
+        for result in render_records(records, fmt, args.workers, args.chunk_size, args.full, compact, args.token_budget):
+            sink.write(json.dumps(result, ensure_ascii=False))
+            sink.write("\n")
+            if "error" in result:
+                errors += 1
+                continue
+            rendered += 1
+            if compact:
+                report = result["compact"]
+                tokens += report["tokens"]
+                full_tokens += report["full_tokens"]
+                trimmed += bool(report["trimmed"])
+                over_budget += report["over_budget"]
+
+    print(f"rendered {rendered} prompts ({errors} invalid specs)", file=sys.stderr)
+    if compact and full_tokens:
+        print(
+            f"compact: {tokens} of {full_tokens} estimated tokens ({1 - tokens / full_tokens:.1%} saved);"
+            f" {trimmed} prompts trimmed to the budget, {over_budget} still over it",
+            file=sys.stderr,
+        )
+    # Compact prompts do not go through the render cache
+    if args.workers <= 1 and not compact:
+        stats = get_render_cache().stats()
+        print(f"render cache: {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions", file=sys.stderr)
+    return 1 if errors else 0
+
+
+def parse_axes(axis_args: List[str], axes_file: Optional[str]) -> Dict[str, List[str]]:
+    """Collect sweep axes from `--axes` (a JSON object) and `--axis PATH=V1|V2` options.
+
+    Args:
+        axis_args: The `--axis` option values
+        axes_file: Path of a JSON file mapping field paths to value lists
+
+    Returns:
+        Field path -> values, in the order given
+    """
+    axes: Dict[str, List[str]] = {}
+    if axes_file:
+        with open(axes_file, "r", encoding="utf-8") as f:
+            axes.update(json.load(f))
+    for arg in axis_args:
+        path, sep, values = arg.partition("=")
+        if not sep:
+            raise ValueError(f"Axis must look like PATH=VALUE|VALUE: {arg}")
+        axes[path.strip()] = values.split("|")
+    return axes
+
+
+def run_sweep(args: argparse.Namespace) -> int:
+    """Run the `sweep` command."""
+    try:
+        with _open_input(args.base) as source:
+            base = ComicPrompt.model_validate_json(source.read())
+        sweep = PromptSweep(base, parse_axes(args.axis, args.axes))
+    except (OSError, ValueError, ValidationError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    variants = sweep if args.sample is None else sweep.sample(args.sample, args.seed)
+    written = 0
+    with _open_output(args.output) as sink:
+        for variant in variants:
+            result = {
+                "variant": variant.index,
+                "values": dict(zip(sweep.fields, variant.values)),
+                "generated_prompt": variant.prompt,
+            }
+            sink.write(json.dumps(result, ensure_ascii=False))
+            sink.write("\n")
+            written += 1
+
+    print(f"rendered {written} of {len(sweep)} variants", file=sys.stderr)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(prog="comic_prompt_gen.cli", description="Headless comic prompt generation.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate = subparsers.add_parser("generate", help="Render prompts from JSONL/CSV ComicPrompt specs")
+    generate.add_argument("input", help="Input file of specs, or - for stdin")
+    generate.add_argument("-o", "--output", default="-", help="Output JSONL file (default: stdout)")
+    generate.add_argument("--input-format", choices=["jsonl", "csv"], help="Input format (default: from extension)")
+    generate.add_argument("--workers", type=int, default=1, help="Worker processes (default: 1)")
+    generate.add_argument("--chunk-size", type=int, default=256, help="Specs per worker task")
+    generate.add_argument("--full", action="store_true", help="Write the whole validated spec with each prompt")
+    generate.add_argument("--compact", action="store_true", help="Render compact prompts, leaving out empty optional fields")
+    generate.add_argument("--token-budget", type=int, help="Trim compact prompts to this many (estimated) tokens; implies --compact")
+    generate.set_defaults(handler=run_generate)
+
+    sweep = subparsers.add_parser("sweep", help="Render variants of one spec along axes of variation")
+    sweep.add_argument("base", help="Base ComicPrompt spec (JSON file), or - for stdin")
+    sweep.add_argument("--axis", action="append", default=[], help="Axis as PATH=VALUE|VALUE, e.g. style.palette_style=Flat Colors|Watercolor")
+    sweep.add_argument("--axes", help="JSON file mapping field paths to lists of values")
+    sweep.add_argument("-o", "--output", default="-", help="Output JSONL file (default: stdout)")
+    sweep.add_argument("--sample", type=int, help="Render this many random variants instead of all of them")
+    sweep.add_argument("--seed", type=int, help="Random seed for --sample")
+    sweep.set_defaults(handler=run_sweep)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""Compact prompt rendering for token-billed image models.
+
+The full prompt (see `core.prompt_generator`) always writes every field,
+with bilingual labels, a reference note and the style profile as a JSON
+block. A compact prompt says the same things in fewer tokens:
+
+- empty optional fields are left out, and so are headings left with no
+  lines under them (e.g. the reference images when no reference is given);
+- labels are written once, in Chinese, without the English gloss and the
+  markdown emphasis;
+- the style profile is a few `label: value` lines instead of JSON.
+
+Given a token budget, lines are then trimmed in `TRIM_ORDER` until the
+prompt fits. The core instruction, the scene, every panel's description,
+composition and text, and the style name are never trimmed; if they alone
+exceed the budget the prompt is returned over budget.
+
+Usage:
+    result = render_compact(comic_prompt, token_budget=300)
+    result.text       # the compact prompt
+    result.report()   # character / token counts and what was trimmed
+"""
+import math
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .layouts import get_layout
+from .models import ComicPrompt
+from .prompt_generator import generate_prompt
+
+# Groups of optional lines, in the order they are trimmed to fit a token
+# budget (first = least important). Within a group, later panels go first.
+TRIM_ORDER = (
+    "references",      # ref_* fields
+    "panel_ref",       # panels.N.ref
+    "panel_transition",
+    "panel_sfx",
+    "style_detail",    # panel layout and text rendering hints
+    "story",           # narrative arc and reader feeling
+    "title",
+    "style",           # character, line art and color lines
+    "panel_purpose",
+)
+_TRIM_RANK = {group: rank for rank, group in enumerate(TRIM_ORDER)}
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens of a prompt.
+
+    A CJK character counts as one token and any other text as one token per
+    four characters, which is close to what BPE tokenizers give for mixed
+    Chinese and English prompts. CJK characters (and kana, hangul and
+    full-width punctuation) are the ones taking three bytes in UTF-8, so
+    they are counted from the encoded length instead of character by
+    character. Pass a real tokenizer's counter as `count_tokens` to
+    `render_compact` where exact counts matter.
+    """
+    wide = (len(text.encode("utf-8")) - len(text)) // 2
+    return wide + math.ceil((len(text) - wide) / 4)
+
+
+class _Line(NamedTuple):
+    text: str
+    # Trim group (see TRIM_ORDER), or None for lines that are always kept
+    group: Optional[str]
+    # Field path the line shows, e.g. "panels.2.sfx", reported when trimmed
+    path: str
+    # Headings the line sits under, outermost first
+    headings: Tuple[str, ...]
+
+
+class CompactPrompt(NamedTuple):
+    """A compact prompt and how it compares to the full one."""
+
+    text: str
+    tokens: int
+    full_tokens: int
+    full_chars: int
+    # Field paths of the lines trimmed to fit the budget, in trim order
+    trimmed: Tuple[str, ...]
+    token_budget: Optional[int]
+
+    @property
+    def over_budget(self) -> bool:
+        """True if even the lines that are never trimmed exceed the budget."""
+        return self.token_budget is not None and self.tokens > self.token_budget
+
+    def report(self) -> Dict[str, Any]:
+        """Return the character and token savings over the full prompt.
+
+        Returns:
+            A JSON-serializable dictionary of counts, the trimmed field paths
+            and whether the prompt is over budget
+        """
+        return {
+            "chars": len(self.text),
+            "full_chars": self.full_chars,
+            "tokens": self.tokens,
+            "full_tokens": self.full_tokens,
+            "saved_tokens": self.full_tokens - self.tokens,
+            "saved_ratio": round(1 - self.tokens / self.full_tokens, 3) if self.full_tokens else 0.0,
+            "token_budget": self.token_budget,
+            "over_budget": self.over_budget,
+            "trimmed": list(self.trimmed),
+        }
+
+
+def _join(*parts: str) -> str:
+    """Join the non-empty parts with "，"."""
+    return "，".join(part for part in parts if part)
+
+
+def _panel_text(text: Optional[str], placement: str) -> str:
+    """The quoted panel text and its placement, or "" when the panel has no text."""
+    if not text:
+        return ""
+    return f'"{text}"（{placement}）' if placement and placement != "No text" else f'"{text}"'
+
+
+def _compact_lines(comic_prompt: ComicPrompt) -> List[_Line]:
+    """Split a prompt into its compact lines, empty optional fields left out."""
+    layout = get_layout(comic_prompt.style.grid_style)
+    lines: List[_Line] = []
+
+    def add(headings: Tuple[str, ...], group: Optional[str], path: str, label: str, value: Optional[str]) -> None:
+        if value:
+            lines.append(_Line(f"- {label}：{value}", group, path, headings))
+
+    p = comic_prompt
+    lines.append(_Line(
+        f"## 生成一张{layout.grid_zh}布局的{layout.panel_count_zh}格漫画，主题：{p.core_concept}",
+        None, "core_concept", (),
+    ))
+
+    story = ("【故事】",)
+    add(story, "story", "narrative_arc", "叙事弧线", p.narrative_arc)
+    add(story, "story", "reader_feeling", "读者感受", p.reader_feeling)
+
+    scene = ("【画面】",)
+    add(scene, None, "overall_scene", "场景", p.overall_scene)
+    add(scene, "title", "comic_title", "标题", f'图片上方展示文字"{p.comic_title}"' if p.comic_title else "")
+    add(scene, None, "content_summary", "内容",
+        f"{layout.panel_count_zh}个画格展示{p.content_summary_char}正在经历{p.content_summary_action}")
+
+    references = ("【参考】",)
+    add(references, "references", "ref_overall_style", "风格", p.ref_overall_style)
+    add(references, "references", "ref_character", "角色", p.ref_character)
+    add(references, "references", "ref_environment", "环境", p.ref_environment)
+    add(references, "references", "ref_pose", "姿势", p.ref_pose)
+    add(references, "references", "ref_other", "其他", p.ref_other)
+
+    for key, location in zip(layout.panel_keys, layout.locations_zh):
+        panel = p.panels[key]
+        headings = ("【画格】", f"{key}. {location}")
+        path = f"panels.{key}."
+        add(headings, "panel_purpose", path + "purpose", "作用", panel.purpose)
+        add(headings, None, path + "desc", "画面", panel.desc)
+        add(headings, None, path + "comp", "构图", panel.comp)
+        add(headings, None, path + "text", "文字", _panel_text(panel.text, panel.placement))
+        add(headings, "panel_sfx", path + "sfx", "音效", panel.sfx)
+        add(headings, "panel_ref", path + "ref", "参考", panel.ref)
+        add(headings, "panel_transition", path + "transition", "过渡", panel.transition)
+
+    s = p.style
+    style = ("【风格】",)
+    add(style, None, "style.style_name", "风格", s.style_name)
+    add(style, "style", "style.character", "角色", _join(s.char_style, s.char_recurring, s.char_expressions))
+    add(style, "style", "style.line_art", "线条", _join(s.line_weight, s.line_style, s.line_color))
+    add(style, "style", "style.color_theme", "色彩", _join(s.palette_style, s.background, s.overall_tone))
+    add(style, "style_detail", "style.panel_layout", "画格", _join(
+        s.grid_style, f"间隔{s.gutter_color} {s.gutter_width}", f"边框{s.border_style} {s.border_color}",
+    ))
+    add(style, "style_detail", "style.text_rendering", "文字", _join(s.font_hint, s.bubble_style))
+    return lines
+
+
+def _assemble(lines: List[_Line], kept: List[bool]) -> str:
+    """Join the kept lines, writing each heading before its first kept line."""
+    out: List[str] = []
+    open_headings: Tuple[str, ...] = ()
+    for line, keep in zip(lines, kept):
+        if not keep:
+            continue
+        headings = line.headings
+        if headings != open_headings:
+            depth = 0
+            while depth < len(open_headings) and depth < len(headings) and open_headings[depth] == headings[depth]:
+                depth += 1
+            out.extend(headings[depth:])
+            open_headings = headings
+        out.append(line.text)
+    return "\n".join(out) + "\n"
+
+
+def render_compact(
+    comic_prompt: ComicPrompt,
+    token_budget: Optional[int] = None,
+    count_tokens: Callable[[str], int] = estimate_tokens,
+) -> CompactPrompt:
+    """Render a compact prompt, trimmed to fit a token budget.
+
+    Args:
+        comic_prompt: The prompt to render
+        token_budget: Most tokens the prompt may take; None keeps every
+            non-empty field
+        count_tokens: Token counter, e.g. the length of a tokenizer's
+            encoding; defaults to `estimate_tokens`
+
+    Returns:
+        The compact prompt with its token counts and the trimmed fields
+    """
+    lines = _compact_lines(comic_prompt)
+    kept = [True] * len(lines)
+    text = _assemble(lines, kept)
+    tokens = count_tokens(text)
+
+    trimmed: List[str] = []
+    if token_budget is not None and tokens > token_budget:
+        order = sorted(
+            (i for i, line in enumerate(lines) if line.group is not None),
+            key=lambda i: (_TRIM_RANK[lines[i].group], -i),
+        )
+        # Drop lines by their own token counts until the estimate fits,
+        # then recount the assembled text (headings go with their last line)
+        estimate = tokens
+        position = 0
+        while position < len(order) and tokens > token_budget:
+            while position < len(order) and estimate > token_budget:
+                i = order[position]
+                kept[i] = False
+                trimmed.append(lines[i].path)
+                estimate -= count_tokens(lines[i].text + "\n")
+                position += 1
+            text = _assemble(lines, kept)
+            tokens = estimate = count_tokens(text)
+
+    full_text = generate_prompt(comic_prompt)
+    return CompactPrompt(text, tokens, count_tokens(full_text), len(full_text), tuple(trimmed), token_budget)
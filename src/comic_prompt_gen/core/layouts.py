@@ -0,0 +1,143 @@
+"""Registry of comic page layouts (panel count and arrangement)."""
+from typing import Container, Dict, List, Optional, Tuple
+
+# Chinese numerals used for panel counts in the prompt ("四格漫画")
+_ZH_NUMBERS = "零一二三四五六七八九十"
+
+# Position names by number of rows / columns: (English, Chinese)
+_ROW_NAMES = {
+    1: [("", "")],
+    2: [("Top", "上"), ("Bottom", "下")],
+    3: [("Top", "上"), ("Middle", "中"), ("Bottom", "下")],
+    4: [("Top", "上"), ("Upper-Middle", "中上"), ("Lower-Middle", "中下"), ("Bottom", "下")],
+}
+_COLUMN_NAMES = {
+    1: [("", "")],
+    2: [("Left", "左"), ("Right", "右")],
+    3: [("Left", "左"), ("Center", "中"), ("Right", "右")],
+}
+
+
+def _axis_names(names: Dict[int, List[Tuple[str, str]]], count: int, en: str, zh: str) -> List[Tuple[str, str]]:
+    """Position names along one axis, numbered when there is no short name."""
+    return names.get(count) or [(f"{en} {i}", f"第{i}{zh}") for i in range(1, count + 1)]
+
+
+def _zh_number(n: int) -> str:
+    return _ZH_NUMBERS[n] if n < len(_ZH_NUMBERS) else str(n)
+
+
+class Layout:
+    """A page layout: how many panels there are and where each one sits.
+
+    Panels are numbered from 1 in reading order (left to right, top to
+    bottom). Everything that depends only on the layout, such as the
+    position label of each panel in every language, is computed once when
+    the layout is created.
+    """
+
+    __slots__ = (
+        "key", "rows", "cols", "grid_style", "grid_zh", "names",
+        "panel_keys", "panel_count_zh", "locations", "locations_zh", "subheaders", "columns",
+    )
+
+    def __init__(self, key: str, rows: int, cols: int, grid_style: str, grid_zh: str, names: Dict[str, str]):
+        """Create a layout.
+
+        Args:
+            key: Short identifier, e.g. "2x2"
+            rows: Number of panel rows
+            cols: Number of panel columns
+            grid_style: The StyleProfile.grid_style value selecting this layout
+            grid_zh: How the grid is described in the (Chinese) prompt text,
+                e.g. "2x2网格"
+            names: Display name of the layout per UI language
+        """
+        self.key = key
+        self.rows = rows
+        self.cols = cols
+        self.grid_style = grid_style
+        self.grid_zh = grid_zh
+        self.names = names
+        self.panel_keys: Tuple[str, ...] = tuple(str(i) for i in range(1, rows * cols + 1))
+        self.panel_count_zh = _zh_number(rows * cols)
+
+        positions = [
+            (row_en, row_zh, col_en, col_zh)
+            for row_en, row_zh in _axis_names(_ROW_NAMES, rows, "Row", "行")
+            for col_en, col_zh in _axis_names(_COLUMN_NAMES, cols, "Column", "列")
+        ]
+        english = ["-".join(part for part in (row_en, col_en) if part) for row_en, _, col_en, _ in positions]
+        chinese = [col_zh + row_zh for _, row_zh, _, col_zh in positions]
+        # Panel position labels as written into the prompt, e.g. "左上格 (Panel 1: Top-Left)"
+        self.locations: Tuple[str, ...] = tuple(
+            f"{zh}格 (Panel {i}: {en})" for i, (en, zh) in enumerate(zip(english, chinese), start=1)
+        )
+        # The same labels without the English part, e.g. "左上格" (compact prompts)
+        self.locations_zh: Tuple[str, ...] = tuple(f"{zh}格" for zh in chinese)
+        # Panel headings shown in the UI, per language
+        self.subheaders: Dict[str, Tuple[str, ...]] = {
+            "English": tuple(f"Panel {i}: {en}" for i, en in enumerate(english, start=1)),
+            "中文": tuple(f"第{i}格: {zh}" for i, zh in enumerate(chinese, start=1)),
+        }
+        # UI column (0-based) each panel is shown in
+        self.columns: Tuple[int, ...] = tuple(i % cols for i in range(rows * cols))
+
+    @property
+    def panel_count(self) -> int:
+        """Number of panels in the layout."""
+        return len(self.panel_keys)
+
+    def name(self, lang: str) -> str:
+        """Display name of the layout in a UI language (English if missing)."""
+        return self.names.get(lang) or self.names["English"]
+
+    def subheader(self, lang: str, index: int) -> str:
+        """UI heading of the panel at 0-based `index` (English if the language is missing)."""
+        return self.subheaders.get(lang, self.subheaders["English"])[index]
+
+    def missing_panels(self, panel_keys: Container[str]) -> List[str]:
+        """Return the panel numbers this layout needs that are not in `panel_keys`."""
+        return [key for key in self.panel_keys if key not in panel_keys]
+
+
+DEFAULT_LAYOUT = "2x2"
+
+# Registered layouts by key, in the order they are offered in the UI
+LAYOUTS: Dict[str, Layout] = {}
+
+# Lowercased grid_style values and keys -> layout
+_by_grid_style: Dict[str, Layout] = {}
+
+
+def register_layout(layout: Layout) -> Layout:
+    """Add a layout to the registry, selectable by its key or grid_style."""
+    LAYOUTS[layout.key] = layout
+    _by_grid_style[layout.key.lower()] = layout
+    _by_grid_style[layout.grid_style.lower()] = layout
+    return layout
+
+
+def get_layout(grid_style: Optional[str] = None) -> Layout:
+    """Find the layout selected by a StyleProfile.grid_style value.
+
+    Unknown values (free text from older prompts) get the default 2x2 layout.
+
+    Args:
+        grid_style: A layout key or grid_style value
+
+    Returns:
+        The matching layout
+    """
+    if grid_style:
+        layout = _by_grid_style.get(grid_style.strip().lower())
+        if layout is not None:
+            return layout
+    return LAYOUTS[DEFAULT_LAYOUT]
+
+
+register_layout(Layout("2x2", 2, 2, "standard 2x2", "2x2网格", {"English": "2x2 grid (4 panels)", "中文": "2x2 网格（四格）"}))
+register_layout(Layout("1x3", 1, 3, "1x3 horizontal strip", "1x3横排网格", {"English": "1x3 strip (3 panels)", "中文": "1x3 横排（三格）"}))
+register_layout(Layout("2x3", 2, 3, "2x3 grid", "2行3列网格", {"English": "2x3 grid (6 panels)", "中文": "2行3列网格（六格）"}))
+register_layout(Layout("3x2", 3, 2, "3x2 grid", "3行2列网格", {"English": "3x2 grid (6 panels)", "中文": "3行2列网格（六格）"}))
+register_layout(Layout("vertical-4", 4, 1, "vertical strip", "竖向单列网格", {"English": "Vertical strip (4 panels)", "中文": "竖向条漫（四格）"}))
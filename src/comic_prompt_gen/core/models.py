@@ -1,7 +1,13 @@
 """Data models for comic prompt generation."""
 from typing import Dict, List, Optional, Any
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+from .layouts import get_layout
+
+# Version of the serialized prompt layout written by the storage backends.
+# Files without a version predate versioning and use the version 1 layout.
+SCHEMA_VERSION = 1
 
 
 class Panel(BaseModel):
@@ -73,4 +79,41 @@ class ComicPrompt(BaseModel):
     
     # User feedback
     is_approved: bool = Field(False, description="Whether the user approved this prompt")
-    user_notes: Optional[str] = Field("", description="User notes about this prompt") 
\ No newline at end of file
+    user_notes: Optional[str] = Field("", description="User notes about this prompt")
+    
+    @model_validator(mode="after")
+    def _check_layout_panels(self) -> "ComicPrompt":
+        """Require a panel for every position of the layout named by style.grid_style."""
+        layout = get_layout(self.style.grid_style)
+        missing = layout.missing_panels(self.panels)
+        if missing:
+            raise ValueError(f"Layout {layout.key} needs panels {', '.join(layout.panel_keys)}; missing {', '.join(missing)}")
+        return self
+
+
+class PromptRecord:
+    """Lightweight read-only listing entry for a saved prompt."""
+    
+    __slots__ = ("id", "core_concept", "created_at", "updated_at", "is_approved")
+    
+    def __init__(self, id: Optional[str], core_concept: str, created_at: Optional[str], updated_at: Optional[str], is_approved: bool):
+        self.id = id
+        self.core_concept = core_concept
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.is_approved = is_approved
+    
+    @classmethod
+    def from_metadata(cls, meta: Dict[str, Any]) -> "PromptRecord":
+        """Build a record from a storage listing dictionary.
+        
+        Args:
+            meta: Metadata as returned by a storage backend's list_prompts
+            
+        Returns:
+            The PromptRecord
+        """
+        return cls(meta.get("id"), meta.get("core_concept", "Untitled"), meta.get("created_at"), meta.get("updated_at"), bool(meta.get("is_approved", False)))
+    
+    def __repr__(self) -> str:
+        return f"PromptRecord(id={self.id!r}, core_concept={self.core_concept!r})"
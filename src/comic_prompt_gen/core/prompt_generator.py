@@ -1,110 +1,337 @@
-"""Prompt generator for 4-panel comics."""
-from typing import Dict, Optional
+"""Prompt generator for multi-panel comics."""
+import hashlib
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from .models import ComicPrompt, Panel, StyleProfile
+from .layouts import LAYOUTS, Layout, get_layout
+from .models import ComicPrompt, StyleProfile
+from .templates import CompiledTemplate
 
-
-def generate_prompt(comic_prompt: ComicPrompt) -> str:
-    """Generate a complete prompt from a ComicPrompt object.
-    
-    Args:
-        comic_prompt: The ComicPrompt object containing all comic details
-        
-    Returns:
-        The formatted prompt text ready for AI image generators
-    """
-    # Format the content summary
-    content_summary = f"四个画格展示了{comic_prompt.content_summary_char}正在经历{comic_prompt.content_summary_action}。"
-    
-    # Format comic title if present
-    comic_title = ""
-    if comic_prompt.comic_title:
-        comic_title = f'图片最上方尝试清晰展示文字："{comic_prompt.comic_title}"。（AI可能无法准确生成文字）'
-    
-    # Start building the prompt
-    prompt = f"""
-## 核心指令：生成一张包含2x2网格布局的四格漫画，主题：[{comic_prompt.core_concept}]
+# Template sources. `{field}` slots are filled from the ComicPrompt, Panel or
+# StyleProfile attribute of the same name; `{grid}` and `{panel_count}` come
+# from the layout and are filled in when the layout's templates are compiled.
+HEADER_TEMPLATE = """
+## 核心指令：生成一张包含{grid}布局的{panel_count}格漫画，主题：[{core_concept}]
 
 **【整体故事板与叙事流】(Overall Storyboard & Narrative Flow):**
-- **核心概念/主题：** {comic_prompt.core_concept}
-- **叙事弧线 (可选):** {comic_prompt.narrative_arc}
-- **目标读者感受 (可选):** {comic_prompt.reader_feeling}
+- **核心概念/主题：** {core_concept}
+- **叙事弧线 (可选):** {narrative_arc}
+- **目标读者感受 (可选):** {reader_feeling}
 
 **【整体画面描述与布局要求】(Overall Scene Description & Layout Requirements):**
-- **最终图像：** 生成一张单一图片，内部包含一个清晰的2x2网格，分隔出四个独立的漫画画格。
-- **整体场景/环境：** {comic_prompt.overall_scene}
+- **最终图像：** 生成一张单一图片，内部包含一个清晰的{grid}，分隔出{panel_count}个独立的漫画画格。
+- **整体场景/环境：** {overall_scene}
 - **主题/标题（尝试性）：** {comic_title}
-- **内容梗概：** {content_summary} 风格遵循下方的【漫画风格配置文件】。
+- **内容梗概：** {panel_count}个画格展示了{content_summary_char}正在经历{content_summary_action}。 风格遵循下方的【漫画风格配置文件】。
 
 **【参考图像 (可选)】(Reference Images - Optional):**
-- **整体风格参考:** {comic_prompt.ref_overall_style}
-- **角色设计参考:** {comic_prompt.ref_character}
-- **环境/物品参考:** {comic_prompt.ref_environment}
-- **姿势/构图参考:** {comic_prompt.ref_pose}
-- **其他参考:** {comic_prompt.ref_other}
+- **整体风格参考:** {ref_overall_style}
+- **角色设计参考:** {ref_character}
+- **环境/物品参考:** {ref_environment}
+- **姿势/构图参考:** {ref_pose}
+- **其他参考:** {ref_other}
 *注：AI可能无法直接访问URL，请同时提供关键描述。参考图主要用于启发和指导风格/元素，而非直接复制。*
 
 **【各画格内容描述】(Individual Panel Content Descriptions):**
 """
 
-    # Add Panel Details
-    panel_locations = {
-        '1': '左上格 (Panel 1: Top-Left)', 
-        '2': '右上格 (Panel 2: Top-Right)', 
-        '3': '左下格 (Panel 3: Bottom-Left)', 
-        '4': '右下格 (Panel 4: Bottom-Right)'
-    }
-    
-    for i in range(1, 5):
-        panel = comic_prompt.panels[str(i)]
-        prompt += f"""
-{i}.  **{panel_locations[str(i)]}:**
-    *   **叙事作用 (Panel Purpose):** {panel.purpose}
-    *   **画面描述 (Visual Description):** {panel.desc}
-    *   **构图/视角 (Composition/Angle):** {panel.comp}
-    *   **文字内容 (Text Content):** "{panel.text}"
-    *   **文字位置 (Text Placement):** {panel.placement}
-    *   **音效 (Sound Effects - 可选):** {panel.sfx}
-    *   **具体参考 (Specific Reference - 可选):** {panel.ref}
-    *   **与前格联系 (Transition from Prev. - 可选):** {panel.transition}
+COMIC_TITLE_TEMPLATE = '图片最上方尝试清晰展示文字："{comic_title}"。（AI可能无法准确生成文字）'
+
+PANEL_TEMPLATE = """
+{i}.  **{location}:**
+    *   **叙事作用 (Panel Purpose):** {purpose}
+    *   **画面描述 (Visual Description):** {desc}
+    *   **构图/视角 (Composition/Angle):** {comp}
+    *   **文字内容 (Text Content):** "{text}"
+    *   **文字位置 (Text Placement):** {placement}
+    *   **音效 (Sound Effects - 可选):** {sfx}
+    *   **具体参考 (Specific Reference - 可选):** {ref}
+    *   **与前格联系 (Transition from Prev. - 可选):** {transition}
 """
 
-    # Add Style Profile
-    style = comic_prompt.style
-    prompt += f"""
+STYLE_TEMPLATE = """
 ---
 
 **【漫画风格配置文件】(Comic Style Profile):**
 {{
-  "style_name": "{style.style_name}",
+  "style_name": "{style_name}",
   "visual_elements": {{
     "character_design": {{
-      "style": "{style.char_style}",
-      "recurring_character": "{style.char_recurring}",
-      "expressions": "{style.char_expressions}"
+      "style": "{char_style}",
+      "recurring_character": "{char_recurring}",
+      "expressions": "{char_expressions}"
     }},
     "line_art": {{
-      "weight": "{style.line_weight}",
-      "style": "{style.line_style}",
-      "color": "{style.line_color}"
+      "weight": "{line_weight}",
+      "style": "{line_style}",
+      "color": "{line_color}"
     }},
     "color_theme": {{
-      "palette_style": "{style.palette_style}",
-      "background": "{style.background}",
-      "overall_tone": "{style.overall_tone}"
+      "palette_style": "{palette_style}",
+      "background": "{background}",
+      "overall_tone": "{overall_tone}"
     }},
     "panel_layout": {{
-       "grid_style": "{style.grid_style}",
-       "gutter_color": "{style.gutter_color}",
-       "gutter_width": "{style.gutter_width}",
-       "border_style": "{style.border_style} using color {style.border_color}" // Adjusted border description
+       "grid_style": "{grid_style}",
+       "gutter_color": "{gutter_color}",
+       "gutter_width": "{gutter_width}",
+       "border_style": "{border_style} using color {border_color}" // Adjusted border description
     }},
     "text_rendering": {{
-       "font_style_hint": "{style.font_hint}",
-       "bubble_style": "{style.bubble_style}"
+       "font_style_hint": "{font_hint}",
+       "bubble_style": "{bubble_style}"
     }}
   }}
 }}
 """
+
+# Identifies the text `generate_prompt` writes for a given prompt: a digest
+# of the template sources and a revision, to bump whenever a code change
+# alters the rendered text. Stored text is only re-rendered under the
+# version it was rendered with (see `storage.archive`).
+RENDERER_REVISION = 1
+RENDERER_VERSION = hashlib.blake2b(
+    "\0".join((str(RENDERER_REVISION), HEADER_TEMPLATE, COMIC_TITLE_TEMPLATE, PANEL_TEMPLATE, STYLE_TEMPLATE))
+    .encode("utf-8"),
+    digest_size=8,
+).hexdigest()
+
+_COMIC_TITLE = CompiledTemplate(COMIC_TITLE_TEMPLATE)
+_STYLE = CompiledTemplate(STYLE_TEMPLATE)
+
+# Names of the header sections, in order. The header template is split
+# before each of its "**【" headings after the first line.
+HEADER_SECTIONS = ("header", "storyboard", "scene", "references")
+_HEADER_BREAK = "\n\n**【"
+
+
+def _no_values(values: Dict[str, Any]) -> None:
+    return None
+
+
+class Section:
+    """One independently rendered part of a prompt.
+
+    A prompt is the concatenation of its layout's sections: the header line,
+    storyboard, scene, references, one section per panel and the style
+    profile. Each section reads only the fields in `fields` of one object
+    (the ComicPrompt, a panel or the style), so its text can be reused for
+    as long as those values are unchanged.
+    """
+
+    __slots__ = ("name", "scope", "fields", "source", "values", "render")
+
+    def __init__(
+        self,
+        name: str,
+        scope: Tuple[str, ...],
+        fields: Tuple[str, ...],
+        source: Callable[[ComicPrompt], Any],
+        render: Callable[[Any], str],
+    ):
+        """Create a section.
+
+        Args:
+            name: Section name, e.g. "scene" or "panel 3"
+            scope: Path of the object the section reads: () for the
+                ComicPrompt, ("panels", key) for a panel, ("style",)
+            fields: Attributes of that object the text depends on
+            source: Returns that object from a ComicPrompt
+            render: Renders the section text from that object
+        """
+        self.name = name
+        self.scope = scope
+        self.fields = fields
+        self.source = source
+        # Returns the section's key from the object's `__dict__` (None if
+        # constant); reading the model's dict directly is about twice as fast
+        # as attribute access on a pydantic model
+        self.values: Callable[[Dict[str, Any]], Any] = itemgetter(*fields) if fields else _no_values
+        self.render = render
+
+
+def _render_scene(before: CompiledTemplate, after: CompiledTemplate) -> Callable[[ComicPrompt], str]:
+    """Render function of the scene section, which holds the optional title line."""
+    def render(comic_prompt: ComicPrompt) -> str:
+        return "".join((
+            before.render(comic_prompt),
+            _COMIC_TITLE.render(comic_prompt) if comic_prompt.comic_title else "",
+            after.render(comic_prompt),
+        ))
+    return render
+
+
+def _identity(obj: Any) -> Any:
+    return obj
+
+
+def _get_style(comic_prompt: ComicPrompt) -> StyleProfile:
+    return comic_prompt.style
+
+
+class LayoutTemplates:
+    """The header, panel and section templates of one layout, compiled once.
+
+    The header is split around the optional comic title, and each panel gets
+    its own template with its number and location baked into the static
+    text, so a render is a handful of compiled calls joined once instead of
+    repeated string concatenation. `sections` splits the same text into the
+    parts an `IncrementalRenderer` re-renders independently.
+    """
+
+    __slots__ = ("head", "tail", "panels", "sections")
+
+    def __init__(self, layout: Layout):
+        static = {"grid": layout.grid_zh, "panel_count": layout.panel_count_zh}
+        before_title, after_title = HEADER_TEMPLATE.split("{comic_title}")
+        self.head = CompiledTemplate(before_title, **static)
+        self.tail = CompiledTemplate(after_title, **static)
+        self.panels: Tuple[Tuple[str, CompiledTemplate], ...] = tuple(
+            (key, CompiledTemplate(PANEL_TEMPLATE, i=int(key), location=location))
+            for key, location in zip(layout.panel_keys, layout.locations)
+        )
+
+        sections: List[Section] = []
+        first, *rest = HEADER_TEMPLATE.split(_HEADER_BREAK, len(HEADER_SECTIONS) - 1)
+        for name, source in zip(HEADER_SECTIONS, [first] + [_HEADER_BREAK + part for part in rest]):
+            if "{comic_title}" in source:
+                before, after = (CompiledTemplate(part, **static) for part in source.split("{comic_title}"))
+                fields = before.fields + ("comic_title",) + after.fields
+                render = _render_scene(before, after)
+            else:
+                template = CompiledTemplate(source, **static)
+                fields, render = template.fields, template.render
+            sections.append(Section(name, (), tuple(dict.fromkeys(fields)), _identity, render))
+        for key, template in self.panels:
+            sections.append(Section(
+                f"panel {key}", ("panels", key), template.fields,
+                lambda comic_prompt, key=key: comic_prompt.panels[key], template.render,
+            ))
+        sections.append(Section("style", ("style",), _STYLE.fields, _get_style, _STYLE.render))
+        self.sections: Tuple[Section, ...] = tuple(sections)
+
+
+# Compiled templates by layout key; built at import time for the layouts
+# registered so far, and on first use for any registered later
+_layout_templates: Dict[str, LayoutTemplates] = {key: LayoutTemplates(layout) for key, layout in LAYOUTS.items()}
+
+
+def get_layout_templates(layout: Layout) -> LayoutTemplates:
+    """Get the compiled templates of a layout (compiling them on first use)."""
+    templates = _layout_templates.get(layout.key)
+    if templates is None:
+        templates = _layout_templates.setdefault(layout.key, LayoutTemplates(layout))
+    return templates
+
+
+def render_header(comic_prompt: ComicPrompt, templates: LayoutTemplates) -> str:
+    """Render the prompt header (everything before the panel sections)."""
+    return "".join((
+        templates.head.render(comic_prompt),
+        _COMIC_TITLE.render(comic_prompt) if comic_prompt.comic_title else "",
+        templates.tail.render(comic_prompt),
+    ))
+
+
+def render_style(style: StyleProfile) -> str:
+    """Render the style profile section that ends every prompt."""
+    return _STYLE.render(style)
+
+
+def generate_prompt(comic_prompt: ComicPrompt) -> str:
+    """Generate a complete prompt from a ComicPrompt object.
     
-    return prompt 
\ No newline at end of file
+    The layout is selected by `comic_prompt.style.grid_style` (see
+    `core.layouts.get_layout`), and one section is written per layout panel.
+    
+    Args:
+        comic_prompt: The ComicPrompt object containing all comic details
+        
+    Returns:
+        The formatted prompt text ready for AI image generators
+    """
+    templates = get_layout_templates(get_layout(comic_prompt.style.grid_style))
+    parts = [render_header(comic_prompt, templates)]
+    
+    # Add Panel Details
+    panels = comic_prompt.panels
+    for key, template in templates.panels:
+        parts.append(template.render(panels[key]))
+    
+    # Add Style Profile
+    parts.append(_STYLE.render(comic_prompt.style))
+    
+    return "".join(parts)
+
+
+
+class IncrementalRenderer:
+    """Re-renders only the sections of a prompt that changed since the last call.
+
+    The renderer remembers the key and text of every section of the last
+    prompt it rendered. On the next call it compares each section's key
+    (the values of its fields) and re-renders only the sections whose
+    fields changed, so editing one panel costs one panel render plus the
+    final join. Changing the layout starts over.
+
+    One renderer holds the state of one editing session; it is not meant to
+    be shared between threads.
+
+    Usage:
+        renderer = IncrementalRenderer()
+        text = renderer.render(comic_prompt)   # renders every section
+        text = renderer.render(edited_prompt)  # renders only what changed
+    """
+
+    def __init__(self):
+        self._sections: Optional[Tuple[Section, ...]] = None
+        # (source, values, render) of every section, for the hot loop
+        self._plan: List[Tuple[Callable[[ComicPrompt], Any], Callable[[Dict[str, Any]], Any], Callable[[Any], str]]] = []
+        self._keys: List[Any] = []
+        self._texts: List[str] = []
+        self._text: Optional[str] = None
+        # Number of sections rendered / reused over the renderer's lifetime
+        self.rendered = 0
+        self.reused = 0
+
+    def render(self, comic_prompt: ComicPrompt) -> str:
+        """Render a prompt, reusing the unchanged sections of the previous one.
+
+        Args:
+            comic_prompt: The prompt to render
+
+        Returns:
+            The prompt text, identical to `generate_prompt(comic_prompt)`
+        """
+        sections = get_layout_templates(get_layout(comic_prompt.style.grid_style)).sections
+        if sections is not self._sections:
+            self._sections = sections
+            self._plan = [(section.source, section.values, section.render) for section in sections]
+            # A fresh object never equals a real key, so every section renders
+            self._keys = [object()] * len(sections)
+            self._texts = [""] * len(sections)
+            self._text = None
+
+        keys, texts = self._keys, self._texts
+        i = rendered = 0
+        for source, values, render in self._plan:
+            obj = source(comic_prompt)
+            key = values(obj.__dict__)
+            if key != keys[i]:
+                keys[i] = key
+                texts[i] = render(obj)
+                rendered += 1
+            i += 1
+        self.rendered += rendered
+        self.reused += i - rendered
+        if rendered or self._text is None:
+            self._text = "".join(texts)
+        return self._text
+
+    def stats(self) -> Dict[str, int]:
+        """Return the section counters.
+
+        Returns:
+            A dictionary with the number of sections rendered and reused
+        """
+        return {"rendered": self.rendered, "reused": self.reused}
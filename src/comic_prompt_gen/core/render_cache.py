@@ -0,0 +1,157 @@
+"""Process-wide LRU cache of rendered prompts keyed by prompt content."""
+import hashlib
+import threading
+from collections import OrderedDict
+from operator import attrgetter
+from typing import Callable, Dict, Optional, Tuple
+
+from .models import ComicPrompt, Panel, StyleProfile
+from .prompt_generator import generate_prompt
+
+# Fields that do not affect the rendered text and are left out of the key
+NON_CONTENT_FIELDS = frozenset(
+    {"id", "created_at", "updated_at", "generated_prompt", "is_approved", "user_notes"}
+)
+
+_prompt_values = attrgetter(
+    *sorted(set(ComicPrompt.model_fields) - NON_CONTENT_FIELDS - {"panels", "style"})
+)
+_panel_values = attrgetter(*sorted(Panel.model_fields))
+_style_values = attrgetter(*sorted(StyleProfile.model_fields))
+
+
+def content_key(comic_prompt: ComicPrompt) -> Tuple:
+    """Build the cache key of a prompt from the fields that affect its rendering.
+
+    IDs, timestamps, approval state, notes and any previously generated text
+    are ignored. The key is a nested tuple of the field values, so dictionary
+    lookups compare the full content and can never confuse two prompts.
+
+    Args:
+        comic_prompt: The prompt to build the key for
+
+    Returns:
+        A hashable tuple identifying the prompt content
+    """
+    panels = comic_prompt.panels
+    return (
+        _prompt_values(comic_prompt),
+        tuple((number, _panel_values(panels[number])) for number in sorted(panels)),
+        _style_values(comic_prompt.style),
+    )
+
+
+def content_hash(comic_prompt: ComicPrompt) -> str:
+    """Compute a stable digest of the prompt content.
+
+    Unlike `hash(content_key(...))`, the digest is the same in every process
+    and across restarts, so it can be stored or compared between machines.
+
+    Args:
+        comic_prompt: The prompt to hash
+
+    Returns:
+        A hex digest identifying the prompt content
+    """
+    # repr() of nested tuples of str/None is deterministic, unlike hash()
+    key = repr(content_key(comic_prompt)).encode("utf-8")
+    return hashlib.blake2b(key, digest_size=16).hexdigest()
+
+
+class RenderCache:
+    """A bounded, thread-safe LRU cache of rendered prompt text."""
+
+    def __init__(self, maxsize: int = 1024, renderer: Callable[[ComicPrompt], str] = generate_prompt):
+        """Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of rendered prompts kept
+            renderer: Function used to render prompts on a cache miss
+        """
+        self.maxsize = maxsize
+        self.renderer = renderer
+        self._entries: "OrderedDict[Tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, comic_prompt: ComicPrompt, renderer: Optional[Callable[[ComicPrompt], str]] = None) -> str:
+        """Render a prompt, reusing the cached text for identical content.
+
+        Args:
+            comic_prompt: The prompt to render
+            renderer: Renders the prompt on a miss instead of the cache's
+                renderer (e.g. a session's `IncrementalRenderer.render`)
+
+        Returns:
+            The rendered prompt text
+        """
+        key = content_key(comic_prompt)
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return text
+
+            # Rendering is cheap, so it happens under the lock: concurrent
+            # sessions submitting the same spec render it exactly once.
+            self.misses += 1
+            text = (renderer or self.renderer)(comic_prompt)
+            self._entries[key] = text
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return text
+
+    def stats(self) -> Dict[str, int]:
+        """Return the cache counters.
+
+        Returns:
+            A dictionary with hits, misses, evictions, size and maxsize
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+    def clear(self) -> None:
+        """Drop all cached prompts and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+# Shared by every Streamlit session and batch job in this process
+_shared_cache: Optional[RenderCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_render_cache() -> RenderCache:
+    """Get the process-wide render cache (creates it if needed).
+
+    Returns:
+        The shared RenderCache instance
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = RenderCache()
+        return _shared_cache
+
+
+def render_prompt(comic_prompt: ComicPrompt) -> str:
+    """Render a prompt through the process-wide render cache.
+
+    Args:
+        comic_prompt: The prompt to render
+
+    Returns:
+        The rendered prompt text
+    """
+    return get_render_cache().render(comic_prompt)
@@ -0,0 +1,73 @@
+"""Precompiled text templates for prompt generation."""
+from string import Formatter
+from typing import Any, Callable, Dict, List, Tuple
+
+
+class CompiledTemplate:
+    """A `str.format`-style template compiled once into a render function.
+
+    Every `{field}` in the source is a slot filled from the attribute of the
+    same name on the object being rendered. Fields given as keyword arguments
+    to the constructor are static: they are substituted at compile time and
+    folded into the surrounding text.
+
+    The template is compiled into a function whose body is a single f-string
+    expression, so rendering evaluates every slot and joins all segments in
+    one pass (CPython's BUILD_STRING) with no intermediate strings.
+    """
+
+    __slots__ = ("source", "fields", "render")
+
+    def __init__(self, source: str, **static: Any):
+        """Compile a template.
+
+        Args:
+            source: The template text, using `{name}` slots and `{{`/`}}` escapes
+            **static: Values substituted once at compile time
+        """
+        segments: List[str] = []
+        fields: List[str] = []
+        for literal, field, spec, conversion in Formatter().parse(source):
+            if literal:
+                segments.append(_escape_literal(literal))
+            if field is None:
+                continue
+            if spec or conversion:
+                raise ValueError(f"Format specs are not supported in templates: {field}")
+            if field in static:
+                segments.append(_escape_literal(format(static[field])))
+            elif field.isidentifier():
+                fields.append(field)
+                segments.append("{obj." + field + "}")
+            else:
+                raise ValueError(f"Template fields must be attribute names: {field}")
+
+        self.source = source
+        self.fields: Tuple[str, ...] = tuple(fields)
+        self.render: Callable[[Any], str] = _compile_render("".join(segments))
+
+
+# Escapes for static text placed inside a generated single-quoted f-string:
+# backslashes, quotes and control characters are escaped and braces doubled.
+_LITERAL_ESCAPES = str.maketrans(
+    {
+        "\\": "\\\\",
+        "'": "\\'",
+        "{": "{{",
+        "}": "}}",
+        **{chr(c): f"\\x{c:02x}" for c in range(32)},
+    }
+)
+
+
+def _escape_literal(text: str) -> str:
+    """Escape static text for use inside a generated f-string literal."""
+    return text.translate(_LITERAL_ESCAPES)
+
+
+def _compile_render(body: str) -> Callable[[Any], str]:
+    """Build the render function for an escaped f-string body."""
+    namespace: Dict[str, Any] = {}
+    code = f"def render(obj):\n    return f'{body}'\n"
+    exec(compile(code, "<compiled template>", "exec"), namespace)
+    return namespace["render"]
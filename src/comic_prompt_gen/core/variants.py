@@ -0,0 +1,193 @@
+"""Parameter sweeps: render many variants of one prompt along axes of variation."""
+import random
+from itertools import product
+from typing import Any, Callable, Dict, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from .layouts import get_layout
+from .models import ComicPrompt
+from .prompt_generator import get_layout_templates
+from .render_cache import NON_CONTENT_FIELDS
+
+# Rendered sections kept per section before its cache is cleared
+SECTION_CACHE_SIZE = 4096
+
+
+class Variant(NamedTuple):
+    """One rendered variant of a sweep."""
+
+    # Position in the full Cartesian product (stable across runs)
+    index: int
+    # The value of every axis, in the order of `PromptSweep.fields`
+    values: Tuple[Any, ...]
+    # The rendered prompt text
+    prompt: str
+
+
+class _Section:
+    """A part of the rendered prompt and the axes it depends on."""
+
+    __slots__ = ("positions", "render", "cache")
+
+    def __init__(self, positions: Tuple[int, ...], render: Callable[[Tuple[Any, ...]], str]):
+        self.positions = positions
+        self.render = render
+        self.cache: Dict[Tuple[Any, ...], str] = {}
+
+    def text(self, values: Tuple[Any, ...]) -> str:
+        key = tuple(values[p] for p in self.positions)
+        text = self.cache.get(key)
+        if text is None:
+            if len(self.cache) >= SECTION_CACHE_SIZE:
+                self.cache.clear()
+            text = self.cache[key] = self.render(key)
+        return text
+
+
+def _updated(model, fields: Sequence[str], values: Sequence[Any]):
+    """Copy a model with some fields replaced (values were validated up front)."""
+    return model.model_copy(update=dict(zip(fields, values)))
+
+
+class PromptSweep:
+    """All combinations of a base prompt with some fields varied.
+
+    Axes are dotted field paths, as in the CLI's CSV columns:
+    `core_concept`, `style.style_name`, `style.palette_style`,
+    `panels.1.comp`, ... Each maps to the list of values to try.
+
+    The prompt is split into the sections of its layout (see
+    `prompt_generator.Section`: header, storyboard, scene, references, one
+    per panel, style profile). A section is rendered once per distinct
+    combination of the axes it depends on and then reused, and sections no
+    axis touches are rendered only once, so a variant usually costs a few
+    dictionary lookups and one string join.
+
+    Usage:
+        sweep = PromptSweep(base, {"style.style_name": [...], "panels.1.comp": [...]})
+        for variant in sweep:            # the full product, lazily
+            ...
+        for variant in sweep.sample(100, seed=1):
+            ...
+    """
+
+    def __init__(self, base: ComicPrompt, axes: Mapping[str, Sequence[Any]]):
+        """Set up a sweep.
+
+        Args:
+            base: The prompt the variants start from
+            axes: Field path -> values to try, in iteration order (the last
+                axis changes fastest)
+
+        Raises:
+            ValueError: If a path is unknown or cannot be varied, an axis has
+                no values, or a value is invalid for its field
+        """
+        self.base = base
+        self.fields: Tuple[str, ...] = tuple(axes)
+        self.axes: Tuple[Tuple[Any, ...], ...] = tuple(tuple(values) for values in axes.values())
+        for field, values in zip(self.fields, self.axes):
+            if not values:
+                raise ValueError(f"Axis {field} has no values")
+            for value in values:
+                self._validate(field, value)
+
+        templates = get_layout_templates(get_layout(base.style.grid_style))
+        paths = [field.split(".") for field in self.fields]
+
+        sections: List[Any] = []
+        for section in templates.sections:
+            # Axes that vary one of the fields this section reads
+            found = [
+                (i, path[-1]) for i, path in enumerate(paths)
+                if tuple(path[:-1]) == section.scope and path[-1] in section.fields
+            ]
+            obj = section.source(base)
+            sections.append((
+                tuple(i for i, _ in found),
+                lambda key, obj=obj, fields=tuple(name for _, name in found), render=section.render:
+                    render(_updated(obj, fields, key)),
+            ))
+
+        # Sections no axis touches are rendered now and merged with their
+        # constant neighbours
+        self._parts: List[Any] = []
+        for section_positions, render in sections:
+            if section_positions:
+                self._parts.append(_Section(section_positions, render))
+            elif self._parts and isinstance(self._parts[-1], str):
+                self._parts[-1] += render(())
+            else:
+                self._parts.append(render(()))
+
+    def _validate(self, field: str, value: Any) -> None:
+        """Check that `field` can be varied and `value` is valid for it."""
+        path = field.split(".")
+        data = self.base.model_dump()
+        if len(path) == 1 and path[0] in ComicPrompt.model_fields and path[0] not in NON_CONTENT_FIELDS | {"panels", "style"}:
+            data[path[0]] = value
+        elif len(path) == 2 and path[0] == "style" and path[1] in data["style"]:
+            if path[1] == "grid_style":
+                raise ValueError("The layout (style.grid_style) cannot be varied within a sweep")
+            data["style"][path[1]] = value
+        elif len(path) == 3 and path[0] == "panels" and path[1] in data["panels"] and path[2] in data["panels"][path[1]]:
+            data["panels"][path[1]][path[2]] = value
+        else:
+            raise ValueError(f"Unknown or fixed field for a sweep axis: {field}")
+        try:
+            ComicPrompt.model_validate(data)
+        except ValueError as e:
+            raise ValueError(f"Invalid value {value!r} for {field}: {e}") from e
+
+    def __len__(self) -> int:
+        """Number of variants in the full product."""
+        total = 1
+        for values in self.axes:
+            total *= len(values)
+        return total
+
+    def render(self, values: Tuple[Any, ...]) -> str:
+        """Render the variant with the given axis values."""
+        return "".join(part if part.__class__ is str else part.text(values) for part in self._parts)
+
+    def __iter__(self) -> Iterator[Variant]:
+        """Lazily render every combination, last axis changing fastest."""
+        render = self.render
+        for index, values in enumerate(product(*self.axes)):
+            yield Variant(index, values, render(values))
+
+    def values_at(self, index: int) -> Tuple[Any, ...]:
+        """The axis values of the variant at `index` in the full product."""
+        digits = []
+        for values in reversed(self.axes):
+            index, digit = divmod(index, len(values))
+            digits.append(values[digit])
+        return tuple(reversed(digits))
+
+    def sample(self, count: int, seed: Optional[int] = None) -> Iterator[Variant]:
+        """Lazily render a random sample of distinct variants.
+
+        Args:
+            count: Number of variants (all of them if the product is smaller)
+            seed: Random seed; the same seed gives the same sample
+
+        Yields:
+            The sampled variants, in random order
+        """
+        rng = random.Random(seed)
+        # Sampling from a range object does not materialize the product
+        for index in rng.sample(range(len(self)), min(count, len(self))):
+            values = self.values_at(index)
+            yield Variant(index, values, self.render(values))
+
+    def prompt_for(self, values: Tuple[Any, ...]) -> ComicPrompt:
+        """Build the full ComicPrompt of a variant (e.g. to save it)."""
+        data = self.base.model_dump()
+        for field, value in zip(self.fields, values):
+            *parents, leaf = field.split(".")
+            target = data
+            for part in parents:
+                target = target[part]
+            target[leaf] = value
+        data["id"] = None
+        data["generated_prompt"] = None
+        return ComicPrompt.model_validate(data)
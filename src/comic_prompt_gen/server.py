@@ -0,0 +1,462 @@
+"""HTTP JSON API for prompt generation and saved prompt storage.
+
+Usage:
+    python -m comic_prompt_gen.server --host 127.0.0.1 --port 8000
+
+Endpoints:
+    POST   /generate            Render a ComicPrompt spec, returning the prompt text (compact, token_budget)
+    GET    /prompts             List saved prompts (offset, limit, sort, descending, approved, q)
+    GET    /prompts/search      Full-text search (q, approved, limit)
+    POST   /prompts             Save a ComicPrompt (rendered first if it has no prompt text)
+    GET    /prompts/{id}        Load a saved prompt
+    PUT    /prompts/{id}        Save a ComicPrompt under the given ID
+    DELETE /prompts/{id}        Delete a saved prompt
+    GET    /metrics             Request counters in the Prometheus text format
+
+The server is a small HTTP/1.1 implementation on asyncio streams, with
+persistent (keep-alive) connections and a cap on requests handled at once.
+Storage is configured with the same environment variables as the app, and
+nothing on this path imports Streamlit.
+"""
+import argparse
+import asyncio
+import functools
+import json
+import sys
+import time
+from collections import Counter
+from http import HTTPStatus
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from pydantic import ValidationError
+
+from .core.compact import render_compact
+from .core.models import ComicPrompt
+from .core.render_cache import render_prompt
+from .storage.async_storage import AsyncPromptStorage
+from .storage.base import SORT_FIELDS, is_valid_prompt_id
+
+# Largest request body accepted (bytes)
+MAX_BODY_SIZE = 1 << 20
+
+# (status, JSON-serializable body or raw bytes, content type)
+Response = Tuple[int, Any, str]
+
+T = TypeVar("T")
+
+JSON_TYPE = "application/json"
+METRICS_TYPE = "text/plain; version=0.0.4"
+
+
+class HTTPError(Exception):
+    """An error answered with a JSON error body."""
+
+    def __init__(self, status: int, message: str, details: Any = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.details = details
+
+
+class Request:
+    """A parsed HTTP request."""
+
+    __slots__ = ("method", "path", "query", "version", "headers", "body")
+
+    def __init__(self, method: str, target: str, version: str, headers: Dict[str, str], body: bytes):
+        url = urlsplit(target)
+        self.method = method
+        self.path = unquote(url.path)
+        self.query = dict(parse_qsl(url.query))
+        self.version = version
+        self.headers = headers
+        self.body = body
+
+    @property
+    def keep_alive(self) -> bool:
+        """Whether the client wants the connection kept open after this request."""
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def json(self) -> Any:
+        """Decode the request body as JSON."""
+        try:
+            return json.loads(self.body)
+        except ValueError as e:
+            raise HTTPError(400, f"Invalid JSON body: {e}")
+
+
+class Metrics:
+    """Request counters exposed on /metrics."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.requests: Counter = Counter()  # (route, status) -> count
+        self.duration: Counter = Counter()  # route -> seconds
+        self.connections = 0
+        self.open_connections = 0
+        self.keepalive_reuses = 0
+        self.in_flight = 0
+        self.waiting = 0
+
+    def observe(self, route: str, status: int, seconds: float) -> None:
+        """Record a finished request."""
+        self.requests[route, status] += 1
+        self.duration[route] += seconds
+
+    def render(self) -> bytes:
+        """Render the counters in the Prometheus text exposition format."""
+        lines: List[str] = [
+            "# TYPE comic_prompt_requests_total counter",
+            *(
+                f'comic_prompt_requests_total{{route="{route}",status="{status}"}} {count}'
+                for (route, status), count in sorted(self.requests.items())
+            ),
+            "# TYPE comic_prompt_request_seconds_total counter",
+            *(
+                f'comic_prompt_request_seconds_total{{route="{route}"}} {seconds:.6f}'
+                for route, seconds in sorted(self.duration.items())
+            ),
+            "# TYPE comic_prompt_connections_total counter",
+            f"comic_prompt_connections_total {self.connections}",
+            "# TYPE comic_prompt_keepalive_reuses_total counter",
+            f"comic_prompt_keepalive_reuses_total {self.keepalive_reuses}",
+            "# TYPE comic_prompt_open_connections gauge",
+            f"comic_prompt_open_connections {self.open_connections}",
+            "# TYPE comic_prompt_requests_in_flight gauge",
+            f"comic_prompt_requests_in_flight {self.in_flight}",
+            "# TYPE comic_prompt_requests_waiting gauge",
+            f"comic_prompt_requests_waiting {self.waiting}",
+            "# TYPE comic_prompt_uptime_seconds gauge",
+            f"comic_prompt_uptime_seconds {time.time() - self.started:.3f}",
+        ]
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _int_param(query: Dict[str, str], name: str, default: Optional[int]) -> Optional[int]:
+    value = query.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise HTTPError(400, f"Query parameter {name} must be an integer")
+    if number < 0:
+        raise HTTPError(400, f"Query parameter {name} must not be negative")
+    return number
+
+
+def _bool_param(query: Dict[str, str], name: str, default: Optional[bool]) -> Optional[bool]:
+    value = query.get(name)
+    if value is None or value == "":
+        return default
+    if value.lower() in ("1", "true", "yes"):
+        return True
+    if value.lower() in ("0", "false", "no"):
+        return False
+    raise HTTPError(400, f"Query parameter {name} must be true or false")
+
+
+def _validate_prompt(data: Any) -> ComicPrompt:
+    """Validate request data as a ComicPrompt, answering 422 on errors."""
+    try:
+        prompt = ComicPrompt.model_validate(data)
+    except ValidationError as e:
+        raise HTTPError(422, "Invalid ComicPrompt", json.loads(e.json(include_url=False)))
+    if prompt.id is not None and not is_valid_prompt_id(prompt.id):
+        raise HTTPError(422, "Invalid ComicPrompt", [{"loc": ["id"], "msg": "IDs may only contain letters, digits, '-' and '_'"}])
+    return prompt
+
+
+def _check_prompt_id(prompt_id: str) -> None:
+    """Answer 400 for a path ID that no prompt can have."""
+    if not is_valid_prompt_id(prompt_id):
+        raise HTTPError(400, f"Invalid prompt ID: {prompt_id}")
+
+
+class PromptServer:
+    """HTTP server exposing prompt generation and storage as JSON endpoints."""
+
+    def __init__(
+        self,
+        storage: Optional[AsyncPromptStorage] = None,
+        max_concurrency: int = 64,
+        keepalive_timeout: float = 15.0,
+    ):
+        """Initialize the server.
+
+        Args:
+            storage: Async storage to serve. Defaults to the backend configured
+                by the environment, with a storage thread per concurrent request.
+            max_concurrency: Maximum number of requests handled at once; further
+                requests wait (connections stay open) until a slot frees up
+            keepalive_timeout: Seconds an idle connection is kept open
+        """
+        self.storage = storage or AsyncPromptStorage(max_workers=max_concurrency)
+        self.keepalive_timeout = keepalive_timeout
+        self.metrics = Metrics()
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests on one connection until it is closed or idle."""
+        self.metrics.connections += 1
+        self.metrics.open_connections += 1
+        served = 0
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), self.keepalive_timeout)
+                except HTTPError as e:
+                    await self._write(writer, e.status, {"error": e.message}, JSON_TYPE, keep_alive=False)
+                    break
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                if request is None:
+                    break
+
+                if served:
+                    self.metrics.keepalive_reuses += 1
+                served += 1
+                status, body, content_type = await self._respond(request)
+                await self._write(writer, status, body, content_type, request.keep_alive)
+                if not request.keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.metrics.open_connections -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Request]:
+        """Read one request, or return None when the client closed the connection."""
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if not e.partial.strip():
+                return None
+            raise
+        except asyncio.LimitOverrunError:
+            raise HTTPError(431, "Request header too large")
+
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = request_line.split(" ")
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+        if version not in ("HTTP/1.0", "HTTP/1.1"):
+            raise HTTPError(505, "HTTP version not supported")
+
+        headers: Dict[str, str] = {}
+        for line in header_lines:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HTTPError(411, "Chunked request bodies are not supported; send Content-Length")
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length < 0:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > MAX_BODY_SIZE:
+            raise HTTPError(413, f"Request body larger than {MAX_BODY_SIZE} bytes")
+        body = await reader.readexactly(length) if length else b""
+        return Request(method, target, version, headers, body)
+
+    async def _write(self, writer: asyncio.StreamWriter, status: int, body: Any, content_type: str, keep_alive: bool) -> None:
+        """Send one response."""
+        if status == 204:
+            payload = b""
+        elif isinstance(body, bytes):
+            payload = body
+        else:
+            payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        )
+        if keep_alive:
+            head += f"Keep-Alive: timeout={int(self.keepalive_timeout)}\r\n"
+        writer.write(head.encode("latin-1") + b"\r\n" + payload)
+        await writer.drain()
+
+    async def _respond(self, request: Request) -> Response:
+        """Route a request under the concurrency limit and record its metrics."""
+        route, handler, args = self._route(request)
+        start = time.perf_counter()
+        if handler is None:
+            status, body, content_type = args
+        else:
+            self.metrics.waiting += 1
+            async with self._slots:
+                self.metrics.waiting -= 1
+                self.metrics.in_flight += 1
+                try:
+                    status, body, content_type = await handler(request, *args)
+                except HTTPError as e:
+                    error = {"error": e.message}
+                    if e.details is not None:
+                        error["details"] = e.details
+                    status, body, content_type = e.status, error, JSON_TYPE
+                except Exception as e:
+                    status, body, content_type = 500, {"error": f"{type(e).__name__}: {e}"}, JSON_TYPE
+                finally:
+                    self.metrics.in_flight -= 1
+        self.metrics.observe(route, status, time.perf_counter() - start)
+        return status, body, content_type
+
+    def _route(self, request: Request) -> Tuple[str, Any, Any]:
+        """Find the handler of a request.
+
+        Returns:
+            (route label, handler or None, handler arguments or the error response)
+        """
+        parts = [part for part in request.path.split("/") if part]
+        routes = {
+            ("generate",): ("/generate", {"POST": self.generate}),
+            ("metrics",): ("/metrics", {"GET": self.get_metrics}),
+            ("prompts",): ("/prompts", {"GET": self.list_prompts, "POST": self.create_prompt}),
+            ("prompts", "search"): ("/prompts/search", {"GET": self.search_prompts}),
+        }
+        args: Tuple = ()
+        entry = routes.get(tuple(parts))
+        if entry is None and len(parts) == 2 and parts[0] == "prompts":
+            entry = ("/prompts/{id}", {"GET": self.get_prompt, "PUT": self.put_prompt, "DELETE": self.delete_prompt})
+            args = (parts[1],)
+        if entry is None:
+            return "unmatched", None, (404, {"error": f"No route for {request.path}"}, JSON_TYPE)
+
+        route, methods = entry
+        handler = methods.get(request.method)
+        if handler is None:
+            allowed = ", ".join(methods)
+            return route, None, (405, {"error": f"{request.method} not allowed, use {allowed}"}, JSON_TYPE)
+        return route, handler, args
+
+    @staticmethod
+    async def _render(func: Callable[..., T], *args: Any) -> T:
+        """Run a rendering call on the loop's default executor, off the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args))
+
+    async def generate(self, request: Request) -> Response:
+        """POST /generate: render a spec without saving it."""
+        prompt = _validate_prompt(request.json())
+        token_budget = _int_param(request.query, "token_budget", None)
+        if _bool_param(request.query, "compact", token_budget is not None):
+            compacted = await self._render(render_compact, prompt, token_budget)
+            return 200, {"generated_prompt": compacted.text, "compact": compacted.report()}, JSON_TYPE
+        return 200, {"generated_prompt": await self._render(render_prompt, prompt)}, JSON_TYPE
+
+    async def get_metrics(self, request: Request) -> Response:
+        """GET /metrics"""
+        return 200, self.metrics.render(), METRICS_TYPE
+
+    async def list_prompts(self, request: Request) -> Response:
+        """GET /prompts: one page of saved prompt metadata and the total count."""
+        query = request.query
+        sort = query.get("sort", "created_at")
+        if sort not in SORT_FIELDS:
+            raise HTTPError(400, f"Query parameter sort must be one of {', '.join(SORT_FIELDS)}")
+        offset = _int_param(query, "offset", 0)
+        limit = _int_param(query, "limit", 50)
+        descending = _bool_param(query, "descending", True)
+        approved = _bool_param(query, "approved", None)
+        text = query.get("q") or None
+        items, total = await asyncio.gather(
+            self.storage.list(offset, limit, sort, descending, approved, text),
+            self.storage.count(approved, text),
+        )
+        return 200, {"total": total, "offset": offset, "items": items}, JSON_TYPE
+
+    async def search_prompts(self, request: Request) -> Response:
+        """GET /prompts/search: ranked full-text search."""
+        text = request.query.get("q", "")
+        if not text.strip():
+            raise HTTPError(400, "Query parameter q is required")
+        approved = _bool_param(request.query, "approved", None)
+        limit = _int_param(request.query, "limit", 50)
+        return 200, {"items": await self.storage.search(text, approved, limit)}, JSON_TYPE
+
+    async def _save(self, prompt: ComicPrompt) -> ComicPrompt:
+        if not prompt.generated_prompt:
+            prompt.generated_prompt = await self._render(render_prompt, prompt)
+        await self.storage.save(prompt)
+        return prompt
+
+    async def create_prompt(self, request: Request) -> Response:
+        """POST /prompts: save a new (or existing, if it has an id) prompt."""
+        prompt = await self._save(_validate_prompt(request.json()))
+        return 201, prompt.model_dump(mode="json"), JSON_TYPE
+
+    async def get_prompt(self, request: Request, prompt_id: str) -> Response:
+        """GET /prompts/{id}"""
+        _check_prompt_id(prompt_id)
+        prompt = await self.storage.load(prompt_id, trusted=True)
+        if prompt is None:
+            raise HTTPError(404, f"Prompt {prompt_id} not found")
+        return 200, prompt.model_dump(mode="json"), JSON_TYPE
+
+    async def put_prompt(self, request: Request, prompt_id: str) -> Response:
+        """PUT /prompts/{id}: save a prompt under the ID in the path."""
+        _check_prompt_id(prompt_id)
+        data = request.json()
+        if isinstance(data, dict):
+            data["id"] = prompt_id
+        prompt = await self._save(_validate_prompt(data))
+        return 200, prompt.model_dump(mode="json"), JSON_TYPE
+
+    async def delete_prompt(self, request: Request, prompt_id: str) -> Response:
+        """DELETE /prompts/{id}"""
+        _check_prompt_id(prompt_id)
+        if not await self.storage.delete(prompt_id):
+            raise HTTPError(404, f"Prompt {prompt_id} not found")
+        return 204, None, JSON_TYPE
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8000) -> None:
+        """Listen on host:port until cancelled."""
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        print(f"serving on {addresses}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(prog="comic_prompt_gen.server", description="HTTP JSON API for comic prompts.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on (default: 8000)")
+    parser.add_argument("--max-concurrency", type=int, default=64, help="Requests handled at once (default: 64)")
+    parser.add_argument("--keepalive-timeout", type=float, default=15.0, help="Idle connection timeout in seconds")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    args = build_parser().parse_args(argv)
+
+    async def run() -> None:
+        server = PromptServer(max_concurrency=args.max_concurrency, keepalive_timeout=args.keepalive_timeout)
+        await server.serve(args.host, args.port)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
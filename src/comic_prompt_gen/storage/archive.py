@@ -0,0 +1,559 @@
+"""Compact append-only archive storage backend for comic prompts.
+
+An archive is a directory holding two files:
+
+- `prompts.seg`, the segment: a file header followed by length-prefixed
+  records. A record is a small header (kind, payload length, CRC32) and a
+  payload. Saves append a zlib-compressed compact JSON payload, deletes append
+  a tombstone holding the prompt ID. Records are never modified in place.
+- `prompts.idx`, the sidecar index: the offset and listing metadata of the
+  latest record of every live prompt, plus the segment size it covers.
+
+Reads go through a memory map of the segment, so loading a prompt by ID is a
+dictionary lookup and one decompression. The sidecar is only rewritten every
+`INDEX_FLUSH_INTERVAL` writes; on open, records appended after the covered
+size are replayed from the segment, and a torn record at the end (from a
+crash mid-write) is cut off.
+
+A generated prompt that equals the rendering of the prompt's own content is
+not stored; the record notes the renderer version instead, and the prompt
+is rendered again on load. Approved prompts always keep their text, so a
+template change never alters approved text.
+
+Deleted and overwritten records keep taking space until the archive is
+compacted:
+
+    python -m comic_prompt_gen.storage.archive compact saved_prompts.archive
+"""
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import uuid
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..core.models import SCHEMA_VERSION, ComicPrompt
+from ..core.prompt_generator import RENDERER_VERSION
+from ..core.render_cache import render_prompt
+from ..utils.registry import PathRegistry
+from ..utils.reporting import report_error
+from .base import SortedListing, prompt_from_data
+from .prompt_index import extract_metadata
+from .search_index import get_search_index, search_storage
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_FILENAME = "prompts.seg"
+INDEX_FILENAME = "prompts.idx"
+SEGMENT_MAGIC = b"CPGSEG\x00\x01"
+INDEX_VERSION = 1
+
+# Sidecar index writes are batched; a stale sidecar is caught up on open
+INDEX_FLUSH_INTERVAL = 64
+
+# Record kinds
+RECORD_PUT = 1
+RECORD_PUT_RENDERED = 2  # generated_prompt left out, re-rendered on load
+RECORD_DELETE = 3
+
+# Key of the renderer version in RECORD_PUT_RENDERED payloads
+RENDERER_KEY = "renderer_version"
+
+# kind, payload length, CRC32 of the payload
+_RECORD_HEADER = struct.Struct("<BII")
+
+
+class ArchiveError(Exception):
+    """Raised when an archive record cannot be read."""
+
+
+def _encode(prompt: ComicPrompt) -> Tuple[int, bytes, Dict[str, Any]]:
+    """Serialize a prompt into a record kind, compressed payload and its data."""
+    data = {"schema_version": SCHEMA_VERSION, **prompt.model_dump(mode="json")}
+    kind = RECORD_PUT
+    generated = data.get("generated_prompt")
+    # Approved text is kept as written: re-rendering it under later templates
+    # would change it
+    if generated and not prompt.is_approved and generated == render_prompt(prompt):
+        del data["generated_prompt"]
+        data[RENDERER_KEY] = RENDERER_VERSION
+        kind = RECORD_PUT_RENDERED
+    raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return kind, zlib.compress(raw), data
+
+
+def _pack(kind: int, payload: bytes) -> bytes:
+    """Build the bytes of one record."""
+    return _RECORD_HEADER.pack(kind, len(payload), zlib.crc32(payload)) + payload
+
+
+class SegmentArchive:
+    """The segment file and sidecar index of one archive directory.
+
+    Instances are shared through `get_archive`, so every storage object (and
+    every Streamlit session) in the process sees the same index. Writers in
+    other processes are not coordinated with.
+    """
+
+    def __init__(self, archive_dir: Path):
+        """Open (or create) an archive.
+
+        Args:
+            archive_dir: Directory holding the segment and sidecar index
+        """
+        self.archive_dir = archive_dir
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self.segment_path = archive_dir / SEGMENT_FILENAME
+        self.index_path = archive_dir / INDEX_FILENAME
+
+        # Latest record of every live prompt: id -> (offset, record size, metadata)
+        self._entries: Dict[str, Tuple[int, int, Dict[str, Any]]] = {}
+        # The same metadata in sort order, for listing pages
+        self._listing = SortedListing()
+        self._size = 0
+        self.dead_bytes = 0
+        self._unflushed = 0
+        self._lock = threading.RLock()
+        self._map: Optional[mmap.mmap] = None
+
+        if not self.segment_path.exists() or self.segment_path.stat().st_size == 0:
+            with open(self.segment_path, "wb") as f:
+                f.write(SEGMENT_MAGIC)
+        self._file = open(self.segment_path, "r+b")
+        if self._file.read(len(SEGMENT_MAGIC)) != SEGMENT_MAGIC:
+            self._file.close()
+            raise ArchiveError(f"{self.segment_path} is not a prompt archive segment")
+
+        self._open_index()
+
+    # -- index -------------------------------------------------------------
+
+    def _open_index(self) -> None:
+        """Load the sidecar index and replay records appended after it."""
+        start = len(SEGMENT_MAGIC)
+        segment_size = os.fstat(self._file.fileno()).st_size
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            if payload.get("version") == INDEX_VERSION and payload["segment_size"] <= segment_size:
+                self._entries = {key: tuple(entry) for key, entry in payload["entries"].items()}
+                self.dead_bytes = payload["dead_bytes"]
+                start = payload["segment_size"]
+        except (OSError, ValueError, KeyError, TypeError):
+            # A missing or corrupt sidecar is rebuilt from the segment
+            self._entries = {}
+            self.dead_bytes = 0
+
+        self._listing.reset({prompt_id: meta for prompt_id, (_, _, meta) in self._entries.items()})
+        self._size = start
+        end = self._replay(start, segment_size)
+        if end < segment_size:
+            # Cut off a torn record left by an interrupted write
+            self._file.truncate(end)
+        if start < segment_size:
+            self._flush_index()
+
+    def _replay(self, start: int, segment_size: int) -> int:
+        """Apply the records in [start, segment_size) to the index.
+
+        Returns:
+            The offset just past the last complete record
+
+        Raises:
+            ArchiveError: If a record other than the last one is corrupt
+        """
+        self._file.seek(start)
+        offset = start
+        while offset + _RECORD_HEADER.size <= segment_size:
+            kind, length, crc = _RECORD_HEADER.unpack(self._file.read(_RECORD_HEADER.size))
+            payload = self._file.read(length)
+            if len(payload) != length:
+                break
+            record_size = _RECORD_HEADER.size + length
+            if zlib.crc32(payload) != crc:
+                if offset + record_size == segment_size:
+                    # The last record's header reached the disk but not all
+                    # of its payload (file systems may extend the file with
+                    # zeros first): a torn write, cut off like a short one
+                    break
+                raise ArchiveError(f"Corrupt record at offset {offset} of {self.segment_path}")
+            if kind == RECORD_DELETE:
+                self._apply_delete(payload.decode("utf-8"), record_size)
+            else:
+                data = json.loads(zlib.decompress(payload))
+                self._apply_put(data["id"], offset, record_size, data)
+            offset += record_size
+        self._size = offset
+        return offset
+
+    def _apply_put(self, prompt_id: str, offset: int, record_size: int, data: Dict[str, Any]) -> None:
+        previous = self._entries.get(prompt_id)
+        if previous is not None:
+            self.dead_bytes += previous[1]
+        meta = extract_metadata(data)
+        self._entries[prompt_id] = (offset, record_size, meta)
+        self._listing.put(prompt_id, meta)
+
+    def _apply_delete(self, prompt_id: str, record_size: int) -> None:
+        previous = self._entries.pop(prompt_id, None)
+        if previous is not None:
+            self.dead_bytes += previous[1]
+            self._listing.remove(prompt_id)
+        # The tombstone itself is dead as soon as it is written
+        self.dead_bytes += record_size
+
+    def _flush_index(self) -> None:
+        """Write the sidecar index (tmp file + atomic rename)."""
+        tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        payload = {
+            "version": INDEX_VERSION,
+            "segment_size": self._size,
+            "dead_bytes": self.dead_bytes,
+            "entries": self._entries,
+        }
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.index_path)
+            self._unflushed = 0
+        except OSError:
+            # The segment is the source of truth; the next open catches up
+            pass
+
+    def _append(self, record: bytes) -> int:
+        """Append a record to the segment and return its offset."""
+        offset = self._size
+        self._file.seek(offset)
+        self._file.write(record)
+        self._file.flush()
+        self._size += len(record)
+        return offset
+
+    def _written(self) -> None:
+        """Count a write applied to the index, flushing the sidecar every so often."""
+        self._unflushed += 1
+        if self._unflushed >= INDEX_FLUSH_INTERVAL:
+            self._flush_index()
+
+    # -- records -----------------------------------------------------------
+
+    def put(self, prompt: ComicPrompt) -> Dict[str, Any]:
+        """Append a prompt, replacing any earlier record with the same ID.
+
+        Returns:
+            The listing metadata recorded for the prompt
+        """
+        kind, payload, data = _encode(prompt)
+        record = _pack(kind, payload)
+        with self._lock:
+            offset = self._append(record)
+            self._apply_put(prompt.id, offset, len(record), data)
+            self._written()
+            return self._entries[prompt.id][2]
+
+    def delete(self, prompt_ids: Iterable[str]) -> int:
+        """Append tombstones for prompts in a single write.
+
+        Returns:
+            The number of prompts that existed and were deleted
+        """
+        with self._lock:
+            records = [
+                (prompt_id, _pack(RECORD_DELETE, prompt_id.encode("utf-8")))
+                for prompt_id in dict.fromkeys(prompt_ids)
+                if prompt_id in self._entries
+            ]
+            if not records:
+                return 0
+            self._append(b"".join(record for _, record in records))
+            for prompt_id, record in records:
+                self._apply_delete(prompt_id, len(record))
+                self._written()
+            return len(records)
+
+    def _view(self) -> mmap.mmap:
+        """Return a memory map covering every appended record."""
+        if self._map is None or len(self._map) < self._size:
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def get(self, prompt_id: str) -> Optional[Dict[str, Any]]:
+        """Read the latest data of a prompt through the memory map.
+
+        Returns:
+            The prompt data, or None if the archive has no such prompt. The
+            "generated_prompt" key is missing when it has to be re-rendered.
+        """
+        with self._lock:
+            entry = self._entries.get(prompt_id)
+            if entry is None:
+                return None
+            view = self._view()
+            offset = entry[0]
+            _, length, crc = _RECORD_HEADER.unpack_from(view, offset)
+            start = offset + _RECORD_HEADER.size
+            payload = view[start:start + length]
+
+        if zlib.crc32(payload) != crc:
+            raise ArchiveError(f"Corrupt record for prompt {prompt_id} at offset {offset}")
+        return json.loads(zlib.decompress(payload))
+
+    def metadata(self) -> List[Dict[str, Any]]:
+        """Return the listing metadata of every live prompt."""
+        with self._lock:
+            return [dict(meta) for _, _, meta in self._entries.values()]
+
+    def page(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        sort: str = "created_at",
+        descending: bool = True,
+        approved: Optional[bool] = None,
+        query: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return one page of the live prompts' metadata (see `SortedListing.page`)."""
+        return self._listing.page(offset, limit, sort, descending, approved, query)
+
+    def count(self, approved: Optional[bool] = None, query: Optional[str] = None) -> int:
+        """Count the live prompts matching the filters (see `SortedListing.count`)."""
+        return self._listing.count(approved, query)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the prompt count, segment size and reclaimable bytes."""
+        with self._lock:
+            return {"prompts": len(self._entries), "segment_bytes": self._size, "dead_bytes": self.dead_bytes}
+
+    def flush(self) -> None:
+        """Write any pending sidecar index changes."""
+        with self._lock:
+            if self._unflushed:
+                self._flush_index()
+
+    def compact(self) -> int:
+        """Rewrite the segment with only the latest record of each live prompt.
+
+        Records are copied as they are, without recompressing them.
+
+        Returns:
+            The number of bytes reclaimed
+        """
+        with self._lock:
+            before = self._size
+            view = self._view()
+            tmp_path = self.segment_path.with_name(self.segment_path.name + ".tmp")
+            entries: Dict[str, Tuple[int, int, Dict[str, Any]]] = {}
+            with open(tmp_path, "wb") as out:
+                out.write(SEGMENT_MAGIC)
+                position = len(SEGMENT_MAGIC)
+                for prompt_id, (offset, record_size, meta) in sorted(self._entries.items(), key=lambda item: item[1][0]):
+                    out.write(view[offset:offset + record_size])
+                    entries[prompt_id] = (position, record_size, meta)
+                    position += record_size
+                out.flush()
+                os.fsync(out.fileno())
+
+            self._map.close()
+            self._map = None
+            self._file.close()
+            os.replace(tmp_path, self.segment_path)
+            self._file = open(self.segment_path, "r+b")
+
+            self._entries = entries
+            self._size = position
+            self.dead_bytes = 0
+            self._flush_index()
+            return before - position
+
+
+# One archive object per directory, shared by every storage instance in the
+# process (like the SQLite connection pools)
+_archives: PathRegistry[SegmentArchive] = PathRegistry()
+
+
+def get_archive(archive_dir: Path) -> SegmentArchive:
+    """Get the shared archive object for a directory.
+
+    Args:
+        archive_dir: Directory holding the segment and sidecar index
+
+    Returns:
+        The process-wide SegmentArchive for that directory
+    """
+    return _archives.shared(archive_dir, lambda: SegmentArchive(archive_dir))
+
+
+class ArchivePromptStorage:
+    """Storage manager for comic prompts kept in a compact append-only archive."""
+
+    def __init__(self, archive_dir: str = "saved_prompts.archive"):
+        """Initialize the storage manager.
+
+        Args:
+            archive_dir: Directory holding the archive files
+        """
+        self.archive_dir = Path(archive_dir)
+        self.archive = get_archive(self.archive_dir)
+        # Full-text index, kept current on save and delete
+        self.search_index = get_search_index(self.archive_dir / "search.idx")
+
+    def save_prompt(self, prompt: ComicPrompt) -> str:
+        """Save a prompt to storage.
+
+        Args:
+            prompt: The ComicPrompt object to save
+
+        Returns:
+            The ID of the saved prompt
+        """
+        # Generate ID if not present
+        if prompt.id is None:
+            prompt.id = str(uuid.uuid4())
+
+        # Update timestamp
+        prompt.updated_at = datetime.now()
+
+        meta = self.archive.put(prompt)
+        self.search_index.add(prompt, meta)
+        return prompt.id
+
+    def load_prompt(self, prompt_id: str, trusted: bool = False) -> Optional[ComicPrompt]:
+        """Load a prompt from storage.
+
+        Args:
+            prompt_id: The ID of the prompt to load
+            trusted: Accepted for interface compatibility; records are always
+                validated
+
+        Returns:
+            The loaded ComicPrompt object, or None if not found
+        """
+        try:
+            data = self.archive.get(prompt_id)
+            if data is None:
+                return None
+            renderer_version = data.pop(RENDERER_KEY, None)
+            prompt = prompt_from_data(data)
+            if "generated_prompt" not in data:
+                # Only unapproved prompts are stored without their text, and
+                # those are rendered with the current templates in any case
+                if renderer_version != RENDERER_VERSION:
+                    logger.info("Prompt %s was saved with other templates; rendering it with the current ones", prompt_id)
+                prompt.generated_prompt = render_prompt(prompt)
+            return prompt
+        except Exception as e:
+            report_error(f"Error loading prompt: {e}")
+            return None
+
+    def list_prompts(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        sort: str = "created_at",
+        descending: bool = True,
+        approved: Optional[bool] = None,
+        query: Optional[str] = None,
+    ) -> List[Dict]:
+        """List saved prompts with basic metadata, one page at a time.
+
+        Args:
+            offset: Number of matching prompts to skip
+            limit: Maximum number of prompts to return (None for all)
+            sort: Metadata field to sort by ("created_at", "updated_at" or "core_concept")
+            descending: Sort from highest to lowest (newest first for dates)
+            approved: If set, only list prompts with this approval status
+            query: If set, only list prompts whose core concept contains it
+
+        Returns:
+            List of prompt metadata (id, title, creation/update dates, approval)
+        """
+        return self.archive.page(offset, limit, sort, descending, approved, query)
+
+    def count_prompts(self, approved: Optional[bool] = None, query: Optional[str] = None) -> int:
+        """Count saved prompts matching the given filters.
+
+        Args:
+            approved: If set, only count prompts with this approval status
+            query: If set, only count prompts whose core concept contains it
+
+        Returns:
+            The number of matching prompts
+        """
+        return self.archive.count(approved, query)
+
+    def delete_prompt(self, prompt_id: str) -> bool:
+        """Delete a prompt from storage.
+
+        Args:
+            prompt_id: The ID of the prompt to delete
+
+        Returns:
+            True if deleted successfully, False otherwise
+        """
+        return self.delete_prompts([prompt_id]) > 0
+
+    def delete_prompts(self, prompt_ids: Iterable[str]) -> int:
+        """Delete several prompts, appending all tombstones in one write.
+
+        Args:
+            prompt_ids: The IDs of the prompts to delete
+
+        Returns:
+            The number of prompts deleted
+        """
+        try:
+            prompt_ids = list(prompt_ids)
+            deleted = self.archive.delete(prompt_ids)
+        except OSError:
+            return 0
+        self.search_index.remove_many(prompt_ids)
+        return deleted
+
+    def search_prompts(self, query: str, approved: Optional[bool] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Full-text search over saved prompts.
+
+        Args:
+            query: The search text (words, or Chinese text of any length)
+            approved: If set, only return prompts with this approval status
+            limit: Maximum number of results (None for all)
+
+        Returns:
+            Metadata of the matching prompts with a relevance "score", best first
+        """
+        return search_storage(self, self.search_index, query, approved, limit)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for archive maintenance."""
+    parser = argparse.ArgumentParser(description="Maintain a compact prompt archive.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    compact = subparsers.add_parser("compact", help="Reclaim the space of deleted and overwritten prompts")
+    compact.add_argument("archive_dir", type=Path, help="Archive directory")
+    stats = subparsers.add_parser("stats", help="Show the size of an archive")
+    stats.add_argument("archive_dir", type=Path, help="Archive directory")
+    args = parser.parse_args(argv)
+
+    if not (args.archive_dir / SEGMENT_FILENAME).is_file():
+        parser.error(f"{args.archive_dir} is not a prompt archive")
+
+    archive = get_archive(args.archive_dir)
+    if args.command == "compact":
+        reclaimed = archive.compact()
+        print(f"reclaimed {reclaimed} bytes ({archive.stats()['segment_bytes']} bytes left)")
+    else:
+        for name, value in archive.stats().items():
+            print(f"{name}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
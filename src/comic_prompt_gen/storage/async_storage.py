@@ -0,0 +1,122 @@
+"""Asyncio interface to the prompt storage backends."""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar
+
+from ..core.models import ComicPrompt
+from .base import PromptStore
+
+T = TypeVar("T")
+
+# Default number of storage calls running at the same time
+DEFAULT_MAX_WORKERS = 8
+
+# Largest number of prompts one `aload_many` job loads. Jobs are batched
+# because handing each load to the pool separately costs more than a warm
+# file read; small enough that every worker still gets several jobs.
+LOAD_BATCH_SIZE = 32
+
+
+class AsyncPromptStorage:
+    """Coroutine wrapper around a prompt storage backend.
+
+    Every call runs the blocking backend method on a bounded thread pool, so
+    the event loop never waits on disk and no more than `max_workers` calls
+    touch the storage at once. The backends already serialize their own
+    writes, so this works with any of them.
+
+    Usage:
+        async with AsyncPromptStorage() as storage:
+            prompts = await storage.aload_many(ids)
+    """
+
+    def __init__(self, storage: Optional[PromptStore] = None, max_workers: int = DEFAULT_MAX_WORKERS):
+        """Initialize the async storage.
+
+        Args:
+            storage: The backend to wrap. Defaults to the process-wide backend
+                configured by the environment (see `get_shared_storage`).
+            max_workers: Maximum number of storage calls in flight
+        """
+        if storage is None:
+            from .prompt_storage import get_shared_storage
+            storage = get_shared_storage()
+        self.storage = storage
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prompt-storage")
+
+    async def _run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a blocking storage call on the thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def save(self, prompt: ComicPrompt) -> str:
+        """Save a prompt, returning its ID."""
+        return await self._run(self.storage.save_prompt, prompt)
+
+    async def load(self, prompt_id: str, trusted: bool = False) -> Optional[ComicPrompt]:
+        """Load a prompt by ID, returning None if it does not exist."""
+        return await self._run(self.storage.load_prompt, prompt_id, trusted)
+
+    async def aload_many(self, prompt_ids: Iterable[str], trusted: bool = True) -> List[Optional[ComicPrompt]]:
+        """Load several prompts concurrently.
+
+        Args:
+            prompt_ids: The IDs of the prompts to load
+            trusted: Use the backend's fast path for data written by this
+                application (the default, as bulk loads read our own files)
+
+        Returns:
+            The prompts in the order of `prompt_ids`, None for missing ones
+        """
+        prompt_ids = list(prompt_ids)
+        if not prompt_ids:
+            return []
+        size = min(LOAD_BATCH_SIZE, -(-len(prompt_ids) // self.max_workers))
+        batches = [prompt_ids[start:start + size] for start in range(0, len(prompt_ids), size)]
+        results = await asyncio.gather(*(self._run(self._load_batch, batch, trusted) for batch in batches))
+        return [prompt for batch in results for prompt in batch]
+
+    def _load_batch(self, prompt_ids: List[str], trusted: bool) -> List[Optional[ComicPrompt]]:
+        """Load a batch of prompts on a pool thread."""
+        return [self.storage.load_prompt(prompt_id, trusted) for prompt_id in prompt_ids]
+
+    async def list(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        sort: str = "created_at",
+        descending: bool = True,
+        approved: Optional[bool] = None,
+        query: Optional[str] = None,
+    ) -> List[Dict]:
+        """List one page of saved prompt metadata (see `PromptStore.list_prompts`)."""
+        return await self._run(self.storage.list_prompts, offset, limit, sort, descending, approved, query)
+
+    async def count(self, approved: Optional[bool] = None, query: Optional[str] = None) -> int:
+        """Count the saved prompts matching the filters."""
+        return await self._run(self.storage.count_prompts, approved, query)
+
+    async def search(self, query: str, approved: Optional[bool] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Full-text search, best match first (see `PromptStore.search_prompts`)."""
+        return await self._run(self.storage.search_prompts, query, approved, limit)
+
+    async def delete(self, prompt_id: str) -> bool:
+        """Delete a prompt by ID, returning True if it was deleted."""
+        return await self._run(self.storage.delete_prompt, prompt_id)
+
+    async def delete_many(self, prompt_ids: Iterable[str]) -> int:
+        """Delete several prompts in one pass, returning how many were deleted."""
+        return await self._run(self.storage.delete_prompts, list(prompt_ids))
+
+    def close(self) -> None:
+        """Wait for running calls and shut the thread pool down."""
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> "AsyncPromptStorage":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        # Shutting down waits for running calls, so do it off the event loop
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
@@ -0,0 +1,316 @@
+"""Storage interface shared by all prompt storage backends."""
+import json
+import re
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Protocol, Tuple
+
+from ..core.models import SCHEMA_VERSION, ComicPrompt
+
+# Metadata fields the saved prompt listing can be sorted by
+SORT_FIELDS = ("created_at", "updated_at", "core_concept")
+
+# Prompt IDs are UUIDs; anything else a backend accepts must still be safe as
+# a file name, so IDs are restricted to letters, digits, "-" and "_"
+_PROMPT_ID = re.compile(r"[A-Za-z0-9_-]{1,128}")
+
+# Start of every JSON document written with the current schema version
+# (PromptStorage writes the version as the first key, indented by two)
+_CURRENT_HEADER = b'{\n  "schema_version": %d,' % SCHEMA_VERSION
+
+
+def is_valid_prompt_id(value: Any) -> bool:
+    """Check that a prompt ID (e.g. from a request) is safe to store under."""
+    return isinstance(value, str) and _PROMPT_ID.fullmatch(value) is not None
+
+
+class PromptStore(Protocol):
+    """Interface implemented by every prompt storage backend."""
+
+    def save_prompt(self, prompt: ComicPrompt) -> str:
+        """Save a prompt, assigning an ID if needed, and return its ID."""
+        ...
+
+    def load_prompt(self, prompt_id: str, trusted: bool = False) -> Optional[ComicPrompt]:
+        """Load a prompt by ID, returning None if it does not exist.
+
+        With `trusted`, data written by this application is loaded through
+        the fastest path the backend has, for bulk loads and exports.
+        """
+        ...
+
+    def list_prompts(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        sort: str = "created_at",
+        descending: bool = True,
+        approved: Optional[bool] = None,
+        query: Optional[str] = None,
+    ) -> List[Dict]:
+        """List one page of saved prompt metadata matching the filters."""
+        ...
+
+    def count_prompts(self, approved: Optional[bool] = None, query: Optional[str] = None) -> int:
+        """Count the saved prompts matching the filters."""
+        ...
+
+    def delete_prompt(self, prompt_id: str) -> bool:
+        """Delete a prompt by ID, returning True if it was deleted."""
+        ...
+
+    def delete_prompts(self, prompt_ids: Iterable[str]) -> int:
+        """Delete several prompts in one pass, returning how many were deleted."""
+        ...
+
+    def search_prompts(self, query: str, approved: Optional[bool] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Full-text search, returning metadata with a "score", best match first."""
+        ...
+
+
+def upgrade_prompt_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Bring serialized prompt data up to the current schema version.
+
+    Args:
+        data: The serialized prompt data
+
+    Returns:
+        The data in the current layout
+    """
+    version = data.get("schema_version", 0)
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"Prompt schema version {version} is newer than supported ({SCHEMA_VERSION})")
+    # Unversioned files (version 0) already use the version 1 layout
+    data["schema_version"] = SCHEMA_VERSION
+    return data
+
+
+def prompt_from_data(data: Dict[str, Any]) -> ComicPrompt:
+    """Build a validated ComicPrompt from serialized data of any schema version."""
+    return ComicPrompt.model_validate(upgrade_prompt_data(data))
+
+
+def prompt_from_json(raw: bytes, trusted: bool = False) -> ComicPrompt:
+    """Build a ComicPrompt from a serialized JSON document.
+
+    Args:
+        raw: The JSON document
+        trusted: The document was written by this application. Documents
+            with the current schema version are then parsed and validated
+            in a single pass by pydantic-core, without building intermediate
+            Python objects; older documents go through the upgrade path.
+
+    Returns:
+        The ComicPrompt object
+    """
+    if trusted and raw.startswith(_CURRENT_HEADER):
+        return ComicPrompt.model_validate_json(raw)
+    return prompt_from_data(json.loads(raw))
+
+
+def filter_metadata(entries: List[Dict], approved: Optional[bool] = None, query: Optional[str] = None) -> List[Dict]:
+    """Filter prompt metadata in memory.
+
+    Args:
+        entries: Prompt metadata dictionaries
+        approved: If set, only keep prompts with this approval status
+        query: If set, only keep prompts whose core concept contains it
+            (case-insensitive)
+
+    Returns:
+        The matching metadata dictionaries
+    """
+    if approved is not None:
+        entries = [e for e in entries if bool(e.get("is_approved")) == approved]
+    if query:
+        needle = query.lower()
+        entries = [e for e in entries if needle in (e.get("core_concept") or "").lower()]
+    return entries
+
+
+def page_metadata(
+    entries: List[Dict],
+    offset: int = 0,
+    limit: Optional[int] = None,
+    sort: str = "created_at",
+    descending: bool = True,
+    approved: Optional[bool] = None,
+    query: Optional[str] = None,
+) -> List[Dict]:
+    """Filter, sort and slice prompt metadata held in memory.
+
+    Args:
+        entries: Prompt metadata dictionaries
+        offset: Number of matching prompts to skip
+        limit: Maximum number of prompts to return (None for all)
+        sort: Metadata field to sort by, one of SORT_FIELDS
+        descending: Sort from highest to lowest (newest first for dates)
+        approved: If set, only keep prompts with this approval status
+        query: If set, only keep prompts whose core concept contains it
+
+    Returns:
+        The requested page of metadata dictionaries
+    """
+    if sort not in SORT_FIELDS:
+        raise ValueError(f"Unknown sort field: {sort}")
+
+    entries = filter_metadata(entries, approved, query)
+    entries = sorted(entries, key=lambda e: e.get(sort) or "", reverse=descending)
+    end = None if limit is None else offset + limit
+    return entries[offset:end]
+
+
+# Filtered counts a SortedListing keeps between changes
+_MAX_CACHED_COUNTS = 256
+# Changes a SortedListing applies to its sort orders one by one; larger
+# batches (e.g. a directory scan) re-sort instead
+_MAX_INCREMENTAL = 64
+
+
+def _matches(meta: Dict[str, Any], approved: Optional[bool], needle: Optional[str]) -> bool:
+    """Check one metadata entry against the `filter_metadata` filters (needle lowercased)."""
+    if approved is not None and bool(meta.get("is_approved")) != approved:
+        return False
+    return not needle or needle in (meta.get("core_concept") or "").lower()
+
+
+class SortedListing:
+    """Prompt listing metadata kept in sort order, for paging in O(offset + limit).
+
+    `page_metadata` filters and sorts every entry on each call, so a page
+    of a large store costs O(N log N). A listing keeps, for each sort field
+    asked for so far, the entries sorted by (value, id), updated in place on
+    every change. A page then walks the order from the requested end and
+    stops once it has `offset + limit` matching entries. Counts are cached
+    until the next change.
+
+    Pages are the same as `page_metadata` returns, except that entries with
+    equal sort values come in ID order (reversed when descending).
+    """
+
+    def __init__(self, entries: Optional[Dict[str, Dict[str, Any]]] = None):
+        """Create a listing.
+
+        Args:
+            entries: Initial metadata by prompt ID
+        """
+        self._lock = threading.Lock()
+        self._meta: Dict[str, Dict[str, Any]] = {}
+        # sort field -> (sorted (value, id) keys, metadata in the same order)
+        self._orders: Dict[str, Tuple[List[Tuple[str, str]], List[Dict[str, Any]]]] = {}
+        self._counts: Dict[Tuple[Optional[bool], str], int] = {}
+        self.reset(entries or {})
+
+    def reset(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        """Replace every entry.
+
+        Args:
+            entries: Metadata by prompt ID
+        """
+        with self._lock:
+            self._meta = dict(entries)
+            self._orders.clear()
+            self._counts.clear()
+
+    def put(self, prompt_id: str, meta: Dict[str, Any]) -> None:
+        """Add or replace the metadata of a prompt."""
+        self.update({prompt_id: meta})
+
+    def remove(self, prompt_id: str) -> None:
+        """Forget a prompt (nothing happens if it is not listed)."""
+        self.update({prompt_id: None})
+
+    def update(self, changes: Dict[str, Optional[Dict[str, Any]]]) -> None:
+        """Apply several changes at once.
+
+        Each change is inserted into the sort orders in O(N) (a list insert);
+        a batch larger than `_MAX_INCREMENTAL` drops the orders instead, and
+        the next page re-sorts.
+
+        Args:
+            changes: New metadata by prompt ID, None for removed prompts
+        """
+        with self._lock:
+            if len(changes) > _MAX_INCREMENTAL:
+                self._orders.clear()
+            for prompt_id, meta in changes.items():
+                self._remove(prompt_id)
+                if meta is None:
+                    continue
+                self._meta[prompt_id] = meta
+                for sort, (keys, metas) in self._orders.items():
+                    key = (meta.get(sort) or "", prompt_id)
+                    i = bisect_left(keys, key)
+                    keys.insert(i, key)
+                    metas.insert(i, meta)
+            self._counts.clear()
+
+    def _remove(self, prompt_id: str) -> None:
+        meta = self._meta.pop(prompt_id, None)
+        if meta is None:
+            return
+        for sort, (keys, metas) in self._orders.items():
+            i = bisect_left(keys, (meta.get(sort) or "", prompt_id))
+            del keys[i]
+            del metas[i]
+        self._counts.clear()
+
+    def _order(self, sort: str) -> List[Dict[str, Any]]:
+        order = self._orders.get(sort)
+        if order is None:
+            keys = sorted((meta.get(sort) or "", prompt_id) for prompt_id, meta in self._meta.items())
+            order = self._orders[sort] = (keys, [self._meta[prompt_id] for _, prompt_id in keys])
+        return order[1]
+
+    def page(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        sort: str = "created_at",
+        descending: bool = True,
+        approved: Optional[bool] = None,
+        query: Optional[str] = None,
+    ) -> List[Dict]:
+        """Return one page of metadata; arguments as for `page_metadata`."""
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Unknown sort field: {sort}")
+        needle = query.lower() if query else None
+        with self._lock:
+            metas = self._order(sort)
+            if approved is None and not needle:
+                # No filters: the page is a slice of the order
+                if descending:
+                    start = len(metas) - offset
+                    stop = 0 if limit is None else max(start - limit, 0)
+                    selected = metas[stop:max(start, 0)][::-1]
+                else:
+                    selected = metas[offset:None if limit is None else offset + limit]
+            else:
+                end = None if limit is None else offset + limit
+                selected = []
+                found = 0
+                for meta in reversed(metas) if descending else metas:
+                    if _matches(meta, approved, needle):
+                        if found >= offset:
+                            selected.append(meta)
+                        found += 1
+                        if end is not None and found >= end:
+                            break
+            return [dict(meta) for meta in selected]
+
+    def count(self, approved: Optional[bool] = None, query: Optional[str] = None) -> int:
+        """Count the entries matching the `filter_metadata` filters."""
+        needle = query.lower() if query else ""
+        with self._lock:
+            if approved is None and not needle:
+                return len(self._meta)
+            key = (approved, needle)
+            count = self._counts.get(key)
+            if count is None:
+                if len(self._counts) >= _MAX_CACHED_COUNTS:
+                    self._counts.clear()
+                count = self._counts[key] = sum(1 for meta in self._meta.values() if _matches(meta, approved, needle))
+            return count
+
+    def __len__(self) -> int:
+        return len(self._meta)
@@ -0,0 +1,293 @@
+"""Autosaved drafts of the prompt form, stored as journals of small deltas."""
+import atexit
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+from ..utils.registry import PathRegistry
+from ..utils.reporting import report_error
+from .durability import write_atomic
+
+DRAFTS_PATH_ENV = "COMIC_PROMPT_DRAFTS_PATH"
+DRAFT_INTERVAL_ENV = "COMIC_PROMPT_DRAFT_INTERVAL"
+DEFAULT_DRAFTS_PATH = "saved_drafts"
+
+# Seconds between two writes of the same draft
+DEFAULT_DRAFT_INTERVAL = 5.0
+
+# A journal is rewritten as one snapshot line once it has this many lines
+COMPACT_AFTER = 100
+
+# Drafts not written for this long (seconds) are deleted when a writer starts
+DRAFT_MAX_AGE = 30 * 24 * 3600
+
+_DRAFT_ID = re.compile(r"[0-9a-f]{32}")
+
+
+def new_draft_id() -> str:
+    """Create a random draft ID."""
+    return uuid.uuid4().hex
+
+
+def is_draft_id(value: Any) -> bool:
+    """Check that a value (e.g. from a URL) is a well-formed draft ID."""
+    return isinstance(value, str) and _DRAFT_ID.fullmatch(value) is not None
+
+
+class DraftStore:
+    """Drafts kept as one append-only journal file per draft.
+
+    Each line of `<draft_id>.jsonl` is a JSON object with the form values
+    that changed since the previous line, so a save writes a few bytes
+    instead of the whole form. Loading replays the lines in order. A line
+    cut short by a crash is skipped (the next write starts a new line after
+    it), so a draft always loads up to its last complete write. Long
+    journals are compacted into a single line.
+    """
+
+    def __init__(self, drafts_dir: str = DEFAULT_DRAFTS_PATH):
+        """Initialize the store.
+
+        Args:
+            drafts_dir: Directory of the journal files (created on first write)
+        """
+        self.drafts_dir = Path(drafts_dir)
+        # Lines in each journal this process has read or written
+        self._lines: Dict[str, int] = {}
+        # Journals this process wrote to, which therefore end with a newline
+        self._terminated: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def _path(self, draft_id: str) -> Path:
+        if not is_draft_id(draft_id):
+            raise ValueError(f"Invalid draft ID: {draft_id!r}")
+        return self.drafts_dir / f"{draft_id}.jsonl"
+
+    def load(self, draft_id: str) -> Dict[str, Any]:
+        """Load the latest form values of a draft.
+
+        Args:
+            draft_id: The draft ID
+
+        Returns:
+            Widget key -> value, empty if the draft does not exist
+        """
+        try:
+            data = self._path(draft_id).read_bytes()
+        except FileNotFoundError:
+            return {}
+        state: Dict[str, Any] = {}
+        lines = 0
+        for line in data.splitlines():
+            try:
+                delta = json.loads(line)
+            except ValueError:
+                # A write interrupted by a crash
+                continue
+            if isinstance(delta, dict):
+                state.update(delta)
+                lines += 1
+        with self._lock:
+            self._lines[draft_id] = lines
+        return state
+
+    def append(self, draft_id: str, delta: Dict[str, Any]) -> None:
+        """Append the values that changed to a draft's journal.
+
+        Args:
+            draft_id: The draft ID
+            delta: Widget key -> new value
+        """
+        path = self._path(draft_id)
+        line = (json.dumps(delta, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        self.drafts_dir.mkdir(parents=True, exist_ok=True)
+        with open(path, "ab+") as f:
+            if draft_id not in self._terminated and f.tell() > 0:
+                # A crash may have cut the last line short; start a new line
+                # so this delta is not merged into it
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = b"\n" + line
+            f.write(line)
+        with self._lock:
+            self._terminated.add(draft_id)
+            lines = self._lines[draft_id] = self._lines.get(draft_id, 0) + 1
+        if lines >= COMPACT_AFTER:
+            self.compact(draft_id)
+
+    def compact(self, draft_id: str) -> None:
+        """Rewrite a draft's journal as a single line with its latest values."""
+        state = self.load(draft_id)
+        content = json.dumps(state, ensure_ascii=False, separators=(",", ":")) + "\n"
+        write_atomic(self._path(draft_id), content.encode("utf-8"))
+        with self._lock:
+            self._lines[draft_id] = 1
+            self._terminated.add(draft_id)
+
+    def delete(self, draft_id: str) -> bool:
+        """Delete a draft, returning True if it existed."""
+        with self._lock:
+            self._lines.pop(draft_id, None)
+            self._terminated.discard(draft_id)
+        try:
+            self._path(draft_id).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def expire(self, max_age: float = DRAFT_MAX_AGE) -> int:
+        """Delete the drafts not written for `max_age` seconds.
+
+        Returns:
+            The number of drafts deleted
+        """
+        cutoff = time.time() - max_age
+        deleted = 0
+        try:
+            paths = list(self.drafts_dir.glob("*.jsonl"))
+        except OSError:
+            return 0
+        for path in paths:
+            try:
+                if is_draft_id(path.stem) and path.stat().st_mtime < cutoff and self.delete(path.stem):
+                    deleted += 1
+            except OSError:
+                continue
+        return deleted
+
+
+class DraftWriter:
+    """Debounced, coalescing background writer of draft deltas.
+
+    `update` only merges the changes into the draft's pending delta and
+    returns, so the Streamlit script thread never waits on the disk. A
+    background thread writes each draft's pending delta at most once per
+    `interval` seconds; changes made in between are coalesced (a field
+    edited ten times is written once, with its last value). Pending deltas
+    are written out when the writer is closed, including at interpreter
+    exit.
+    """
+
+    def __init__(self, store: DraftStore, interval: float = DEFAULT_DRAFT_INTERVAL):
+        """Start the writer.
+
+        Args:
+            store: Where the deltas are written
+            interval: Minimum seconds between two writes of the same draft
+        """
+        self.store = store
+        self.interval = interval
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._last_write: Dict[str, float] = {}
+        self._condition = threading.Condition()
+        # Held while a batch is being written, so `discard` can wait for it
+        self._write_lock = threading.Lock()
+        self._closed = False
+        # Number of deltas written (each one a single journal line)
+        self.writes = 0
+        self._thread = threading.Thread(target=self._run, name="draft-writer", daemon=True)
+        self._thread.start()
+
+    def update(self, draft_id: str, changes: Dict[str, Any]) -> None:
+        """Queue changed form values for a draft.
+
+        Args:
+            draft_id: The draft ID
+            changes: Widget key -> new value
+        """
+        with self._condition:
+            pending = self._pending.get(draft_id)
+            if pending is None:
+                self._pending[draft_id] = dict(changes)
+                self._condition.notify()
+            else:
+                pending.update(changes)
+
+    def discard(self, draft_id: str) -> None:
+        """Drop a draft's pending changes and delete its journal.
+
+        Args:
+            draft_id: The draft ID
+        """
+        with self._condition:
+            self._pending.pop(draft_id, None)
+        # A batch taken before the changes were dropped is written first
+        with self._write_lock:
+            self.store.delete(draft_id)
+
+    def _run(self) -> None:
+        self.store.expire()
+        while True:
+            with self._condition:
+                while True:
+                    if not self._pending:
+                        if self._closed:
+                            return
+                        self._condition.wait()
+                        continue
+                    now = time.monotonic()
+                    due = [
+                        draft_id for draft_id in self._pending
+                        if self._closed or now - self._last_write.get(draft_id, -self.interval) >= self.interval
+                    ]
+                    if due:
+                        break
+                    # Sleep until the earliest pending draft may be written
+                    self._condition.wait(min(self._last_write[d] for d in self._pending) + self.interval - now)
+                batch = {draft_id: self._pending.pop(draft_id) for draft_id in due}
+                for draft_id in due:
+                    self._last_write[draft_id] = now
+                # Taken before the changes leave the condition, so `discard`
+                # cannot delete a journal this batch then writes again
+                self._write_lock.acquire()
+
+            try:
+                for draft_id, delta in batch.items():
+                    try:
+                        self.store.append(draft_id, delta)
+                        self.writes += 1
+                    except (OSError, ValueError) as e:
+                        report_error(f"Error saving draft {draft_id}: {str(e)}")
+            finally:
+                self._write_lock.release()
+
+    def close(self) -> None:
+        """Write every pending delta, ignoring the interval, and stop the writer."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+
+# Draft writers shared by every session in this process
+_writers: PathRegistry[DraftWriter] = PathRegistry()
+
+
+def get_draft_writer(drafts_dir: Optional[str] = None, interval: Optional[float] = None) -> DraftWriter:
+    """Get the process-wide draft writer for a directory (creates it if needed).
+
+    Args:
+        drafts_dir: The drafts directory. Defaults to the
+            COMIC_PROMPT_DRAFTS_PATH environment variable, then "saved_drafts".
+        interval: Seconds between writes of one draft. Defaults to the
+            COMIC_PROMPT_DRAFT_INTERVAL environment variable, then 5.
+
+    Returns:
+        The shared DraftWriter (its `store` loads drafts)
+    """
+    drafts_dir = drafts_dir or os.environ.get(DRAFTS_PATH_ENV) or DEFAULT_DRAFTS_PATH
+
+    def create() -> DraftWriter:
+        seconds = interval
+        if seconds is None:
+            seconds = float(os.environ.get(DRAFT_INTERVAL_ENV) or DEFAULT_DRAFT_INTERVAL)
+        writer = DraftWriter(DraftStore(drafts_dir), seconds)
+        atexit.register(writer.close)
+        return writer
+
+    return _writers.shared(drafts_dir, create)
@@ -0,0 +1,176 @@
+"""Atomic file writes and fsync policies for file based storage."""
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from ..utils.registry import PathRegistry
+
+# How hard a write tries to reach the disk before it returns:
+#   "none"   - atomic replace only; survives process crashes, but the last
+#              writes can be lost (or empty) after a power failure
+#   "always" - fsync every file and the directory before returning
+#   "group"  - like "always", but saves waiting at the same time share one
+#              flush (group commit)
+FSYNC_POLICIES = ("none", "always", "group")
+
+# (temporary file, final path) pairs waiting to be moved into place
+PendingWrite = Tuple[Path, Path]
+
+
+def temp_path(path: Path) -> Path:
+    """Return a unique temporary path next to `path`.
+
+    The name starts with a dot and ends in ".tmp", so a half-written file is
+    never picked up by a directory listing of prompt files.
+    """
+    return path.with_name(f".{path.name}.{uuid.uuid4().hex[:12]}.tmp")
+
+
+def write_temp(path: Path, content: bytes) -> Path:
+    """Write `content` to a new temporary file next to `path` and return it."""
+    tmp_path = temp_path(path)
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    return tmp_path
+
+
+def fsync_file(path: Path) -> None:
+    """Flush a file's contents to disk."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_directory(directory: Path) -> None:
+    """Flush a directory entry table to disk, making renames durable.
+
+    Windows cannot open directories and has no equivalent, so this is a
+    no-op there.
+    """
+    if os.name == "nt":
+        return
+    fsync_file(directory)
+
+
+def commit_writes(directory: Path, writes: Sequence[PendingWrite], fsync: bool) -> None:
+    """Move written temporary files into place.
+
+    Args:
+        directory: The directory holding the files
+        writes: (temporary file, final path) pairs, replaced in order
+        fsync: Flush every file before its rename, and the directory once
+            after all of them
+    """
+    try:
+        if fsync:
+            for tmp_path, _ in writes:
+                fsync_file(tmp_path)
+        for tmp_path, path in writes:
+            os.replace(tmp_path, path)
+    except OSError:
+        for tmp_path, _ in writes:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+        raise
+    if fsync:
+        fsync_directory(directory)
+
+
+def write_atomic(path: Path, content: bytes, fsync: bool = False) -> None:
+    """Replace the contents of `path` so readers see the old or new file, never a part.
+
+    Args:
+        path: The file to write
+        content: The new contents
+        fsync: Also make the write durable before returning
+    """
+    commit_writes(path.parent, [(write_temp(path, content), path)], fsync)
+
+
+class GroupCommit:
+    """Group commit of durable file writes into one directory.
+
+    Writers hand in temporary files that are already written. The first
+    writer to arrive becomes the leader and commits everything queued so
+    far: it fsyncs the files, renames them into place and fsyncs the
+    directory once. Writers arriving meanwhile queue up for the next batch,
+    which one of them leads as soon as the current flush is done. Every
+    writer returns only once its own batch is on disk, so the guarantee is
+    the same as fsyncing each write, while a burst of concurrent saves pays
+    for about one flush instead of one each.
+    """
+
+    def __init__(self, directory: Path):
+        """Initialize the group commit.
+
+        Args:
+            directory: The directory the committed files live in
+        """
+        self.directory = directory
+        self._cond = threading.Condition()
+        self._pending: List[PendingWrite] = []
+        # Batch currently being collected, and the last batch on disk
+        self._batch = 1
+        self._committed = 0
+        self._leading = False
+        # Shared by the writers of the batch being collected; the leader
+        # stores the error there if committing the batch failed
+        self._outcome: List[Optional[OSError]] = [None]
+        # Counters for benchmarks and diagnostics
+        self.batches = 0
+        self.writes = 0
+
+    def commit(self, writes: Sequence[PendingWrite]) -> None:
+        """Commit temporary files, returning once they are durable.
+
+        Args:
+            writes: (temporary file, final path) pairs
+
+        Raises:
+            OSError: If flushing or renaming the batch failed
+        """
+        with self._cond:
+            self._pending.extend(writes)
+            batch, outcome = self._batch, self._outcome
+            while self._committed < batch:
+                if self._leading:
+                    self._cond.wait()
+                    continue
+                self._lead()
+        if outcome[0] is not None:
+            raise outcome[0]
+
+    def _lead(self) -> None:
+        """Commit the batch being collected (called with the condition held)."""
+        batch, pending, outcome = self._batch, self._pending, self._outcome
+        self._batch += 1
+        self._pending = []
+        self._outcome = [None]
+        self._leading = True
+        self._cond.release()
+        try:
+            commit_writes(self.directory, pending, fsync=True)
+        except OSError as e:
+            outcome[0] = e
+        finally:
+            self._cond.acquire()
+            self._leading = False
+            self._committed = batch
+            self.batches += 1
+            self.writes += len(pending)
+            self._cond.notify_all()
+
+
+# Group commits shared by every storage object writing to a directory
+_group_commits: PathRegistry[GroupCommit] = PathRegistry()
+
+
+def get_group_commit(directory: Path) -> GroupCommit:
+    """Get the process-wide group commit for a directory (creates it if needed)."""
+    return _group_commits.shared(directory, lambda: GroupCommit(directory))
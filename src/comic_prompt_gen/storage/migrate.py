@@ -0,0 +1,88 @@
+"""Bulk-import a directory of JSON prompt files into a SQLite database.
+
+Usage:
+    python -m comic_prompt_gen.storage.migrate saved_prompts saved_prompts.db
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from ..core.models import ComicPrompt
+from .base import prompt_from_json
+from .sqlite_storage import SQLitePromptStorage
+
+
+def iter_json_prompts(source_dir: Path, errors: List[Tuple[Path, str]]) -> Iterator[ComicPrompt]:
+    """Yield every valid prompt stored as a JSON file in a directory.
+
+    Args:
+        source_dir: Directory containing `<id>.json` prompt files
+        errors: List that receives (path, message) for files that fail to load
+
+    Yields:
+        The validated ComicPrompt objects
+    """
+    for path in sorted(source_dir.glob("*.json")):
+        try:
+            prompt = prompt_from_json(path.read_bytes(), trusted=True)
+        except Exception as e:
+            errors.append((path, str(e)))
+            continue
+
+        # Files written by PromptStorage are named after the prompt ID
+        if prompt.id is None:
+            prompt.id = path.stem
+        yield prompt
+
+
+def migrate_json_to_sqlite(source_dir: Path, db_path: Path, batch_size: int = 500) -> Tuple[int, List[Tuple[Path, str]]]:
+    """Import all JSON prompt files from a directory into a SQLite database.
+
+    Prompts keep their IDs and timestamps; re-running the migration replaces
+    rows with the same ID instead of duplicating them.
+
+    Args:
+        source_dir: Directory containing `<id>.json` prompt files
+        db_path: Path of the SQLite database file (created if missing)
+        batch_size: Number of prompts written per transaction
+
+    Returns:
+        A tuple of (number of prompts imported, list of (path, error) pairs)
+    """
+    storage = SQLitePromptStorage(str(db_path))
+    errors: List[Tuple[Path, str]] = []
+    imported = 0
+
+    batch: List[ComicPrompt] = []
+    for prompt in iter_json_prompts(source_dir, errors):
+        batch.append(prompt)
+        if len(batch) >= batch_size:
+            imported += storage.save_many(batch)
+            batch = []
+    if batch:
+        imported += storage.save_many(batch)
+
+    return imported, errors
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for the migration."""
+    parser = argparse.ArgumentParser(description="Import JSON prompt files into a SQLite database.")
+    parser.add_argument("source_dir", type=Path, help="Directory with saved JSON prompts")
+    parser.add_argument("db_path", type=Path, help="SQLite database file to import into")
+    parser.add_argument("--batch-size", type=int, default=500, help="Prompts per transaction")
+    args = parser.parse_args(argv)
+
+    if not args.source_dir.is_dir():
+        parser.error(f"{args.source_dir} is not a directory")
+
+    imported, errors = migrate_json_to_sqlite(args.source_dir, args.db_path, args.batch_size)
+    for path, message in errors:
+        print(f"skipped {path}: {message}", file=sys.stderr)
+    print(f"imported {imported} prompts into {args.db_path} ({len(errors)} skipped)")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,351 @@
+"""Persistent metadata index for saved prompt files."""
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..utils.registry import PathRegistry
+from .base import SortedListing
+
+logger = logging.getLogger(__name__)
+
+# The index file deliberately does not end in ".json" so it never shows up
+# when the storage directory is globbed for prompt files.
+INDEX_FILENAME = ".prompt_index"
+INDEX_VERSION = 1
+
+# Adding or removing files changes the directory mtime, which `refresh` checks
+# on every call; in-place edits made outside the application do not, so the
+# directory is rescanned at least this often (seconds).
+FULL_SCAN_INTERVAL = 30.0
+
+# The index file is only a cache of the prompt files, so between scans it is
+# rewritten at most this often (seconds) instead of after every change.
+PERSIST_INTERVAL = 5.0
+
+# Calls passing this as `max_age` to `refresh` skip the directory check if
+# one was made this recently (seconds)
+RECHECK_INTERVAL = 1.0
+
+# Fields copied from each prompt file into the index
+METADATA_FIELDS = ("id", "core_concept", "created_at", "updated_at", "is_approved")
+
+
+def extract_metadata(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the listing metadata from a serialized prompt.
+
+    Args:
+        data: The prompt data as written to (or read from) a prompt file
+
+    Returns:
+        A dictionary with the metadata fields used for listing
+    """
+    created_at = data.get("created_at")
+    updated_at = data.get("updated_at")
+    return {
+        "id": data.get("id"),
+        "core_concept": data.get("core_concept", "Untitled"),
+        "created_at": str(created_at) if created_at is not None else None,
+        "updated_at": str(updated_at) if updated_at is not None else None,
+        "is_approved": data.get("is_approved", False),
+    }
+
+
+def _listing_meta(entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The listing metadata of an index entry, None for an invalid file."""
+    if entry.get("invalid"):
+        return None
+    return {field: entry.get(field) for field in METADATA_FIELDS}
+
+
+class PromptIndex:
+    """Metadata catalog for a directory of prompt files.
+
+    The catalog keeps one entry per prompt file together with the file's
+    mtime and size. Entries are kept current by the storage layer on save and
+    delete; edits made outside the application are picked up by `refresh`,
+    which only re-parses files whose mtime or size changed.
+
+    Instances are shared per directory through `get_prompt_index`, so every
+    storage object (and every Streamlit session) in the process works on the
+    same catalog.
+    """
+
+    def __init__(self, storage_dir: Path):
+        """Initialize the index.
+
+        Args:
+            storage_dir: Directory containing the prompt files
+        """
+        self.storage_dir = storage_dir
+        self.index_path = storage_dir / INDEX_FILENAME
+        # Entries keyed by file stem (which is the prompt ID for our own files)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        # The valid entries in sort order, for listing pages
+        self._listing = SortedListing()
+        self._loaded = False
+        self._dirty = False
+        # Directory mtime seen by the last scan (or our own last change)
+        self._dir_mtime = None
+        self._scanned_at = 0.0
+        self._checked_at = 0.0
+        self._persisted_at = 0.0
+        self._lock = threading.RLock()
+
+    def _load(self) -> None:
+        """Load the persisted index from disk, if present."""
+        self._loaded = True
+        if not self.index_path.exists():
+            self._dirty = True
+            return
+
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            # A corrupt index is simply rebuilt from the prompt files
+            self._dirty = True
+            return
+
+        if payload.get("version") != INDEX_VERSION:
+            self._dirty = True
+            return
+
+        self._entries = payload.get("entries", {})
+        self._listing.reset({
+            stem: _listing_meta(entry) for stem, entry in self._entries.items() if not entry.get("invalid")
+        })
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self._load()
+
+    def _persist(self) -> None:
+        """Write the index to disk if it changed since the last write."""
+        if not self._dirty:
+            return
+
+        tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        payload = {"version": INDEX_VERSION, "entries": self._entries}
+        # The index file lives in the directory it indexes
+        dir_mtime = self.dir_mtime()
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.index_path)
+            self._dirty = False
+            self._persisted_at = time.monotonic()
+            self._mark_own_change(dir_mtime)
+        except OSError:
+            # The in-memory index is still valid; try again on the next refresh
+            pass
+
+    @staticmethod
+    def _read_entry(path: Path, stat: os.stat_result) -> Dict[str, Any]:
+        """Parse a prompt file into an index entry."""
+        entry: Dict[str, Any] = {"mtime": stat.st_mtime_ns, "size": stat.st_size}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            entry.update(extract_metadata(data))
+        except (OSError, ValueError, AttributeError) as e:
+            # Remember invalid files too, so they are not re-parsed (or
+            # reported) again until they change
+            logger.warning("Skipping unreadable prompt file %s: %s", path, e)
+            entry["invalid"] = True
+        return entry
+
+    def dir_mtime(self) -> Optional[int]:
+        """Return the mtime of the storage directory, or None if it is gone.
+
+        Read it just before changing the directory and pass it to `upsert`
+        or `remove_many` along with the change.
+        """
+        try:
+            return os.stat(self.storage_dir).st_mtime_ns
+        except OSError:
+            return None
+
+    def refresh(self, force: bool = False, max_age: float = 0.0) -> None:
+        """Bring the index up to date with the files on disk.
+
+        The directory is only scanned when its mtime changed since the last
+        scan, when the last full scan is older than FULL_SCAN_INTERVAL, or
+        when forced. Only files that are new or whose mtime/size changed are
+        parsed.
+
+        Args:
+            force: Scan the directory even if nothing seems to have changed
+            max_age: Skip the check if the last one is younger than this
+                (seconds)
+        """
+        with self._lock:
+            self._ensure_loaded()
+            now = time.monotonic()
+            if not force and now - self._checked_at < max_age:
+                return
+            self._checked_at = now
+            dir_mtime = self.dir_mtime()
+            if (
+                not force
+                and dir_mtime is not None
+                and dir_mtime == self._dir_mtime
+                and time.monotonic() - self._scanned_at < FULL_SCAN_INTERVAL
+            ):
+                if time.monotonic() - self._persisted_at >= PERSIST_INTERVAL:
+                    self._persist()
+                return
+
+            self._scan()
+            self._dir_mtime = dir_mtime
+            self._scanned_at = time.monotonic()
+            self._persist()
+
+    def _scan(self) -> None:
+        """Compare the index with a listing of the directory."""
+        seen = set()
+        changes: Dict[str, Optional[Dict[str, Any]]] = {}
+        with os.scandir(self.storage_dir) as it:
+            for dir_entry in it:
+                name = dir_entry.name
+                if not name.endswith(".json") or not dir_entry.is_file():
+                    continue
+                stem = name[:-5]
+                seen.add(stem)
+                try:
+                    stat = dir_entry.stat()
+                except OSError:
+                    continue
+
+                entry = self._entries.get(stem)
+                if (
+                    entry is None
+                    or entry["mtime"] != stat.st_mtime_ns
+                    or entry["size"] != stat.st_size
+                ):
+                    entry = self._entries[stem] = self._read_entry(Path(dir_entry.path), stat)
+                    changes[stem] = _listing_meta(entry)
+                    self._dirty = True
+
+        removed = self._entries.keys() - seen
+        for stem in removed:
+            del self._entries[stem]
+            changes[stem] = None
+        if removed:
+            self._dirty = True
+        self._listing.update(changes)
+
+    def upsert(self, stem: str, data: Dict[str, Any], path: Path, dir_mtime_before: Optional[int] = None) -> None:
+        """Record a prompt file that was just written.
+
+        Args:
+            stem: The file stem (prompt ID) of the prompt file
+            data: The serialized prompt data that was written
+            path: The path of the written file
+            dir_mtime_before: `dir_mtime()` read before the file was written
+        """
+        try:
+            stat = path.stat()
+        except OSError:
+            return
+        entry = {"mtime": stat.st_mtime_ns, "size": stat.st_size}
+        entry.update(extract_metadata(data))
+        with self._lock:
+            self._ensure_loaded()
+            self._entries[stem] = entry
+            self._listing.put(stem, _listing_meta(entry))
+            self._dirty = True
+            self._mark_own_change(dir_mtime_before)
+
+    def remove(self, stem: str, dir_mtime_before: Optional[int] = None) -> None:
+        """Forget a prompt file that was deleted.
+
+        Args:
+            stem: The file stem (prompt ID) of the deleted prompt file
+            dir_mtime_before: `dir_mtime()` read before the file was deleted
+        """
+        self.remove_many([stem], dir_mtime_before)
+
+    def remove_many(self, stems: Iterable[str], dir_mtime_before: Optional[int] = None) -> None:
+        """Forget several prompt files that were deleted.
+
+        Args:
+            stems: The file stems (prompt IDs) of the deleted prompt files
+            dir_mtime_before: `dir_mtime()` read before the files were deleted
+        """
+        with self._lock:
+            self._ensure_loaded()
+            removed = {}
+            for stem in stems:
+                if self._entries.pop(stem, None) is not None:
+                    removed[stem] = None
+                    self._dirty = True
+            self._listing.update(removed)
+            self._mark_own_change(dir_mtime_before)
+
+    def _mark_own_change(self, dir_mtime_before: Optional[int]) -> None:
+        """Accept the directory mtime after a change this index already applied.
+
+        Without this every save or delete would make the next `refresh` scan
+        the whole directory. The new mtime is only accepted if the directory
+        still had the mtime of the last check when the change started;
+        otherwise files were added or removed by someone else in between,
+        and the next `refresh` scans. Changes made by others while the
+        change itself is being written are picked up by the next full scan.
+        """
+        with self._lock:
+            if self._dir_mtime is not None and dir_mtime_before == self._dir_mtime:
+                self._dir_mtime = self.dir_mtime()
+
+    def page(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        sort: str = "created_at",
+        descending: bool = True,
+        approved: Optional[bool] = None,
+        query: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return one page of the valid prompts' metadata (see `SortedListing.page`)."""
+        with self._lock:
+            self._ensure_loaded()
+        return self._listing.page(offset, limit, sort, descending, approved, query)
+
+    def count(self, approved: Optional[bool] = None, query: Optional[str] = None) -> int:
+        """Count the valid prompts matching the filters (see `SortedListing.count`)."""
+        with self._lock:
+            self._ensure_loaded()
+        return self._listing.count(approved, query)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Return the metadata of all valid prompt files.
+
+        Returns:
+            List of metadata dictionaries (without file stat fields)
+        """
+        with self._lock:
+            self._ensure_loaded()
+            return [
+                {field: entry.get(field) for field in METADATA_FIELDS}
+                for entry in self._entries.values()
+                if not entry.get("invalid")
+            ]
+
+
+# One index per directory, shared by every storage instance in the process
+_indexes: PathRegistry[PromptIndex] = PathRegistry()
+
+
+def get_prompt_index(storage_dir: Path) -> PromptIndex:
+    """Get the shared metadata index for a directory of prompt files.
+
+    Args:
+        storage_dir: Directory containing the prompt files
+
+    Returns:
+        The process-wide PromptIndex for that directory
+    """
+    return _indexes.shared(storage_dir, lambda: PromptIndex(storage_dir))
@@ -1,28 +1,84 @@
 """Storage functionality for saving and loading user prompts."""
 import os
 import json
+import threading
 import uuid
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from pathlib import Path
 
-import streamlit as st
+from ..core.models import SCHEMA_VERSION, ComicPrompt
+from ..utils.registry import PathRegistry
+from ..utils.reporting import report_error
+from .base import PromptStore, is_valid_prompt_id, prompt_from_data, prompt_from_json
+from .durability import FSYNC_POLICIES, PendingWrite, commit_writes, get_group_commit, write_temp
+from .prompt_index import RECHECK_INTERVAL, extract_metadata, get_prompt_index
+from .search_index import get_search_index, search_storage
 
-from ..core.models import ComicPrompt
+# Environment variables selecting the storage backend used by the app
+STORAGE_BACKEND_ENV = "COMIC_PROMPT_STORAGE_BACKEND"
+STORAGE_PATH_ENV = "COMIC_PROMPT_STORAGE_PATH"
+# Fsync policy of the json backend ("none", "always" or "group")
+STORAGE_FSYNC_ENV = "COMIC_PROMPT_STORAGE_FSYNC"
+
+# Default storage location of each backend
+_DEFAULT_PATHS = {
+    "json": "saved_prompts",
+    "sqlite": "saved_prompts.db",
+    "archive": "saved_prompts.archive",
+}
+
+
+# One write lock per storage directory
+_directory_locks: PathRegistry[threading.Lock] = PathRegistry()
+
+
+def _directory_lock(storage_dir: Path) -> threading.Lock:
+    """Get the lock serializing writes to a storage directory."""
+    return _directory_locks.shared(storage_dir, threading.Lock)
 
 
 class PromptStorage:
-    """Storage manager for comic prompts."""
+    """Storage manager for comic prompts kept as one JSON file per prompt."""
     
-    def __init__(self, storage_dir: str = "saved_prompts"):
+    def __init__(self, storage_dir: str = "saved_prompts", fsync: Optional[str] = None):
         """Initialize the storage manager.
         
+        Prompt files are always written to a temporary file first and then
+        renamed over the old one, so readers never see a partial file.
+        
         Args:
             storage_dir: Directory to store prompt files
+            fsync: When saves are flushed to disk, one of FSYNC_POLICIES.
+                Defaults to the COMIC_PROMPT_STORAGE_FSYNC environment
+                variable, then "none".
         """
+        fsync = (fsync or os.environ.get(STORAGE_FSYNC_ENV) or "none").lower()
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.fsync = fsync
         self.storage_dir = Path(storage_dir)
         # Create storage directory if it doesn't exist
         self.storage_dir.mkdir(parents=True, exist_ok=True)
+        # Metadata catalog used for listing without parsing every file,
+        # shared with every other storage instance for this directory
+        self.index = get_prompt_index(self.storage_dir)
+        # Full-text index, kept current on save and delete
+        self.search_index = get_search_index(self.storage_dir / ".search_index", self.index)
+        # Serializes writes to this directory across threads (sessions)
+        self._write_lock = _directory_lock(self.storage_dir)
+        # Concurrent durable saves to this directory share one flush
+        self._group_commit = get_group_commit(self.storage_dir) if fsync == "group" else None
+    
+    def _path(self, prompt_id: str) -> Path:
+        """Path of a prompt's file.
+        
+        Raises:
+            ValueError: If the ID could name a file outside the storage directory
+        """
+        if not is_valid_prompt_id(prompt_id):
+            raise ValueError(f"Invalid prompt ID: {prompt_id!r}")
+        return self.storage_dir / f"{prompt_id}.json"
     
     def save_prompt(self, prompt: ComicPrompt) -> str:
         """Save a prompt to storage.
@@ -40,63 +96,122 @@ class PromptStorage:
         # Update timestamp
         prompt.updated_at = datetime.now()
         
-        # Prepare filename
-        filename = f"{prompt.id}.json"
-        filepath = self.storage_dir / filename
+        self._write([prompt])
+        return prompt.id
+    
+    def save_many(self, prompts: Iterable[ComicPrompt]) -> int:
+        """Save many prompts as one batch, keeping their timestamps.
         
-        # Save to file
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(prompt.model_dump(), f, default=str, ensure_ascii=False, indent=2)
+        With the "always" and "group" fsync policies the whole batch is
+        flushed together instead of once per prompt.
         
-        return prompt.id
+        Args:
+            prompts: The ComicPrompt objects to save
+            
+        Returns:
+            The number of prompts saved
+        """
+        prompts = list(prompts)
+        for prompt in prompts:
+            if prompt.id is None:
+                prompt.id = str(uuid.uuid4())
+        self._write(prompts)
+        return len(prompts)
     
-    def load_prompt(self, prompt_id: str) -> Optional[ComicPrompt]:
+    def _write(self, prompts: List[ComicPrompt]) -> None:
+        """Write prompt files atomically under the fsync policy and index them."""
+        writes: List[PendingWrite] = []
+        saved = []
+        dir_mtime = self.index.dir_mtime()
+        try:
+            for prompt in prompts:
+                filepath = self._path(prompt.id)
+                data = {"schema_version": SCHEMA_VERSION, **prompt.model_dump()}
+                content = json.dumps(data, default=str, ensure_ascii=False, indent=2).encode("utf-8")
+                writes.append((write_temp(filepath, content), filepath))
+                saved.append((prompt, data, filepath))
+        except (OSError, ValueError):
+            for tmp_path, _ in writes:
+                tmp_path.unlink(missing_ok=True)
+            raise
+        
+        if self._group_commit is not None:
+            self._group_commit.commit(writes)
+        with self._write_lock:
+            if self._group_commit is None:
+                commit_writes(self.storage_dir, writes, fsync=self.fsync == "always")
+            for prompt, data, filepath in saved:
+                self.index.upsert(prompt.id, data, filepath, dir_mtime)
+                self.search_index.add(prompt, extract_metadata(data))
+    
+    def load_prompt(self, prompt_id: str, trusted: bool = False) -> Optional[ComicPrompt]:
         """Load a prompt from storage.
         
         Args:
             prompt_id: The ID of the prompt to load
+            trusted: Parse and validate the file in a single pass (for files
+                written by this application, e.g. bulk loads and exports)
             
         Returns:
             The loaded ComicPrompt object, or None if not found
         """
-        filepath = self.storage_dir / f"{prompt_id}.json"
+        if not is_valid_prompt_id(prompt_id):
+            return None
+        filepath = self._path(prompt_id)
         
         if not filepath.exists():
             return None
         
         try:
+            if trusted:
+                return prompt_from_json(filepath.read_bytes(), trusted=True)
             with open(filepath, "r", encoding="utf-8") as f:
                 data = json.load(f)
-                return ComicPrompt.model_validate(data)
+                return prompt_from_data(data)
         except Exception as e:
-            st.error(f"Error loading prompt: {e}")
+            report_error(f"Error loading prompt: {e}")
             return None
     
-    def list_prompts(self) -> List[Dict]:
-        """List all saved prompts with basic metadata.
+    def list_prompts(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        sort: str = "created_at",
+        descending: bool = True,
+        approved: Optional[bool] = None,
+        query: Optional[str] = None,
+    ) -> List[Dict]:
+        """List saved prompts with basic metadata, one page at a time.
+        
+        Args:
+            offset: Number of matching prompts to skip
+            limit: Maximum number of prompts to return (None for all)
+            sort: Metadata field to sort by ("created_at", "updated_at" or "core_concept")
+            descending: Sort from highest to lowest (newest first for dates)
+            approved: If set, only list prompts with this approval status
+            query: If set, only list prompts whose core concept contains it
         
         Returns:
-            List of prompt metadata (id, title, creation date)
+            List of prompt metadata (id, title, creation/update dates, approval)
         """
-        prompts = []
-        
-        for file in self.storage_dir.glob("*.json"):
-            try:
-                with open(file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    prompts.append({
-                        "id": data.get("id"),
-                        "core_concept": data.get("core_concept", "Untitled"),
-                        "created_at": data.get("created_at"),
-                        "is_approved": data.get("is_approved", False)
-                    })
-            except Exception:
-                # Skip invalid files
-                continue
-        
-        # Sort by creation date, newest first
-        prompts.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-        return prompts
+        # Pick up files added, changed or removed outside this storage instance
+        self.index.refresh()
+        return self.index.page(offset, limit, sort, descending, approved, query)
+    
+    def count_prompts(self, approved: Optional[bool] = None, query: Optional[str] = None) -> int:
+        """Count saved prompts matching the given filters.
+        
+        Args:
+            approved: If set, only count prompts with this approval status
+            query: If set, only count prompts whose core concept contains it
+        
+        Returns:
+            The number of matching prompts
+        """
+        # A count usually follows a page of the same listing, which has
+        # just checked the directory
+        self.index.refresh(max_age=RECHECK_INTERVAL)
+        return self.index.count(approved, query)
     
     def delete_prompt(self, prompt_id: str) -> bool:
         """Delete a prompt from storage.
@@ -107,26 +222,118 @@ class PromptStorage:
         Returns:
             True if deleted successfully, False otherwise
         """
-        filepath = self.storage_dir / f"{prompt_id}.json"
+        if not is_valid_prompt_id(prompt_id):
+            return False
+        filepath = self._path(prompt_id)
         
         if not filepath.exists():
             return False
         
         try:
-            filepath.unlink()
+            with self._write_lock:
+                dir_mtime = self.index.dir_mtime()
+                filepath.unlink()
+                self.index.remove(prompt_id, dir_mtime)
+                self.search_index.remove_many([prompt_id])
             return True
         except Exception:
             return False
+    
+    def delete_prompts(self, prompt_ids: Iterable[str]) -> int:
+        """Delete several prompts, updating the listing once.
+        
+        Args:
+            prompt_ids: The IDs of the prompts to delete
+            
+        Returns:
+            The number of prompts deleted
+        """
+        deleted = []
+        with self._write_lock:
+            dir_mtime = self.index.dir_mtime()
+            for prompt_id in prompt_ids:
+                try:
+                    self._path(prompt_id).unlink()
+                except (OSError, ValueError):
+                    continue
+                deleted.append(prompt_id)
+            
+            self.index.remove_many(deleted, dir_mtime)
+            self.search_index.remove_many(deleted)
+        return len(deleted)
 
+    def search_prompts(self, query: str, approved: Optional[bool] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Full-text search over saved prompts.
+        
+        Args:
+            query: The search text (words, or Chinese text of any length)
+            approved: If set, only return prompts with this approval status
+            limit: Maximum number of results (None for all)
+        
+        Returns:
+            Metadata of the matching prompts with a relevance "score", best first
+        """
+        return search_storage(self, self.search_index, query, approved, limit)
+
+
+def _resolve_backend(backend: Optional[str], path: Optional[str]) -> Tuple[str, str]:
+    """Fill in the backend name and path from the environment and defaults."""
+    backend = (backend or os.environ.get(STORAGE_BACKEND_ENV) or "json").lower()
+    if backend not in _DEFAULT_PATHS:
+        raise ValueError(f"Unknown storage backend: {backend}")
+    return backend, path or os.environ.get(STORAGE_PATH_ENV) or _DEFAULT_PATHS[backend]
+
+
+def create_storage(backend: Optional[str] = None, path: Optional[str] = None) -> PromptStore:
+    """Create a storage backend.
+
+    Args:
+        backend: "json" (one file per prompt), "sqlite" or "archive" (compact
+            append-only archive). Defaults to the COMIC_PROMPT_STORAGE_BACKEND
+            environment variable, then "json".
+        path: Storage directory (json, archive) or database file (sqlite).
+            Defaults to the COMIC_PROMPT_STORAGE_PATH environment variable.
 
-# Create a session-based storage instance
-def get_storage() -> PromptStorage:
-    """Get the PromptStorage instance (creates one if needed).
-    
     Returns:
-        The PromptStorage instance
+        The storage backend instance
     """
-    if "prompt_storage" not in st.session_state:
-        st.session_state.prompt_storage = PromptStorage()
+    backend, path = _resolve_backend(backend, path)
+
+    if backend == "sqlite":
+        from .sqlite_storage import SQLitePromptStorage
+        return SQLitePromptStorage(path)
+    if backend == "archive":
+        from .archive import ArchivePromptStorage
+        return ArchivePromptStorage(path)
+    return PromptStorage(path)
+
+
+# Storage backends shared by every Streamlit session (script thread) in the
+# process, one registry per backend
+_storages: Dict[str, PathRegistry[PromptStore]] = {backend: PathRegistry() for backend in _DEFAULT_PATHS}
+
+
+def get_shared_storage(backend: Optional[str] = None, path: Optional[str] = None) -> PromptStore:
+    """Get the process-wide storage backend for a location (creates it if needed).
+
+    Args:
+        backend: The backend name, as for `create_storage`
+        path: The storage path, as for `create_storage`
+
+    Returns:
+        The storage backend shared by all sessions
+    """
+    backend, path = _resolve_backend(backend, path)
+    return _storages[backend].shared(path, lambda: create_storage(backend, path))
+
+
+def get_storage() -> PromptStore:
+    """Get the storage instance shared by every session.
     
-    return st.session_state.prompt_storage 
\ No newline at end of file
+    The backend and location come from the COMIC_PROMPT_STORAGE_BACKEND and
+    COMIC_PROMPT_STORAGE_PATH environment variables.
+    
+    Returns:
+        The configured storage backend
+    """
+    return get_shared_storage()
@@ -0,0 +1,488 @@
+"""Full-text search index over saved prompts.
+
+Text is lower-cased and split into words; runs of CJK characters (which have
+no spaces between words) are indexed as overlapping character bigrams, so
+"猫咪打扰" is found by "猫咪", "咪打" or "打扰". Queries match prompts that
+contain every query term and are ranked with BM25.
+
+Postings are kept in typed arrays (document numbers, term frequencies and
+weights) rather than dictionaries, so an index over 100k prompts stays around
+a hundred megabytes. Deleted and replaced prompts leave dead postings behind that are
+skipped at query time and dropped when the index is compacted.
+"""
+import array
+import bisect
+import heapq
+import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..core.models import ComicPrompt
+from ..utils.registry import PathRegistry
+
+# Prompt fields that are indexed, with the weight of a term found in them
+PROMPT_FIELD_WEIGHTS = {
+    "core_concept": 3.0,
+    "comic_title": 2.0,
+    "overall_scene": 1.0,
+    "content_summary_char": 1.0,
+    "content_summary_action": 1.0,
+}
+PANEL_FIELD_WEIGHTS = {"desc": 1.0, "text": 1.0}
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Up to this many prompts, term weights follow the average document length
+# on every change
+SMALL_INDEX = 1024
+
+INDEX_MAGIC = b"CPGSRCH\x01"
+INDEX_VERSION = 1
+
+# The index file is a cache of the storage, so it is rewritten at most this
+# often (seconds); prompts saved after the last write are picked up by `sync`.
+PERSIST_INTERVAL = 10.0
+
+# Hiragana/katakana, CJK ideographs and hangul
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+_TOKEN_RE = re.compile(f"([{_CJK}]+)|([^\\W_{_CJK}]+)")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into index terms.
+
+    Args:
+        text: The text to tokenize
+
+    Returns:
+        Lower-cased words, and character bigrams for runs of CJK text (a lone
+        CJK character is kept as a single-character term)
+    """
+    tokens: List[str] = []
+    for cjk, word in _TOKEN_RE.findall(text.lower()):
+        if word:
+            tokens.append(word)
+        elif len(cjk) == 1:
+            tokens.append(cjk)
+        else:
+            tokens.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+    return tokens
+
+
+def prompt_terms(prompt: ComicPrompt) -> Dict[str, float]:
+    """Collect the weighted term frequencies of a prompt."""
+    # Fields sharing a weight are tokenized together
+    texts: Dict[float, List[str]] = {}
+    for name, weight in PROMPT_FIELD_WEIGHTS.items():
+        texts.setdefault(weight, []).append(getattr(prompt, name) or "")
+    for panel in prompt.panels.values():
+        for name, weight in PANEL_FIELD_WEIGHTS.items():
+            texts.setdefault(weight, []).append(getattr(panel, name) or "")
+
+    terms: Dict[str, float] = {}
+    for weight, parts in texts.items():
+        for token, count in Counter(tokenize("\n".join(parts))).items():
+            terms[token] = terms.get(token, 0.0) + count * weight
+    return terms
+
+
+def metadata_stamp(meta: Dict[str, Any]) -> str:
+    """The version stamp of a prompt in a listing: its last update time."""
+    return str(meta.get("updated_at") or meta.get("created_at") or "")
+
+
+class SearchIndex:
+    """An incrementally updated BM25 index of saved prompts.
+
+    Each indexed prompt gets a document number; prompt IDs, listing metadata
+    and lengths are kept per document number. The postings of a term hold
+    document numbers in increasing order, the weighted term frequencies and
+    the BM25 term weights derived from them, so scoring a query is a sum of
+    precomputed weights times the terms' IDF.
+
+    Term weights depend on the average document length, which is fixed when
+    weights are computed: it is refreshed while the index is small, and on
+    compaction and load.
+    """
+
+    def __init__(self, path: Optional[Path] = None, directory_index: Any = None):
+        """Initialize the index.
+
+        Args:
+            path: File the index is persisted to (None keeps it in memory)
+            directory_index: The PromptIndex of the prompt directory the
+                index file is kept in, if any. Writing the file changes the
+                directory's mtime, which that index is told about so it does
+                not rescan the directory.
+        """
+        self.path = path
+        self.directory_index = directory_index
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+        self._ids: List[Optional[str]] = []
+        self._meta: List[Optional[Dict[str, Any]]] = []
+        self._lengths = array.array("f")
+        self._docs: Dict[str, int] = {}
+        # term -> (document numbers, term frequencies, BM25 term weights)
+        self._postings: Dict[str, Tuple[array.array, array.array, array.array]] = {}
+        self._total_length = 0.0
+        self._weight_average = 0.0
+        self._dirty = False
+        self._persisted_at = 0.0
+        self._synced = False
+        if path is not None:
+            self._load()
+
+    # -- updates -----------------------------------------------------------
+
+    def add(self, prompt: ComicPrompt, meta: Dict[str, Any]) -> None:
+        """Index a prompt, replacing any earlier version of it.
+
+        Args:
+            prompt: The saved prompt
+            meta: Its listing metadata (id, core_concept, dates, approval)
+        """
+        terms = prompt_terms(prompt)
+        with self._lock:
+            self._remove(prompt.id)
+            doc = len(self._ids)
+            length = sum(terms.values())
+            self._ids.append(prompt.id)
+            self._meta.append(dict(meta))
+            self._lengths.append(length)
+            self._docs[prompt.id] = doc
+            self._total_length += length
+
+            average = self._average_length()
+            if len(self._docs) <= SMALL_INDEX and abs(average - self._weight_average) > 0.1 * average:
+                # Re-weighting a small index is cheap, and its average still moves
+                self._reweight()
+            # The weight average is 0 until a prompt with any text is indexed
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (self._weight_average or 1.0))
+            for term, frequency in terms.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = (array.array("I"), array.array("f"), array.array("f"))
+                postings[0].append(doc)
+                postings[1].append(frequency)
+                postings[2].append(frequency * (BM25_K1 + 1) / (frequency + norm))
+            self._dirty = True
+
+    def remove_many(self, prompt_ids: Iterable[str]) -> None:
+        """Drop prompts from the index.
+
+        Args:
+            prompt_ids: The IDs of the deleted prompts
+        """
+        with self._lock:
+            for prompt_id in prompt_ids:
+                self._remove(prompt_id)
+            if len(self._ids) > 2 * len(self._docs) + 64:
+                self._compact()
+
+    def _remove(self, prompt_id: Optional[str]) -> None:
+        doc = self._docs.pop(prompt_id, None)
+        if doc is None:
+            return
+        self._ids[doc] = None
+        self._meta[doc] = None
+        self._total_length -= self._lengths[doc]
+        self._dirty = True
+
+    def _compact(self) -> None:
+        """Renumber the live documents, drop dead postings and re-weight."""
+        live = [doc for doc, prompt_id in enumerate(self._ids) if prompt_id is not None]
+        renumber = {doc: new for new, doc in enumerate(live)}
+        postings = {}
+        for term, (docs, frequencies, _) in self._postings.items():
+            kept = [(renumber[doc], frequency) for doc, frequency in zip(docs, frequencies) if doc in renumber]
+            if kept:
+                postings[term] = (
+                    array.array("I", (doc for doc, _ in kept)),
+                    array.array("f", (frequency for _, frequency in kept)),
+                    array.array("f"),
+                )
+
+        self._ids = [self._ids[doc] for doc in live]
+        self._meta = [self._meta[doc] for doc in live]
+        self._lengths = array.array("f", (self._lengths[doc] for doc in live))
+        self._docs = {prompt_id: doc for doc, prompt_id in enumerate(self._ids)}
+        self._postings = postings
+        self._reweight()
+
+    def _average_length(self) -> float:
+        return self._total_length / len(self._docs) if self._docs else 1.0
+
+    def _reweight(self) -> None:
+        """Recompute every term weight for the current average document length."""
+        self._weight_average = self._average_length() or 1.0
+        norms = [BM25_K1 * (1 - BM25_B + BM25_B * length / self._weight_average) for length in self._lengths]
+        for docs, frequencies, weights in self._postings.values():
+            weights[:] = array.array(
+                "f",
+                (frequency * (BM25_K1 + 1) / (frequency + norms[doc]) for doc, frequency in zip(docs, frequencies)),
+            )
+
+    # -- queries -----------------------------------------------------------
+
+    def _query_groups(self, query: str) -> List[List[str]]:
+        """Map each query token to the index terms that satisfy it.
+
+        A lone CJK character matches every bigram containing it.
+        """
+        groups = []
+        for token in dict.fromkeys(tokenize(query)):
+            if len(token) == 1 and _TOKEN_RE.match(token).group(1):
+                groups.append([term for term in self._postings if token in term])
+            else:
+                groups.append([token] if token in self._postings else [])
+        return groups
+
+    def _group_scores(self, group: List[str], candidates: Optional[Dict[int, float]]) -> Dict[int, float]:
+        """Score the documents matching any term of a group.
+
+        With candidates, only those documents are scored and their previous
+        score is added.
+        """
+        live = len(self._docs)
+        scores: Dict[int, float] = {}
+        for term in group:
+            docs, _, weights = self._postings[term]
+            count = len(docs)
+            idf = math.log(1 + (live - count + 0.5) / (count + 0.5))
+            if candidates is None:
+                if not scores:
+                    scores = {doc: weight * idf for doc, weight in zip(docs, weights)}
+                else:
+                    for doc, weight in zip(docs, weights):
+                        scores[doc] = scores.get(doc, 0.0) + weight * idf
+            elif len(candidates) * 16 > count:
+                for doc, weight in zip(docs, weights):
+                    if doc in candidates:
+                        scores[doc] = scores.get(doc, candidates[doc]) + weight * idf
+            else:
+                # Few candidates left: binary search the sorted postings
+                for doc in candidates:
+                    position = bisect.bisect_left(docs, doc)
+                    if position < count and docs[position] == doc:
+                        scores[doc] = scores.get(doc, candidates[doc]) + weights[position] * idf
+        return scores
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Find the prompts containing every term of a query.
+
+        Args:
+            query: The search text
+            limit: Maximum number of results (None for all)
+
+        Returns:
+            (prompt ID, score) pairs, best match first
+        """
+        with self._lock:
+            groups = self._query_groups(query)
+            if not groups or not all(groups):
+                return []
+
+            # Start from the rarest group so later groups only probe candidates
+            groups.sort(key=lambda group: sum(len(self._postings[term][0]) for term in group))
+            scores: Optional[Dict[int, float]] = None
+            for group in groups:
+                scores = self._group_scores(group, scores)
+                if not scores:
+                    return []
+
+            ids = self._ids
+            if len(ids) != len(self._docs):
+                # Postings of deleted prompts are only dropped on compaction
+                scores = {doc: score for doc, score in scores.items() if ids[doc] is not None}
+            if limit is None:
+                best = sorted(scores.items(), key=itemgetter(1), reverse=True)
+            else:
+                best = heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+            return [(ids[doc], score) for doc, score in best]
+
+    def search_metadata(self, query: str, approved: Optional[bool] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Find prompts and return their listing metadata, best match first.
+
+        Args:
+            query: The search text
+            approved: If set, only return prompts with this approval status
+            limit: Maximum number of results (None for all)
+
+        Returns:
+            Metadata dictionaries with an added "score"
+        """
+        with self._lock:
+            results = []
+            for prompt_id, score in self.search(query, None if approved is not None else limit):
+                meta = self._meta[self._docs[prompt_id]]
+                if approved is not None and bool(meta.get("is_approved")) != approved:
+                    continue
+                results.append({**meta, "score": score})
+                if limit is not None and len(results) >= limit:
+                    break
+            return results
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # -- syncing and persistence -------------------------------------------
+
+    def sync(self, storage: Any) -> None:
+        """Bring the index up to date with a storage backend.
+
+        Prompts whose update time differs from the indexed version are
+        re-indexed and prompts missing from the storage are dropped.
+
+        Args:
+            storage: The PromptStore the index belongs to
+        """
+        listing = storage.list_prompts()
+        with self._lock:
+            stamps = {
+                prompt_id: metadata_stamp(meta)
+                for prompt_id, meta in ((self._ids[doc], self._meta[doc]) for doc in self._docs.values())
+            }
+        current = set()
+        for meta in listing:
+            prompt_id = meta["id"]
+            current.add(prompt_id)
+            if stamps.get(prompt_id) == metadata_stamp(meta):
+                continue
+            prompt = storage.load_prompt(prompt_id, trusted=True)
+            if prompt is not None:
+                self.add(prompt, meta)
+        self.remove_many(stamps.keys() - current)
+
+        with self._lock:
+            self._synced = True
+            self._persist()
+
+    def ensure_synced(self, storage: Any) -> None:
+        """Sync with the storage once per process, then persist periodically."""
+        if not self._synced:
+            # Concurrent first searches wait for a single sync
+            with self._sync_lock:
+                if not self._synced:
+                    self.sync(storage)
+        elif self._dirty and time.monotonic() - self._persisted_at >= PERSIST_INTERVAL:
+            with self._lock:
+                self._persist()
+
+    def _persist(self) -> None:
+        """Write the index file (tmp file + atomic rename) if it changed."""
+        if self.path is None or not self._dirty:
+            return
+        if len(self._ids) != len(self._docs):
+            self._compact()
+        terms = list(self._postings)
+        header = {
+            "version": INDEX_VERSION,
+            "byteorder": sys.byteorder,
+            "weight_average": self._weight_average,
+            "docs": [[self._ids[doc], self._meta[doc], self._lengths[doc]] for doc in range(len(self._ids))],
+            "terms": [[term, len(self._postings[term][0])] for term in terms],
+        }
+        encoded = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        dir_mtime = self.directory_index.dir_mtime() if self.directory_index is not None else None
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(INDEX_MAGIC)
+                f.write(len(encoded).to_bytes(8, "little"))
+                f.write(encoded)
+                for term in terms:
+                    for values in self._postings[term]:
+                        f.write(values.tobytes())
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+            self._persisted_at = time.monotonic()
+            if self.directory_index is not None:
+                self.directory_index._mark_own_change(dir_mtime)
+        except OSError:
+            # The in-memory index is still valid; try again later
+            pass
+
+    def _load(self) -> None:
+        """Load the index file, if present and readable."""
+        try:
+            with open(self.path, "rb") as f:
+                if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                    return
+                size = int.from_bytes(f.read(8), "little")
+                header = json.loads(f.read(size))
+                if header.get("version") != INDEX_VERSION:
+                    return
+                swap = header["byteorder"] != sys.byteorder
+                postings = {}
+                for term, count in header["terms"]:
+                    values = (array.array("I"), array.array("f"), array.array("f"))
+                    for column in values:
+                        column.frombytes(f.read(count * column.itemsize))
+                        if len(column) != count:
+                            return
+                        if swap:
+                            column.byteswap()
+                    postings[term] = values
+        except (OSError, ValueError, KeyError, TypeError):
+            # A missing or corrupt index file is rebuilt by `sync`
+            return
+
+        self._ids = [prompt_id for prompt_id, _, _ in header["docs"]]
+        self._meta = [meta for _, meta, _ in header["docs"]]
+        self._lengths = array.array("f", (length for _, _, length in header["docs"]))
+        self._docs = {prompt_id: doc for doc, prompt_id in enumerate(self._ids)}
+        self._total_length = sum(self._lengths)
+        self._postings = postings
+        self._weight_average = header["weight_average"]
+
+
+# One index per storage location, shared by every storage instance in the process
+_indexes: PathRegistry[SearchIndex] = PathRegistry()
+
+
+def get_search_index(path: Path, directory_index: Any = None) -> SearchIndex:
+    """Get the shared search index persisted at a path.
+
+    Args:
+        path: The index file of a storage location
+        directory_index: The PromptIndex of the directory holding the file,
+            if it is kept inside a prompt directory (see `SearchIndex`)
+
+    Returns:
+        The process-wide SearchIndex for that file
+    """
+    return _indexes.shared(path, lambda: SearchIndex(path, directory_index))
+
+
+def search_storage(
+    storage: Any,
+    index: SearchIndex,
+    query: str,
+    approved: Optional[bool] = None,
+    limit: Optional[int] = None,
+) -> List[Dict]:
+    """Run a full-text query against a storage backend's search index.
+
+    Args:
+        storage: The PromptStore the index belongs to
+        index: Its search index
+        query: The search text
+        approved: If set, only return prompts with this approval status
+        limit: Maximum number of results (None for all)
+
+    Returns:
+        Listing metadata of the matching prompts with a "score", best first
+    """
+    index.ensure_synced(storage)
+    return index.search_metadata(query, approved, limit)
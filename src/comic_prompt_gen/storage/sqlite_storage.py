@@ -0,0 +1,376 @@
+"""SQLite storage backend for comic prompts."""
+import json
+import queue
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..core.models import SCHEMA_VERSION, ComicPrompt
+from ..utils.registry import PathRegistry
+from ..utils.reporting import report_error
+from .base import SORT_FIELDS, prompt_from_data
+from .prompt_index import extract_metadata
+from .search_index import get_search_index, search_storage
+
+# Columns stored outside the generic JSON payload
+_COLUMN_FIELDS = ("id", "core_concept", "created_at", "updated_at", "is_approved", "panels", "style")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS prompts (
+    id TEXT PRIMARY KEY,
+    core_concept TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT,
+    is_approved INTEGER NOT NULL DEFAULT 0,
+    panels TEXT NOT NULL,
+    style TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_prompts_created_at ON prompts (created_at);
+CREATE INDEX IF NOT EXISTS idx_prompts_is_approved ON prompts (is_approved);
+CREATE INDEX IF NOT EXISTS idx_prompts_core_concept ON prompts (core_concept);
+"""
+
+# IDs per DELETE statement in delete_prompts
+_DELETE_BATCH = 500
+
+_INSERT = """
+INSERT OR REPLACE INTO prompts
+    (id, core_concept, created_at, updated_at, is_approved, panels, style, data)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class ConnectionPool:
+    """A small pool of SQLite connections to a single database file.
+
+    Connections are opened lazily up to `size`; callers block until a
+    connection is returned when the pool is exhausted.
+    """
+
+    def __init__(self, db_path: Path, size: int = 8):
+        """Initialize the pool.
+
+        Args:
+            db_path: Path of the SQLite database file
+            size: Maximum number of open connections
+        """
+        self.db_path = db_path
+        self.size = size
+        self._idle: "queue.LifoQueue[Optional[sqlite3.Connection]]" = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection from the pool for the duration of the block."""
+        conn = None
+        # None in the idle queue means a slot was freed by a failed open
+        while conn is None:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_open = self._opened < self.size
+                    if can_open:
+                        self._opened += 1
+                if not can_open:
+                    conn = self._idle.get()
+                    continue
+                try:
+                    conn = self._open()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    # Let a caller waiting for a connection open one instead
+                    self._idle.put(None)
+                    raise
+
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+
+# One pool per database file, shared by every storage instance (and therefore
+# every Streamlit session) in the process
+_pools: PathRegistry[ConnectionPool] = PathRegistry()
+
+
+def get_connection_pool(db_path: Path) -> ConnectionPool:
+    """Get the shared connection pool for a database file.
+
+    Args:
+        db_path: Path of the SQLite database file
+
+    Returns:
+        The process-wide ConnectionPool for that file
+    """
+    return _pools.shared(db_path, lambda: ConnectionPool(db_path))
+
+
+def _serialize(prompt: ComicPrompt) -> tuple:
+    """Convert a prompt into a row for the prompts table."""
+    data = prompt.model_dump(mode="json")
+    panels = data.pop("panels")
+    style = data.pop("style")
+    for field in _COLUMN_FIELDS:
+        data.pop(field, None)
+    data["schema_version"] = SCHEMA_VERSION
+
+    return (
+        prompt.id,
+        prompt.core_concept,
+        str(prompt.created_at),
+        str(prompt.updated_at) if prompt.updated_at is not None else None,
+        int(prompt.is_approved),
+        json.dumps(panels, ensure_ascii=False),
+        json.dumps(style, ensure_ascii=False),
+        json.dumps(data, ensure_ascii=False),
+    )
+
+
+def _deserialize(row: sqlite3.Row) -> Dict[str, Any]:
+    """Convert a prompts table row back into prompt data."""
+    data = json.loads(row["data"])
+    data.update(
+        id=row["id"],
+        core_concept=row["core_concept"],
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+        is_approved=bool(row["is_approved"]),
+        panels=json.loads(row["panels"]),
+        style=json.loads(row["style"]),
+    )
+    return data
+
+
+def _where_clause(approved: Optional[bool], query: Optional[str]) -> Tuple[str, List[Any]]:
+    """Build the WHERE clause for the listing filters."""
+    conditions = []
+    params: List[Any] = []
+    if approved is not None:
+        conditions.append("is_approved = ?")
+        params.append(int(approved))
+    if query:
+        escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        conditions.append("core_concept LIKE ? ESCAPE '\\'")
+        params.append(f"%{escaped}%")
+
+    if not conditions:
+        return "", params
+    return " WHERE " + " AND ".join(conditions), params
+
+
+class SQLitePromptStorage:
+    """Storage manager for comic prompts backed by a SQLite database."""
+
+    def __init__(self, db_path: str = "saved_prompts.db"):
+        """Initialize the storage manager.
+
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.pool = get_connection_pool(self.db_path)
+        # Full-text index, kept current on save and delete
+        self.search_index = get_search_index(self.db_path.with_name(self.db_path.name + ".search"))
+
+        with self.pool.connection() as conn, conn:
+            conn.executescript(_SCHEMA)
+
+    def save_prompt(self, prompt: ComicPrompt) -> str:
+        """Save a prompt to storage.
+
+        Args:
+            prompt: The ComicPrompt object to save
+
+        Returns:
+            The ID of the saved prompt
+        """
+        # Generate ID if not present
+        if prompt.id is None:
+            prompt.id = str(uuid.uuid4())
+
+        # Update timestamp
+        prompt.updated_at = datetime.now()
+
+        with self.pool.connection() as conn, conn:
+            conn.execute(_INSERT, _serialize(prompt))
+
+        self.search_index.add(prompt, extract_metadata(prompt.model_dump()))
+        return prompt.id
+
+    def save_many(self, prompts: Iterable[ComicPrompt]) -> int:
+        """Save many prompts in a single transaction, keeping their timestamps.
+
+        Args:
+            prompts: The ComicPrompt objects to save
+
+        Returns:
+            The number of prompts saved
+        """
+        prompts = list(prompts)
+        rows = []
+        for prompt in prompts:
+            if prompt.id is None:
+                prompt.id = str(uuid.uuid4())
+            rows.append(_serialize(prompt))
+
+        with self.pool.connection() as conn, conn:
+            conn.executemany(_INSERT, rows)
+
+        for prompt in prompts:
+            self.search_index.add(prompt, extract_metadata(prompt.model_dump()))
+        return len(rows)
+
+    def load_prompt(self, prompt_id: str, trusted: bool = False) -> Optional[ComicPrompt]:
+        """Load a prompt from storage.
+
+        Args:
+            prompt_id: The ID of the prompt to load
+            trusted: Accepted for interface compatibility; rows are already
+                parsed per column, so they are always validated
+
+        Returns:
+            The loaded ComicPrompt object, or None if not found
+        """
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT * FROM prompts WHERE id = ?", (prompt_id,)).fetchone()
+
+        if row is None:
+            return None
+
+        try:
+            return prompt_from_data(_deserialize(row))
+        except Exception as e:
+            report_error(f"Error loading prompt: {e}")
+            return None
+
+    def list_prompts(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        sort: str = "created_at",
+        descending: bool = True,
+        approved: Optional[bool] = None,
+        query: Optional[str] = None,
+    ) -> List[Dict]:
+        """List saved prompts with basic metadata, one page at a time.
+
+        Args:
+            offset: Number of matching prompts to skip
+            limit: Maximum number of prompts to return (None for all)
+            sort: Metadata field to sort by ("created_at", "updated_at" or "core_concept")
+            descending: Sort from highest to lowest (newest first for dates)
+            approved: If set, only list prompts with this approval status
+            query: If set, only list prompts whose core concept contains it
+
+        Returns:
+            List of prompt metadata (id, title, creation/update dates, approval)
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Unknown sort field: {sort}")
+
+        where, params = _where_clause(approved, query)
+        order = "DESC" if descending else "ASC"
+        sql = (
+            "SELECT id, core_concept, created_at, updated_at, is_approved "
+            f"FROM prompts{where} ORDER BY {sort} {order} LIMIT ? OFFSET ?"
+        )
+        params.extend([-1 if limit is None else limit, offset])
+
+        with self.pool.connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        return [
+            {
+                "id": prompt_id,
+                "core_concept": core_concept,
+                "created_at": created_at,
+                "updated_at": updated_at,
+                "is_approved": bool(is_approved),
+            }
+            for prompt_id, core_concept, created_at, updated_at, is_approved in rows
+        ]
+
+    def count_prompts(self, approved: Optional[bool] = None, query: Optional[str] = None) -> int:
+        """Count saved prompts matching the given filters.
+
+        Args:
+            approved: If set, only count prompts with this approval status
+            query: If set, only count prompts whose core concept contains it
+
+        Returns:
+            The number of matching prompts
+        """
+        where, params = _where_clause(approved, query)
+        with self.pool.connection() as conn:
+            (count,) = conn.execute(f"SELECT COUNT(*) FROM prompts{where}", params).fetchone()
+        return count
+
+    def delete_prompt(self, prompt_id: str) -> bool:
+        """Delete a prompt from storage.
+
+        Args:
+            prompt_id: The ID of the prompt to delete
+
+        Returns:
+            True if deleted successfully, False otherwise
+        """
+        try:
+            with self.pool.connection() as conn, conn:
+                cursor = conn.execute("DELETE FROM prompts WHERE id = ?", (prompt_id,))
+            self.search_index.remove_many([prompt_id])
+            return cursor.rowcount > 0
+        except sqlite3.Error:
+            return False
+
+    def delete_prompts(self, prompt_ids: Iterable[str]) -> int:
+        """Delete several prompts in a single transaction.
+
+        Args:
+            prompt_ids: The IDs of the prompts to delete
+
+        Returns:
+            The number of prompts deleted
+        """
+        prompt_ids = list(prompt_ids)
+        deleted = 0
+        try:
+            with self.pool.connection() as conn, conn:
+                # Stay below SQLite's limit on bound parameters per statement
+                for start in range(0, len(prompt_ids), _DELETE_BATCH):
+                    batch = prompt_ids[start:start + _DELETE_BATCH]
+                    placeholders = ", ".join("?" * len(batch))
+                    cursor = conn.execute(f"DELETE FROM prompts WHERE id IN ({placeholders})", batch)
+                    deleted += cursor.rowcount
+            self.search_index.remove_many(prompt_ids)
+            return deleted
+        except sqlite3.Error:
+            return 0
+
+    def search_prompts(self, query: str, approved: Optional[bool] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Full-text search over saved prompts.
+
+        Args:
+            query: The search text (words, or Chinese text of any length)
+            approved: If set, only return prompts with this approval status
+            limit: Maximum number of results (None for all)
+
+        Returns:
+            Metadata of the matching prompts with a relevance "score", best first
+        """
+        return search_storage(self, self.search_index, query, approved, limit)
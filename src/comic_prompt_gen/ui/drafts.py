@@ -0,0 +1,109 @@
+"""Autosave of the prompt form as a draft, restored when the session starts.
+
+The draft ID is kept in the page URL (`?draft=<id>`), so reloading the page
+or reopening the link after the server restarts brings the form back.
+"""
+import re
+from typing import Any, Dict
+
+import streamlit as st
+
+from ..storage.drafts import get_draft_writer, is_draft_id, new_draft_id
+
+# URL query parameter holding the draft ID
+DRAFT_QUERY_PARAM = "draft"
+
+# Widget keys of the form saved in a draft, besides the panel inputs
+FORM_KEYS = frozenset({
+    # Story
+    "core_concept", "narrative_arc", "reader_feeling", "overall_scene", "comic_title",
+    "content_summary_char", "content_summary_action",
+    "ref_overall_style", "ref_character", "ref_environment", "ref_pose", "ref_other",
+    # Page
+    "language", "layout",
+    # Style
+    "style_name_select", "style_name_other", "char_style", "char_recurring", "char_expressions",
+    "line_weight", "line_style", "line_color", "palette_select", "palette_other", "background",
+    "overall_tone", "gutter_color", "gutter_width", "border_style", "border_color",
+    "font_hint", "bubble_style",
+})
+# Widget keys of the panel inputs (`p<number>_<field>`)
+_PANEL_KEY = re.compile(r"p\d+_(purpose|desc|comp_select|comp_other|text|placement|sfx|ref|transition)")
+
+_DRAFT_ID_KEY = "_draft_id"
+_SNAPSHOT_KEY = "_draft_snapshot"
+# Set once the draft was discarded: its next write holds the whole form
+_DISCARDED_KEY = "_draft_discarded"
+
+_MISSING = object()
+
+
+def is_form_key(key: str) -> bool:
+    """Check whether a session state key belongs to a form widget saved in drafts."""
+    return key in FORM_KEYS or _PANEL_KEY.fullmatch(key) is not None
+
+
+def _form_values() -> Dict[str, Any]:
+    return {key: st.session_state[key] for key in list(st.session_state) if is_form_key(key)}
+
+
+def restore_draft() -> str:
+    """Restore the form from the draft named in the URL, once per session.
+
+    Must run before the form widgets are created. A session opened without
+    a valid draft ID starts a new draft and puts its ID in the URL.
+
+    Returns:
+        The session's draft ID
+    """
+    draft_id = st.session_state.get(_DRAFT_ID_KEY)
+    if draft_id is not None:
+        return draft_id
+
+    draft_id = st.query_params.get(DRAFT_QUERY_PARAM)
+    if is_draft_id(draft_id):
+        values = get_draft_writer().store.load(draft_id)
+        for key, value in values.items():
+            if is_form_key(key):
+                st.session_state[key] = value
+    else:
+        draft_id = new_draft_id()
+        st.query_params[DRAFT_QUERY_PARAM] = draft_id
+    st.session_state[_DRAFT_ID_KEY] = draft_id
+    return draft_id
+
+
+def autosave_draft() -> None:
+    """Queue the form values changed since the last call for writing to the draft.
+
+    Call after the form widgets are created. Only the changed values are
+    queued, and the draft writer writes them in the background at most
+    once per interval (see `storage.drafts.DraftWriter`). The first call of
+    a session records the form as it was rendered, without writing it.
+    """
+    draft_id = st.session_state.get(_DRAFT_ID_KEY)
+    if draft_id is None:
+        return
+    values = _form_values()
+    snapshot = st.session_state.get(_SNAPSHOT_KEY)
+    st.session_state[_SNAPSHOT_KEY] = values
+    if snapshot is None:
+        return
+    changes = {key: value for key, value in values.items() if snapshot.get(key, _MISSING) != value}
+    if changes:
+        if st.session_state.pop(_DISCARDED_KEY, False):
+            changes = values
+        get_draft_writer().update(draft_id, changes)
+
+
+def discard_draft() -> None:
+    """Delete the session's draft, e.g. once its prompt has been saved.
+
+    The form is left as it is. The next edit writes it to the draft again
+    in full, so the draft never holds edits without the values they change.
+    """
+    draft_id = st.session_state.get(_DRAFT_ID_KEY)
+    if draft_id is None:
+        return
+    get_draft_writer().discard(draft_id)
+    st.session_state[_DISCARDED_KEY] = True
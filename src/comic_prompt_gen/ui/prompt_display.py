@@ -1,10 +1,23 @@
 """UI components for displaying and managing prompts."""
-from typing import Callable, Dict, Any
+from typing import Callable, Dict, Any, List
 
 import streamlit as st
 
-from ..core.models import ComicPrompt
+from ..core.models import ComicPrompt, PromptRecord
+from ..storage.base import PromptStore
 from ..storage.prompt_storage import get_storage
+from .drafts import discard_draft
+
+# Page sizes offered on the saved prompts page
+PAGE_SIZE_OPTIONS = [10, 25, 50, 100]
+
+# (sort field, descending) for each entry of the "prompt_sort_options" translation
+SAVED_SORT_OPTIONS = [
+    ("created_at", True),
+    ("created_at", False),
+    ("updated_at", True),
+    ("core_concept", False),
+]
 
 
 def display_prompt(t: Callable[[str], str], prompt_text: str) -> bool:
@@ -48,6 +61,9 @@ def display_prompt(t: Callable[[str], str], prompt_text: str) -> bool:
 def render_saved_prompts(t: Callable[[str], str]):
     """Render the saved prompts page.
     
+    Only the metadata of the current page is listed; a full prompt is loaded
+    from storage when its entry is opened.
+    
     Args:
         t: The translation function.
     """
@@ -56,46 +72,144 @@ def render_saved_prompts(t: Callable[[str], str]):
     # Get the storage instance
     storage = get_storage()
     
-    # List all saved prompts
-    prompts = storage.list_prompts()
+    # Filter and sort controls
+    filter_cols = st.columns([3, 2, 1, 1])
+    with filter_cols[0]:
+        query = st.text_input(t("prompt_search"), key="saved_query")
+    with filter_cols[1]:
+        sort_options_translated = t("prompt_sort_options")
+        # Search results are ranked by relevance instead
+        sort_display = st.selectbox(t("prompt_sort"), sort_options_translated, key="saved_sort", disabled=bool(query))
+        sort_field, descending = SAVED_SORT_OPTIONS[sort_options_translated.index(sort_display)]
+    with filter_cols[2]:
+        approved_only = st.checkbox(t("prompt_approved_only"), key="saved_approved_only")
+    with filter_cols[3]:
+        page_size = st.selectbox(t("prompt_page_size"), PAGE_SIZE_OPTIONS, key="saved_page_size")
     
-    if not prompts:
+    # Result of a delete made by a button callback before this rerun
+    flash = st.session_state.pop("saved_flash", None)
+    if flash:
+        level, message = flash
+        getattr(st, level)(message)
+    
+    approved = True if approved_only else None
+    if query:
+        # Full-text search returns every match ranked; pages are sliced here
+        matches = storage.search_prompts(query, approved=approved)
+        total = len(matches)
+    else:
+        total = storage.count_prompts(approved=approved)
+    
+    if not total:
         st.info(t("prompt_saved_empty"))
         return
     
-    # Display each prompt in a card-like format
-    for prompt_meta in prompts:
-        with st.expander(f"**{prompt_meta['core_concept']}**", expanded=False):
-            # Load the full prompt
-            prompt_id = prompt_meta['id']
-            prompt_obj = storage.load_prompt(prompt_id)
-            
-            if prompt_obj:
-                # Display basic info
-                created_dt_str = prompt_obj.created_at.strftime("%Y-%m-%d %H:%M")
-                st.write(t("prompt_created_at").format(dt=created_dt_str))
-                if prompt_obj.updated_at:
-                    updated_dt_str = prompt_obj.updated_at.strftime("%Y-%m-%d %H:%M")
-                    st.write(t("prompt_updated_at").format(dt=updated_dt_str))
-                
-                # Display the prompt
-                st.code(prompt_obj.generated_prompt, language="markdown")
-                
-                # Actions
-                col1, col2 = st.columns([1,3]) # Adjust column ratio for button placement
-                with col1:
-                    if st.button(t("prompt_delete_button"), key=f"delete_{prompt_id}"):
-                        if storage.delete_prompt(prompt_id):
-                            st.success(t("prompt_delete_success"))
-                            st.rerun()
-                        else:
-                            st.error(t("prompt_delete_fail"))
-                
-                # Placeholder for potential future actions
-                # with col2:
-                #     pass 
-            else:
-                st.error(t("prompt_load_fail").format(id=prompt_id))
+    page_count = (total + page_size - 1) // page_size
+    # Keep the selected page in range when filters shrink the result set
+    if st.session_state.get("saved_page", 1) > page_count:
+        st.session_state.saved_page = page_count
+    page = st.number_input(t("prompt_page"), min_value=1, max_value=page_count, step=1, key="saved_page")
+    st.caption(t("prompt_page_info").format(page=page, pages=page_count, total=total))
+    
+    # List only the metadata of the current page
+    offset = (page - 1) * page_size
+    if query:
+        prompts = matches[offset:offset + page_size]
+    else:
+        prompts = storage.list_prompts(
+            offset=offset,
+            limit=page_size,
+            sort=sort_field,
+            descending=descending,
+            approved=approved,
+        )
+    
+    records = [PromptRecord.from_metadata(meta) for meta in prompts]
+    
+    # Checkbox state of the previous run decides the bulk delete button label
+    selected = [r.id for r in records if st.session_state.get(f"select_{r.id}")]
+    st.button(
+        t("prompt_delete_selected").format(count=len(selected)),
+        key="delete_selected",
+        disabled=not selected,
+        on_click=_delete_prompts,
+        args=(t, storage, selected),
+    )
+    
+    for record in records:
+        render_saved_prompt_entry(t, storage, record)
+
+
+def _delete_prompts(t: Callable[[str], str], storage: PromptStore, prompt_ids: List[str]) -> None:
+    """Button callback deleting prompts before the page reruns.
+    
+    Callbacks run before the script, so the rerun that follows lists the
+    updated storage without an extra `st.rerun()`.
+    
+    Args:
+        t: The translation function.
+        storage: The storage backend the prompts live in
+        prompt_ids: The IDs of the prompts to delete
+    """
+    deleted = storage.delete_prompts(prompt_ids)
+    for prompt_id in prompt_ids:
+        st.session_state.pop(f"select_{prompt_id}", None)
+        st.session_state.pop(f"open_{prompt_id}", None)
+    
+    if not deleted:
+        st.session_state.saved_flash = ("error", t("prompt_delete_fail"))
+    elif len(prompt_ids) == 1:
+        st.session_state.saved_flash = ("success", t("prompt_delete_success"))
+    else:
+        st.session_state.saved_flash = ("success", t("prompt_delete_many_success").format(count=deleted))
+
+
+def render_saved_prompt_entry(t: Callable[[str], str], storage: PromptStore, record: PromptRecord):
+    """Render a single saved prompt, loading it only when opened.
+    
+    Args:
+        t: The translation function.
+        storage: The storage backend the prompt lives in
+        record: The listing record of the prompt
+    """
+    prompt_id = record.id
+    
+    select_col, title_col = st.columns([1, 20])
+    with select_col:
+        st.checkbox(t("prompt_select"), key=f"select_{prompt_id}", label_visibility="collapsed")
+    with title_col:
+        # st.expander always runs its body, so a toggle gates loading the prompt
+        opened = st.toggle(f"**{record.core_concept}**", key=f"open_{prompt_id}")
+    if not opened:
+        return
+    
+    with st.container(border=True):
+        # Load the full prompt (saved by this app, so the fast path applies)
+        prompt_obj = storage.load_prompt(prompt_id, trusted=True)
+        
+        if not prompt_obj:
+            st.error(t("prompt_load_fail").format(id=prompt_id))
+            return
+        
+        # Display basic info
+        created_dt_str = prompt_obj.created_at.strftime("%Y-%m-%d %H:%M")
+        st.write(t("prompt_created_at").format(dt=created_dt_str))
+        if prompt_obj.updated_at:
+            updated_dt_str = prompt_obj.updated_at.strftime("%Y-%m-%d %H:%M")
+            st.write(t("prompt_updated_at").format(dt=updated_dt_str))
+        
+        # Display the prompt
+        st.code(prompt_obj.generated_prompt, language="markdown")
+        
+        # Actions
+        col1, col2 = st.columns([1,3]) # Adjust column ratio for button placement
+        with col1:
+            st.button(
+                t("prompt_delete_button"),
+                key=f"delete_{prompt_id}",
+                on_click=_delete_prompts,
+                args=(t, storage, [prompt_id]),
+            )
 
 
 def save_prompt(t: Callable[[str], str], comic_prompt: ComicPrompt) -> None:
@@ -110,6 +224,7 @@ def save_prompt(t: Callable[[str], str], comic_prompt: ComicPrompt) -> None:
     
     if prompt_id:
         # We show success message in the display_prompt function upon button click
-        pass
+        # The saved prompt replaces the session's draft
+        discard_draft()
     else:
         st.error(t("prompt_save_fail")) 
\ No newline at end of file
@@ -1,18 +1,51 @@
 """Story form component for the UI."""
-from typing import Callable, Dict, Any
+import os
+from typing import Dict, Any, Optional, Tuple
 
 import streamlit as st
 
 from ..utils.reference_images import show_reference_image, REFERENCE_IMAGES
+from .drafts import autosave_draft
+from ..core.layouts import LAYOUTS, DEFAULT_LAYOUT, Layout
 from ..core.models import Panel, StyleProfile
-from ..utils.translations import en_translations
+from ..utils.translations import Translator, en_translations
 
+EDIT_MODE_ENV = "COMIC_PROMPT_EDIT_MODE"
+# "live" reruns the whole page on every edit; "batched" reruns only the
+# edited section and builds the prompt when the generate button is pressed
+EDIT_MODES = ("live", "batched")
 
-def render_story_section(t: Callable[[str], str]) -> Dict[str, Any]:
+# Session state key of the run counters (see `count_run`)
+RUN_COUNTS_KEY = "run_counts"
+
+# Fragments arrived in Streamlit 1.33 as `experimental_fragment`; without
+# them a batched section simply runs as part of the page
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
+
+
+def edit_mode() -> str:
+    """The form edit mode from COMIC_PROMPT_EDIT_MODE ("live" by default).
+
+    Raises:
+        ValueError: If the variable names an unknown mode
+    """
+    mode = (os.environ.get(EDIT_MODE_ENV) or "live").lower()
+    if mode not in EDIT_MODES:
+        raise ValueError(f"Unknown edit mode: {mode}")
+    return mode
+
+
+def count_run(name: str) -> None:
+    """Count one run of the page ("script") or of a form section in this session."""
+    counts = st.session_state.setdefault(RUN_COUNTS_KEY, {})
+    counts[name] = counts.get(name, 0) + 1
+
+
+def render_story_section(t: Translator) -> Dict[str, Any]:
     """Render the overall story and scene section.
 
     Args:
-        t: The translation function.
+        t: The translator.
 
     Returns:
         A dictionary containing the story input data.
@@ -22,55 +55,66 @@ def render_story_section(t: Callable[[str], str]) -> Dict[str, Any]:
     with st.expander(t("story_expander_1"), expanded=True):
         core_concept = st.text_input(
             t("story_core_concept"), 
-            placeholder=t("default_core_concept")
+            placeholder=t("default_core_concept"),
+            key="core_concept"
         )
         narrative_arc = st.text_area(
             t("story_narrative_arc"), 
             placeholder=t("default_narrative_arc"),
-            height=100
+            height=100,
+            key="narrative_arc"
         )
         reader_feeling = st.text_input(
             t("story_reader_feeling"), 
-            placeholder=t("default_reader_feeling")
+            placeholder=t("default_reader_feeling"),
+            key="reader_feeling"
         )
 
     with st.expander(t("story_expander_2"), expanded=True):
         overall_scene = st.text_input(
             t("story_overall_scene"), 
-            placeholder=t("default_overall_scene")
+            placeholder=t("default_overall_scene"),
+            key="overall_scene"
         )
         comic_title = st.text_input(
             t("story_comic_title"), 
-            placeholder=t("default_comic_title")
+            placeholder=t("default_comic_title"),
+            key="comic_title"
         )
         content_summary_char = st.text_input(
             t("story_content_char"), 
-            placeholder=t("default_content_char")
+            placeholder=t("default_content_char"),
+            key="content_summary_char"
         )
         content_summary_action = st.text_input(
             t("story_content_action"), 
-            placeholder=t("default_content_action")
+            placeholder=t("default_content_action"),
+            key="content_summary_action"
         )
 
     with st.expander(t("story_expander_3"), expanded=False):
         st.markdown(t("story_ref_markdown"))
         ref_overall_style = st.text_input(
             t("story_ref_style"), 
-            placeholder=t("default_ref_style")
+            placeholder=t("default_ref_style"),
+            key="ref_overall_style"
         )
         ref_character = st.text_input(
             t("story_ref_char"), 
-            placeholder=t("default_ref_char")
+            placeholder=t("default_ref_char"),
+            key="ref_character"
         )
         ref_environment = st.text_input(
             t("story_ref_env"), 
-            placeholder=t("default_ref_env")
+            placeholder=t("default_ref_env"),
+            key="ref_environment"
         )
         ref_pose = st.text_input(
             t("story_ref_pose"), 
-            placeholder=t("default_ref_pose")
+            placeholder=t("default_ref_pose"),
+            key="ref_pose"
         )
-        ref_other = st.text_input(t("story_ref_other"), placeholder="Optional")
+        ref_other = st.text_input(t("story_ref_other"), placeholder="Optional", key="ref_other")
         
     return {
         "core_concept": core_concept,
@@ -88,11 +132,32 @@ def render_story_section(t: Callable[[str], str]) -> Dict[str, Any]:
     }
 
 
-def render_panel_section(t: Callable[[str], str]) -> Dict[str, Panel]:
+def render_layout_select(t: Translator) -> Layout:
+    """Render the page layout selector.
+    
+    Args:
+        t: The translator; its language names the layouts.
+        
+    Returns:
+        The selected Layout.
+    """
+    layout_keys = list(LAYOUTS)
+    key = st.selectbox(
+        t("panel_layout"),
+        layout_keys,
+        index=layout_keys.index(DEFAULT_LAYOUT),
+        format_func=lambda k: LAYOUTS[k].name(t.lang),
+        key="layout"
+    )
+    return LAYOUTS[key]
+
+
+def render_panel_section(t: Translator, layout: Layout) -> Dict[str, Panel]:
     """Render the panel details section.
     
     Args:
-        t: The translation function.
+        t: The translator; its language names the panel positions.
+        layout: The selected layout; one set of inputs is shown per panel.
         
     Returns:
         A dictionary mapping panel numbers (as strings) to Panel objects.
@@ -144,30 +209,34 @@ def render_panel_section(t: Callable[[str], str]) -> Dict[str, Panel]:
         },
     }
 
-    panel_cols = st.columns(2)
+    panel_cols = st.columns(layout.cols)
     panel_placement_options_en = en_translations["panel_placement_options"] # Use EN for keys
     panel_placement_options_translated = t("panel_placement_options")
 
-    for i in range(1, 5):
-        col_index = (i - 1) % 2
+    # Labels shared by every panel are translated once, outside the loop
+    other_option_translated = t("style_other_option")
+    comp_options = list(REFERENCE_IMAGES["composition"].keys()) + [other_option_translated]
+    comp_select_label = t("panel_comp_select")
+    comp_other_label = t("panel_comp_other")
+    transition_help = t("panel_transition_help")
+
+    # Panels beyond the four of the default story start out empty
+    blank_defaults = {"purpose": "", "desc": "", "comp": "Medium shot", "text": "", "placement": "No text", "sfx": "", "ref": "", "transition": ""}
+
+    for i in range(1, layout.panel_count + 1):
+        col_index = layout.columns[i - 1]
         with panel_cols[col_index]:
-            panel_subheaders = {
-                1: t("panel_subheader_1"),
-                2: t("panel_subheader_2"),
-                3: t("panel_subheader_3"),
-                4: t("panel_subheader_4")
-            }
-            st.subheader(panel_subheaders[i])
+            st.subheader(layout.subheader(t.lang, i - 1))
             with st.expander(t("panel_expander_edit").format(i=i), expanded=(i==1)):
-                defaults = default_panel_keys[i]
+                defaults = default_panel_keys.get(i, blank_defaults)
                 panels[str(i)] = {}
                 
                 # Get translated default values for placeholders
-                default_purpose = t(defaults['purpose'])
-                default_desc = t(defaults['desc'])
+                default_purpose = t(defaults['purpose']) if defaults['purpose'] else ""
+                default_desc = t(defaults['desc']) if defaults['desc'] else ""
                 default_comp_key = defaults['comp']
                 default_text = t(defaults['text']) if defaults['text'] else ""
-                default_sfx = t(defaults['sfx'])
+                default_sfx = t(defaults['sfx']) if defaults['sfx'] else ""
                 default_ref = t(defaults['ref']) if defaults['ref'] else ""
                 default_transition = t(defaults['transition']) if defaults['transition'] else ""
                 default_placement_en = defaults['placement']
@@ -187,21 +256,20 @@ def render_panel_section(t: Callable[[str], str]) -> Dict[str, Panel]:
 
                 # Composition with Reference Image
                 st.write(t("panel_comp").format(i=i))
-                comp_options = list(REFERENCE_IMAGES["composition"].keys()) + [t("style_other_option")]
                 # Find index for default composition
                 default_comp_index = comp_options.index(default_comp_key) if default_comp_key in comp_options else len(comp_options)-1
                 selected_comp = st.selectbox(
-                    t("panel_comp_select"), 
+                    comp_select_label, 
                     comp_options, 
                     index=default_comp_index, # Keep default selection index
                     key=f"p{i}_comp_select"
                 )
-                if selected_comp != t("style_other_option"):
+                if selected_comp != other_option_translated:
                     panels[str(i)]['comp'] = selected_comp
                     show_reference_image("composition", selected_comp)
                 else:
                     # Placeholder for 'Other' composition input
-                    panels[str(i)]['comp'] = st.text_input(t("panel_comp_other"), placeholder=t("panel_comp_other"), key=f"p{i}_comp_other")
+                    panels[str(i)]['comp'] = st.text_input(comp_other_label, placeholder=comp_other_label, key=f"p{i}_comp_other")
 
                 panels[str(i)]['text'] = st.text_input(
                     t("panel_text").format(i=i), 
@@ -232,18 +300,19 @@ def render_panel_section(t: Callable[[str], str]) -> Dict[str, Panel]:
                     t("panel_transition").format(i=i), 
                     placeholder=default_transition if default_transition else "e.g., zoom in, next day", # Use placeholder
                     key=f"p{i}_transition", 
-                    help=t("panel_transition_help")
+                    help=transition_help
                 )
                 
     panel_objects = {i: Panel(**panels[i]) for i in panels}
     return panel_objects
 
 
-def render_style_section(t: Callable[[str], str]) -> StyleProfile:
+def render_style_section(t: Translator, layout: Layout) -> StyleProfile:
     """Render the comic style profile section.
     
     Args:
-        t: The translation function.
+        t: The translator.
+        layout: The selected layout, recorded as the grid style.
         
     Returns:
         A StyleProfile object containing the style input data.
@@ -351,7 +420,8 @@ def render_style_section(t: Callable[[str], str]) -> StyleProfile:
             overall_tone = overall_tone_options_en[overall_tone_options_translated.index(overall_tone_display)]
 
             st.subheader(t("style_panel_layout"))
-            grid_style = st.text_input(t("style_grid_style"), "standard 2x2", key="grid_style", disabled=True) # Grid style likely doesn't need placeholder
+            # Set by the layout selector above the panels
+            grid_style = st.text_input(t("style_grid_style"), layout.grid_style, disabled=True)
             gutter_color = st.color_picker(t("style_gutter_color"), "#FFFFFF", key="gutter_color") # Color picker needs a default value
             
             gutter_width_options_en = en_translations["style_gutter_width_options"]
@@ -411,4 +481,61 @@ def render_style_section(t: Callable[[str], str]) -> StyleProfile:
         bubble_style=bubble_style
     )
     
-    return style_profile 
\ No newline at end of file
+    return style_profile
+
+
+# Session state keys holding the latest values of each batched section
+_SECTION_KEYS = {"story": "_section_story", "panels": "_section_panels", "style": "_section_style"}
+
+
+@_fragment
+def _story_fragment(t: Translator) -> None:
+    count_run("story")
+    st.session_state[_SECTION_KEYS["story"]] = render_story_section(t)
+    autosave_draft()
+
+
+@_fragment
+def _panel_fragment(t: Translator, layout: Layout) -> None:
+    count_run("panels")
+    st.session_state[_SECTION_KEYS["panels"]] = render_panel_section(t, layout)
+    autosave_draft()
+
+
+@_fragment
+def _style_fragment(t: Translator, layout: Layout) -> None:
+    count_run("style")
+    st.session_state[_SECTION_KEYS["style"]] = render_style_section(t, layout)
+    autosave_draft()
+
+
+def render_sections_batched(t: Translator) -> Layout:
+    """Render the story, panel and style sections as independent fragments.
+
+    Editing a widget reruns only the fragment of its section, not the rest
+    of the page. Each fragment keeps its latest values in the session state,
+    where `batched_section_values` picks them up when the prompt is built.
+    The layout selector stays outside the fragments: changing it reruns the
+    page, since the panel and style sections depend on it.
+
+    Args:
+        t: The translator.
+
+    Returns:
+        The selected Layout.
+    """
+    _story_fragment(t)
+    layout = render_layout_select(t)
+    _panel_fragment(t, layout)
+    _style_fragment(t, layout)
+    return layout
+
+
+def batched_section_values() -> Optional[Tuple[Dict[str, Any], Dict[str, Panel], StyleProfile]]:
+    """The latest story data, panels and style of the batched sections.
+
+    Returns:
+        (story data, panels, style), or None if a section has not run yet
+    """
+    values = tuple(st.session_state.get(key) for key in _SECTION_KEYS.values())
+    return None if any(value is None for value in values) else values
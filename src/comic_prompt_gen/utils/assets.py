@@ -0,0 +1,226 @@
+"""Local image assets served as fixed-size thumbnails from memory."""
+import hashlib
+import io
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+
+from .registry import PathRegistry
+
+logger = logging.getLogger(__name__)
+
+ASSETS_PATH_ENV = "COMIC_PROMPT_ASSETS_PATH"
+DEFAULT_ASSETS_PATH = "assets"
+
+# Width and height of every thumbnail, in pixels
+THUMBNAIL_SIZE = (150, 150)
+
+# Pre-generated thumbnails are kept in this subdirectory of the assets directory
+THUMBNAIL_DIR = ".thumbnails"
+
+
+class Thumbnail(NamedTuple):
+    """An encoded thumbnail ready to be sent to the browser."""
+
+    # PNG bytes (or the source file itself when Pillow is not installed)
+    data: bytes
+    # Hex digest of `data`; equal digests mean identical images, so it can
+    # serve as a cache key or ETag
+    digest: str
+    # True if the image was generated because the source file is missing
+    placeholder: bool
+
+    @classmethod
+    def from_data(cls, data: bytes, placeholder: bool = False) -> "Thumbnail":
+        """Wrap encoded image bytes, computing their digest."""
+        return cls(data, hashlib.blake2b(data, digest_size=16).hexdigest(), placeholder)
+
+
+class Placeholder(NamedTuple):
+    """How to draw an image whose file is missing: a label on a solid color."""
+
+    background: str
+    foreground: str
+    label: str
+
+
+def _encode_png(image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def render_thumbnail(source: bytes, size: Tuple[int, int] = THUMBNAIL_SIZE) -> bytes:
+    """Scale and center-crop an image to exactly `size`, encoded as PNG.
+
+    Raises:
+        ImportError: If Pillow is not installed
+        OSError: If the image cannot be decoded
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(source)) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        return _encode_png(ImageOps.fit(image, size, Image.Resampling.LANCZOS))
+
+
+def render_placeholder(placeholder: Placeholder, size: Tuple[int, int] = THUMBNAIL_SIZE) -> bytes:
+    """Draw a placeholder image (its label centered on its background) as PNG.
+
+    Raises:
+        ImportError: If Pillow is not installed
+    """
+    from PIL import Image, ImageDraw, ImageFont
+
+    image = Image.new("RGB", size, placeholder.background)
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default()
+    left, top, right, bottom = draw.textbbox((0, 0), placeholder.label, font=font)
+    position = ((size[0] - (right - left)) / 2 - left, (size[1] - (bottom - top)) / 2 - top)
+    draw.text(position, placeholder.label, fill=placeholder.foreground, font=font)
+    return _encode_png(image)
+
+
+def render_sprite_sheet(images: Sequence[bytes], columns: int, size: Tuple[int, int] = THUMBNAIL_SIZE, gap: int = 4) -> bytes:
+    """Paste images into one sheet, `columns` per row in reading order, as PNG.
+
+    Each image is placed in a `size` cell (scaled down if it is larger), with
+    `gap` pixels of white between cells.
+
+    Raises:
+        ImportError: If Pillow is not installed
+        OSError: If an image cannot be decoded
+    """
+    from PIL import Image
+
+    rows = -(-len(images) // columns)
+    width, height = size
+    sheet = Image.new("RGB", (columns * width + (columns - 1) * gap, rows * height + (rows - 1) * gap), "#FFFFFF")
+    for i, data in enumerate(images):
+        with Image.open(io.BytesIO(data)) as image:
+            image.thumbnail(size)
+            row, column = divmod(i, columns)
+            tile = image.convert("RGBA")
+            sheet.paste(tile, (column * (width + gap), row * (height + gap)), tile)
+    return _encode_png(sheet)
+
+
+class AssetStore:
+    """Thumbnails of the images in a local assets directory.
+
+    Each image is scaled once to `size` and the result is written next to
+    the assets (in `.thumbnails/`), so later processes only read the small
+    file. Thumbnails are kept in memory after first use, so a page render
+    never touches the disk or the network. An image whose file is missing
+    is replaced by a generated placeholder.
+
+    Pillow is needed to scale images and draw placeholders. Without it,
+    source files are served as they are and missing ones have no image.
+    """
+
+    def __init__(self, assets_dir: str = DEFAULT_ASSETS_PATH, size: Tuple[int, int] = THUMBNAIL_SIZE):
+        """Initialize the store.
+
+        Args:
+            assets_dir: Directory containing the images (it need not exist)
+            size: Width and height of the thumbnails
+        """
+        self.assets_dir = Path(assets_dir)
+        self.size = size
+        self.thumbnail_dir = self.assets_dir / THUMBNAIL_DIR
+        self._thumbnails: Dict[str, Optional[Thumbnail]] = {}
+        self._lock = threading.Lock()
+
+    def thumbnail(self, path: str, placeholder: Optional[Placeholder] = None) -> Optional[Thumbnail]:
+        """Get the thumbnail of an image.
+
+        Args:
+            path: Image path relative to the assets directory
+            placeholder: Drawn instead if the image is missing or unreadable
+
+        Returns:
+            The thumbnail, or None if there is no image and no placeholder
+            could be drawn
+        """
+        thumbnail = self._thumbnails.get(path)
+        if thumbnail is None and path not in self._thumbnails:
+            with self._lock:
+                if path not in self._thumbnails:
+                    self._thumbnails[path] = self._load(path, placeholder)
+                thumbnail = self._thumbnails[path]
+        return thumbnail
+
+    def _load(self, path: str, placeholder: Optional[Placeholder]) -> Optional[Thumbnail]:
+        """Read or build a thumbnail (called once per path)."""
+        source_path = self.assets_dir / path
+        width, height = self.size
+        cached_path = self.thumbnail_dir / f"{Path(path).with_suffix('')}-{width}x{height}.png"
+        try:
+            source_mtime = source_path.stat().st_mtime_ns
+        except OSError:
+            source_mtime = None
+
+        if source_mtime is not None:
+            try:
+                if cached_path.stat().st_mtime_ns >= source_mtime:
+                    data = cached_path.read_bytes()
+                    return Thumbnail.from_data(data)
+            except OSError:
+                pass
+            try:
+                data = render_thumbnail(source_path.read_bytes(), self.size)
+            except ImportError:
+                # Without Pillow the browser scales the original
+                data = source_path.read_bytes()
+                return Thumbnail.from_data(data)
+            except OSError as e:
+                logger.warning("Cannot read image %s: %s", source_path, e)
+            else:
+                self._save(cached_path, data)
+                return Thumbnail.from_data(data)
+
+        if placeholder is None:
+            return None
+        try:
+            data = render_placeholder(placeholder, self.size)
+        except ImportError:
+            return None
+        return Thumbnail.from_data(data, placeholder=True)
+
+    def _save(self, cached_path: Path, data: bytes) -> None:
+        """Write a generated thumbnail to the disk cache (best effort)."""
+        from ..storage.durability import write_atomic
+
+        try:
+            cached_path.parent.mkdir(parents=True, exist_ok=True)
+            write_atomic(cached_path, data)
+        except OSError as e:
+            # A read-only assets directory still works, just without the cache
+            logger.warning("Cannot cache thumbnail %s: %s", cached_path, e)
+
+    def clear(self) -> None:
+        """Forget the thumbnails held in memory (the disk cache is kept)."""
+        with self._lock:
+            self._thumbnails.clear()
+
+
+# Asset stores shared by every session in this process
+_stores: PathRegistry[AssetStore] = PathRegistry()
+
+
+def get_asset_store(assets_dir: Optional[str] = None) -> AssetStore:
+    """Get the process-wide asset store for a directory (creates it if needed).
+
+    Args:
+        assets_dir: The assets directory. Defaults to the
+            COMIC_PROMPT_ASSETS_PATH environment variable, then "assets".
+
+    Returns:
+        The shared AssetStore
+    """
+    assets_dir = assets_dir or os.environ.get(ASSETS_PATH_ENV) or DEFAULT_ASSETS_PATH
+    return _stores.shared(assets_dir, lambda: AssetStore(assets_dir))
@@ -1,46 +1,214 @@
-"""Reference image utilities for the comic prompt generator."""
-from typing import Dict, Any
+"""Reference image utilities for the comic prompt generator.
+
+The images are local files under `<assets>/reference/` (see
+`utils.assets`), shown as thumbnails held in memory. Missing files are
+replaced by generated placeholders, so the sidebar never fetches anything
+over the network.
+
+By default the sidebar shows each category as one sprite sheet (all its
+thumbnails composited into a single image) with the captions listed below
+it; set COMIC_PROMPT_REFERENCE_SIDEBAR=images to show one image per entry.
+
+Thumbnails are built on first use; to build them ahead of time (e.g. when
+deploying), run:
+    python -m comic_prompt_gen.utils.reference_images [assets_dir]
+"""
+import argparse
+import os
+import sys
+import threading
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
 
-import streamlit as st
 from ..utils.translations import get_translation # Import for fallback message
+from .assets import Placeholder, Thumbnail, get_asset_store, render_sprite_sheet
+
+REFERENCE_SIDEBAR_ENV = "COMIC_PROMPT_REFERENCE_SIDEBAR"
+# How the sidebar shows a category: one sprite sheet, or one image per entry
+REFERENCE_SIDEBAR_MODES = ("sprite", "images")
+
+# Thumbnails per row of a sprite sheet
+SHEET_COLUMNS = 3
+
+
+class ReferenceImage(NamedTuple):
+    """A reference image file and the placeholder shown while it is missing."""
 
-# --- Reference Image URLs (Replace with your actual URLs or local paths) ---
-# If using local paths: e.g., url_close_up = "assets/close_up.jpg"
-REFERENCE_IMAGES = {
+    # Path relative to the assets directory
+    path: str
+    placeholder: Placeholder
+
+
+def _image(category: str, name: str, background: str, foreground: str, label: str) -> ReferenceImage:
+    return ReferenceImage(f"reference/{category}/{name}.png", Placeholder(background, foreground, label))
+
+
+# --- Reference images (put your own PNG files at these paths under the assets directory) ---
+REFERENCE_IMAGES: Dict[str, Dict[str, ReferenceImage]] = {
     "composition": {
-        "Close-up": "https://via.placeholder.com/150/FF0000/FFFFFF?text=Close-Up", # Replace
-        "Medium shot": "https://via.placeholder.com/150/00FF00/FFFFFF?text=Medium+Shot", # Replace
-        "Long shot": "https://via.placeholder.com/150/0000FF/FFFFFF?text=Long+Shot", # Replace
-        "POV (Point of View)": "https://via.placeholder.com/150/FFFF00/000000?text=POV", # Replace
-        "Bird's-eye view": "https://via.placeholder.com/150/FF00FF/FFFFFF?text=Bird's-Eye", # Replace
+        "Close-up": _image("composition", "close_up", "#FF0000", "#FFFFFF", "Close-Up"),
+        "Medium shot": _image("composition", "medium_shot", "#00FF00", "#FFFFFF", "Medium Shot"),
+        "Long shot": _image("composition", "long_shot", "#0000FF", "#FFFFFF", "Long Shot"),
+        "POV (Point of View)": _image("composition", "pov", "#FFFF00", "#000000", "POV"),
+        "Bird's-eye view": _image("composition", "birds_eye_view", "#FF00FF", "#FFFFFF", "Bird's-Eye"),
     },
     "style": {
-        "Clean Slice-of-Life Anime": "https://via.placeholder.com/150/AAAAAA/FFFFFF?text=SliceOfLife", # Replace
-        "Chibi / Cute": "https://via.placeholder.com/150/FFAAAA/000000?text=Chibi", # Replace
-        "Gag Manga": "https://via.placeholder.com/150/AAFFAA/000000?text=Gag+Manga", # Replace
-        "Simple Cartoon": "https://via.placeholder.com/150/AAAAFF/000000?text=Cartoon", # Replace
+        "Clean Slice-of-Life Anime": _image("style", "slice_of_life", "#AAAAAA", "#FFFFFF", "SliceOfLife"),
+        "Chibi / Cute": _image("style", "chibi", "#FFAAAA", "#000000", "Chibi"),
+        "Gag Manga": _image("style", "gag_manga", "#AAFFAA", "#000000", "Gag Manga"),
+        "Simple Cartoon": _image("style", "cartoon", "#AAAAFF", "#000000", "Cartoon"),
     },
     "coloring": {
-        "Flat Colors": "https://via.placeholder.com/150/CCCCCC/000000?text=Flat+Color", # Replace
-        "Cell Shading": "https://via.placeholder.com/150/E6E6E6/000000?text=Cell+Shading", # Replace
-        "Watercolor": "https://via.placeholder.com/150/D0D0FF/000000?text=Watercolor", # Replace
-        "Black and White": "https://via.placeholder.com/150/FFFFFF/000000?text=B%26W", # Replace
+        "Flat Colors": _image("coloring", "flat_colors", "#CCCCCC", "#000000", "Flat Color"),
+        "Cell Shading": _image("coloring", "cell_shading", "#E6E6E6", "#000000", "Cell Shading"),
+        "Watercolor": _image("coloring", "watercolor", "#D0D0FF", "#000000", "Watercolor"),
+        "Black and White": _image("coloring", "black_and_white", "#FFFFFF", "#000000", "B&W"),
     }
 }
 
+
+def get_reference_thumbnail(category: str, key: str) -> Optional[Thumbnail]:
+    """Get the thumbnail of a reference image (a placeholder if its file is missing).
+
+    Args:
+        category: The category of the reference image
+        key: The key for the specific image within the category
+
+    Returns:
+        The thumbnail, or None for an unknown image
+    """
+    image = REFERENCE_IMAGES.get(category, {}).get(key)
+    if image is None:
+        return None
+    return get_asset_store().thumbnail(image.path, image.placeholder)
+
+
+# Sprite sheet of each category and the key it was built for
+_sheets: Dict[str, Tuple[Tuple, Thumbnail]] = {}
+_sheets_lock = threading.Lock()
+
+
+def get_reference_sheet(category: str) -> Optional[Thumbnail]:
+    """Get the sprite sheet of a category: its thumbnails in one image.
+
+    Thumbnails are laid out `SHEET_COLUMNS` per row in the order of
+    `REFERENCE_IMAGES[category]`. The sheet is built once and rebuilt only
+    when the category's entries (or the assets directory) change.
+
+    Args:
+        category: The category of reference images
+
+    Returns:
+        The sheet, or None if the category is unknown or a sheet cannot be
+        built (e.g. without Pillow)
+    """
+    images = REFERENCE_IMAGES.get(category)
+    if not images:
+        return None
+    store = get_asset_store()
+    key = (store.assets_dir, tuple(images.values()))
+    cached = _sheets.get(category)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    thumbnails = [store.thumbnail(image.path, image.placeholder) for image in images.values()]
+    if any(thumbnail is None for thumbnail in thumbnails):
+        return None
+    try:
+        data = render_sprite_sheet([thumbnail.data for thumbnail in thumbnails], SHEET_COLUMNS, store.size)
+    except (ImportError, OSError):
+        return None
+    sheet = Thumbnail.from_data(data)
+    with _sheets_lock:
+        _sheets[category] = (key, sheet)
+    return sheet
+
+
+def reference_sidebar_mode() -> str:
+    """The sidebar display mode from COMIC_PROMPT_REFERENCE_SIDEBAR ("sprite" by default).
+
+    Raises:
+        ValueError: If the variable names an unknown mode
+    """
+    mode = (os.environ.get(REFERENCE_SIDEBAR_ENV) or "sprite").lower()
+    if mode not in REFERENCE_SIDEBAR_MODES:
+        raise ValueError(f"Unknown reference sidebar mode: {mode}")
+    return mode
+
+
+def prepare_reference_thumbnails(assets_dir: Optional[str] = None) -> int:
+    """Build the thumbnail of every reference image, so the first page render has them.
+
+    Args:
+        assets_dir: The assets directory (see `get_asset_store`)
+
+    Returns:
+        The number of images found on disk (the others use placeholders)
+    """
+    store = get_asset_store(assets_dir)
+    found = 0
+    for images in REFERENCE_IMAGES.values():
+        for image in images.values():
+            thumbnail = store.thumbnail(image.path, image.placeholder)
+            if thumbnail is not None and not thumbnail.placeholder:
+                found += 1
+    return found
+
+
 def show_reference_image(category: str, key: str, caption: str = None) -> None:
     """Display a reference image from the predefined categories.
-    
+
     Args:
         category: The category of the reference image
         key: The key for the specific image within the category
         caption: Optional override caption. If None, uses the key.
     """
+    import streamlit as st
+
     display_caption = caption if caption is not None else key
-    if key in REFERENCE_IMAGES.get(category, {}):
-        st.image(REFERENCE_IMAGES[category][key], caption=display_caption, width=150)
+    thumbnail = get_reference_thumbnail(category, key)
+    if thumbnail is not None:
+        st.image(thumbnail.data, caption=display_caption, width=150)
     else:
         # Use translator for the fallback message
         lang = st.session_state.get('language', 'English') # Get current language
         fallback_caption = get_translation("ref_no_preview", lang).format(key=key)
-        st.caption(fallback_caption) 
\ No newline at end of file
+        st.caption(fallback_caption)
+
+
+def show_reference_sheet(category: str, captions: Sequence[str]) -> None:
+    """Display a category as one sprite sheet with its captions below it.
+
+    Two elements per category instead of one per image. The captions are
+    listed one line per row of the sheet, in the same order as the tiles.
+    Falls back to one image per entry if the sheet cannot be built.
+
+    Args:
+        category: The category of reference images
+        captions: The caption of each entry, in `REFERENCE_IMAGES` order
+    """
+    import streamlit as st
+
+    sheet = get_reference_sheet(category)
+    if sheet is None:
+        for key, caption in zip(REFERENCE_IMAGES.get(category, {}), captions):
+            show_reference_image(category, key, caption)
+        return
+    st.image(sheet.data)
+    rows = [captions[start:start + SHEET_COLUMNS] for start in range(0, len(captions), SHEET_COLUMNS)]
+    st.caption("  \n".join(" · ".join(row) for row in rows))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: build the reference image thumbnails."""
+    parser = argparse.ArgumentParser(description="Build the reference image thumbnails.")
+    parser.add_argument("assets_dir", nargs="?", help="Assets directory (default: $COMIC_PROMPT_ASSETS_PATH or assets)")
+    args = parser.parse_args(argv)
+
+    total = sum(len(images) for images in REFERENCE_IMAGES.values())
+    found = prepare_reference_thumbnails(args.assets_dir)
+    print(f"built {found} of {total} reference thumbnails ({total - found} use placeholders)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""Process-wide objects shared per filesystem location."""
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Generic, TypeVar, Union
+
+T = TypeVar("T")
+
+
+class PathRegistry(Generic[T]):
+    """One shared object per location, for every session in the process.
+
+    Storage indexes, connection pools, locks and writers must be shared by
+    everything using the same file or directory, however the path was
+    spelled, so objects are keyed by the resolved path. Lookups run on
+    every rerun of every Streamlit session, and resolving a path costs a
+    system call per component, so each object is also cached under the
+    path exactly as it was given and later lookups of that spelling are a
+    single dictionary access without the lock. This assumes the process
+    does not change its working directory once relative paths were looked
+    up.
+    """
+
+    def __init__(self):
+        self._objects: Dict[str, T] = {}
+        self._lock = threading.Lock()
+
+    def shared(self, path: Union[str, Path], factory: Callable[[], T]) -> T:
+        """Get the object for a location, creating it on first use.
+
+        Args:
+            path: The file or directory the object belongs to
+            factory: Creates the object; called at most once per location
+
+        Returns:
+            The object shared by every caller for that location
+        """
+        given = os.fspath(path)
+        obj = self._objects.get(given)
+        if obj is None:
+            key = str(Path(given).resolve())
+            with self._lock:
+                obj = self._objects.get(key)
+                if obj is None:
+                    obj = self._objects[key] = factory()
+                self._objects[given] = obj
+        return obj
@@ -0,0 +1,38 @@
+"""Pluggable reporting of recoverable errors.
+
+The core and storage layers do not depend on any UI. Errors they recover
+from (e.g. a prompt file that cannot be loaded) are passed to the current
+reporter, which logs them by default; the Streamlit app installs `st.error`
+so they are shown on the page instead.
+"""
+import logging
+from typing import Callable, Optional
+
+logger = logging.getLogger("comic_prompt_gen")
+
+# Called with a message for every reported error
+ErrorReporter = Callable[[str], None]
+
+
+def log_error(message: str) -> None:
+    """The default reporter: log the message."""
+    logger.error(message)
+
+
+_reporter: ErrorReporter = log_error
+
+
+def set_error_reporter(reporter: Optional[ErrorReporter]) -> None:
+    """Install the function errors are reported to.
+
+    Args:
+        reporter: Called with the message of each reported error, or None to
+            go back to logging
+    """
+    global _reporter
+    _reporter = reporter or log_error
+
+
+def report_error(message: str) -> None:
+    """Report a recoverable error through the installed reporter."""
+    _reporter(message)
@@ -1,5 +1,6 @@
 """Translation utilities for the application."""
-import streamlit as st
+from collections import Counter
+from typing import Optional
 
 # Dictionary for English translations
 en_translations = {
@@ -46,10 +47,7 @@ en_translations = {
 
     # Panel Form
     "panel_header": "Individual Panel Details",
-    "panel_subheader_1": "Panel 1: Top-Left",
-    "panel_subheader_2": "Panel 2: Top-Right",
-    "panel_subheader_3": "Panel 3: Bottom-Left",
-    "panel_subheader_4": "Panel 4: Bottom-Right",
+    "panel_layout": "Page Layout",
     "panel_expander_edit": "Edit Panel {i} Details",
     "panel_purpose": "[{i}] Narrative Purpose",
     "panel_desc": "[{i}] Visual Description",
@@ -107,6 +105,7 @@ en_translations = {
     "prompt_approved_success": "Prompt approved and saved! You can find it in the 'Saved Prompts' section.",
     "prompt_save_success": "Prompt saved successfully with ID: {id}",
     "prompt_save_fail": "Failed to save prompt.",
+    "prompt_form_incomplete": "The form has not finished loading. Please try again.",
     "prompt_load_fail": "Failed to load prompt {id}",
     "prompt_delete_success": "Prompt deleted successfully!",
     "prompt_delete_fail": "Failed to delete prompt.",
@@ -117,6 +116,16 @@ en_translations = {
     "prompt_created_at": "Created: {dt}",
     "prompt_updated_at": "Last Updated: {dt}",
     "prompt_delete_button": "🗑️ Delete",
+    "prompt_search": "Search prompts",
+    "prompt_sort": "Sort by",
+    "prompt_sort_options": ["Newest first", "Oldest first", "Recently updated", "Concept (A-Z)"],
+    "prompt_approved_only": "Approved only",
+    "prompt_page_size": "Per page",
+    "prompt_page": "Page",
+    "prompt_page_info": "Page {page} of {pages} ({total} prompts)",
+    "prompt_select": "Select",
+    "prompt_delete_selected": "🗑️ Delete selected ({count})",
+    "prompt_delete_many_success": "Deleted {count} prompts.",
     
     # Reference Sidebar
     "ref_sidebar_header": "Reference Previews",
@@ -220,10 +229,7 @@ zh_translations = {
 
     # Panel Form
     "panel_header": "单格细节",
-    "panel_subheader_1": "第1格: 左上",
-    "panel_subheader_2": "第2格: 右上",
-    "panel_subheader_3": "第3格: 左下",
-    "panel_subheader_4": "第4格: 右下",
+    "panel_layout": "页面布局",
     "panel_expander_edit": "编辑第 {i} 格细节",
     "panel_purpose": "[{i}] 叙事作用",
     "panel_desc": "[{i}] 画面描述",
@@ -281,6 +287,7 @@ zh_translations = {
     "prompt_approved_success": "提示词已批准并保存！您可以在'已保存提示词'部分找到它。",
     "prompt_save_success": "提示词成功保存，ID: {id}",
     "prompt_save_fail": "保存提示词失败。",
+    "prompt_form_incomplete": "表单尚未加载完成，请重试。",
     "prompt_load_fail": "加载提示词失败 {id}",
     "prompt_delete_success": "提示词删除成功！",
     "prompt_delete_fail": "删除提示词失败。",
@@ -291,6 +298,16 @@ zh_translations = {
     "prompt_created_at": "创建于: {dt}",
     "prompt_updated_at": "最后更新: {dt}",
     "prompt_delete_button": "🗑️ 删除",
+    "prompt_search": "搜索提示词",
+    "prompt_sort": "排序方式",
+    "prompt_sort_options": ["最新优先", "最早优先", "最近更新", "主题 (A-Z)"],
+    "prompt_approved_only": "仅已批准",
+    "prompt_page_size": "每页数量",
+    "prompt_page": "页码",
+    "prompt_page_info": "第 {page} / {pages} 页 (共 {total} 个提示词)",
+    "prompt_select": "选择",
+    "prompt_delete_selected": "🗑️ 删除所选 ({count})",
+    "prompt_delete_many_success": "已删除 {count} 个提示词。",
     
     # Reference Sidebar
     "ref_sidebar_header": "参考预览",
@@ -355,6 +372,53 @@ translations = {
     "中文": zh_translations
 }
 
+# Prefix of the text returned for keys missing from every table
+MISSING_KEY_PREFIX = "MISSING_KEY: "
+
+# Flat per-language tables with the English fallback merged in once
+_merged_translations = {lang: {**en_translations, **table} for lang, table in translations.items()}
+
+# How often each (language, key) pair was looked up without a translation
+missing_keys: Counter = Counter()
+
+
+class Translator:
+    """Translates keys for one language from its precomputed table.
+
+    Instances are shared between reruns and sessions (see `get_translator`),
+    so a lookup is a single dictionary access.
+    """
+
+    __slots__ = ("lang", "table")
+
+    def __init__(self, lang: str):
+        """Create a translator.
+
+        Args:
+            lang: The selected language ('English' or '中文'); unknown
+                languages use English.
+        """
+        self.lang = lang
+        self.table = _merged_translations.get(lang, _merged_translations["English"])
+
+    def __call__(self, key: str) -> str:
+        try:
+            return self.table[key]
+        except KeyError:
+            missing_keys[(self.lang, key)] += 1
+            return f"{MISSING_KEY_PREFIX}{key}"
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """Look up a key that may legitimately be missing, without counting it."""
+        return self.table.get(key, default)
+
+    def __repr__(self) -> str:
+        return f"Translator({self.lang!r})"
+
+
+_translators = {lang: Translator(lang) for lang in translations}
+
+
 def get_translation(key: str, lang: str) -> str:
     """Get the translation for a given key and language.
 
@@ -365,23 +429,27 @@ def get_translation(key: str, lang: str) -> str:
     Returns:
         The translated string, defaulting to English if not found.
     """
-    return translations.get(lang, en_translations).get(key, en_translations.get(key, f"MISSING_KEY: {key}"))
+    return get_translator(lang)(key)
 
-def get_translator(lang: str):
-    """Returns a function that translates based on the given language.
+def get_translator(lang: str) -> Translator:
+    """Returns the translator for the given language.
 
     Args:
         lang: The selected language.
 
     Returns:
-        A function that takes a key and returns the translation.
+        A shared callable that takes a key and returns the translation.
     """
-    def translator(key: str) -> str:
-        return get_translation(key, lang)
+    translator = _translators.get(lang)
+    if translator is None:
+        translator = _translators.setdefault(lang, Translator(lang))
     return translator
 
 # Initialize language in session state if not present
 def initialize_language():
+    # Only the app needs this, so Streamlit is not imported with the tables
+    import streamlit as st
+
     if 'language' not in st.session_state:
         # Attempt to detect browser language (basic approach)
         try:
@@ -0,0 +1,18 @@
+"""Shared fixtures: every test gets its own storage, asset and draft locations."""
+from pathlib import Path
+
+import pytest
+
+from comic_prompt_gen.storage.drafts import DRAFTS_PATH_ENV
+from comic_prompt_gen.storage.prompt_storage import STORAGE_BACKEND_ENV, STORAGE_FSYNC_ENV, STORAGE_PATH_ENV
+from comic_prompt_gen.utils.assets import ASSETS_PATH_ENV
+
+
+@pytest.fixture(autouse=True)
+def isolated_paths(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keep anything the code under test saves out of the working directory."""
+    monkeypatch.setenv(STORAGE_PATH_ENV, str(tmp_path / "prompts"))
+    monkeypatch.setenv(ASSETS_PATH_ENV, str(tmp_path / "assets"))
+    monkeypatch.setenv(DRAFTS_PATH_ENV, str(tmp_path / "drafts"))
+    monkeypatch.delenv(STORAGE_BACKEND_ENV, raising=False)
+    monkeypatch.delenv(STORAGE_FSYNC_ENV, raising=False)
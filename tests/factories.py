@@ -0,0 +1,111 @@
+"""Synthetic ComicPrompt fixtures shared by the tests and benchmarks."""
+from pathlib import Path
+from typing import Iterator, List
+
+from comic_prompt_gen.core.layouts import DEFAULT_LAYOUT, LAYOUTS
+from comic_prompt_gen.core.models import ComicPrompt, Panel, StyleProfile
+
+# The source tree, for scripts run in a fresh interpreter (AppTest, subprocesses)
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+
+_TEXT = {
+    "en": {
+        "concept": "A cat tries to get its owner's attention while they work #{n}",
+        "scene": "Simple home office corner with desk, laptop, chair.",
+        "char": "An orange tabby cat 'Mimi'",
+        "action": "progressively distracting its owner who is using a laptop",
+        "purpose": "Panel {i} narrative beat",
+        "desc": "Mimi does something slightly more disruptive than before (variant {n}).",
+        "text": "Hey!",
+        "title": "Work 'Assistant'",
+    },
+    "zh": {
+        "concept": "一只猫试图在主人工作时引起他们的注意 #{n}",
+        "scene": "简单的家庭办公室角落，有书桌、笔记本电脑、椅子。",
+        "char": "一只名叫'咪咪'的橘色虎斑猫",
+        "action": "逐渐分散正在使用笔记本电脑的主人的注意力",
+        "purpose": "第{i}格叙事节拍",
+        "desc": "咪咪做了比之前更捣乱的事情 (变体 {n})。",
+        "text": "嘿！",
+        "title": "工作'助理'",
+    },
+}
+
+
+def make_prompt(n: int = 0, lang: str = "en", layout: str = DEFAULT_LAYOUT) -> ComicPrompt:
+    """Build a fully populated synthetic prompt.
+
+    Args:
+        n: Variant number, mixed into the text so prompts differ
+        lang: "en" or "zh"
+        layout: Layout key; one panel is built per layout panel
+
+    Returns:
+        A validated ComicPrompt
+    """
+    text = _TEXT[lang]
+    panels = {
+        str(i): Panel(
+            purpose=text["purpose"].format(i=i),
+            desc=text["desc"].format(n=n),
+            comp="Medium shot" if i % 2 else "Close-up",
+            text=text["text"] if i > 1 else "",
+            placement="Speech bubble" if i > 1 else "No text",
+            sfx="tap tap" if i == 1 else "",
+            ref="",
+            transition="",
+        )
+        for i in range(1, LAYOUTS[layout].panel_count + 1)
+    }
+    style = StyleProfile(
+        style_name="Clean Slice-of-Life Anime",
+        char_style="Cute, slightly chibi anthropomorphic cat",
+        char_recurring="Keep Mimi consistent",
+        char_expressions="Expectant -> Pleading -> Bold -> Smug",
+        line_weight="clean, consistent medium line weight.",
+        line_style="digital ink look.",
+        line_color="dark brown",
+        palette_style="Flat Colors",
+        background="light cream simple background per panel",
+        overall_tone="warm and light pastel palette",
+        grid_style=LAYOUTS[layout].grid_style,
+    )
+    return ComicPrompt(
+        core_concept=text["concept"].format(n=n),
+        narrative_arc="Setup -> Rising action -> Climax -> Resolution",
+        overall_scene=text["scene"],
+        comic_title=text["title"] if n % 2 else "",
+        content_summary_char=text["char"],
+        content_summary_action=text["action"],
+        ref_overall_style="Chi's Sweet Home",
+        panels=panels,
+        style=style,
+    )
+
+
+def iter_prompts(count: int) -> Iterator[ComicPrompt]:
+    """Yield `count` synthetic prompts alternating between English and Chinese."""
+    for n in range(count):
+        yield make_prompt(n, "zh" if n % 2 else "en")
+
+
+def edit_sequence(rounds: int, layout: str = DEFAULT_LAYOUT) -> List[ComicPrompt]:
+    """Build a prompt per round, each differing from the last in one field.
+
+    The edits cycle through the last panel's text, a style field and the
+    scene, the way the form is edited between two renders.
+    """
+    prompt = make_prompt(1, "zh", layout)
+    last_panel = LAYOUTS[layout].panel_keys[-1]
+    edits = []
+    for i in range(rounds):
+        kind = i % 3
+        if kind == 0:
+            panel = prompt.panels[last_panel].model_copy(update={"text": f"嘿！#{i}"})
+            prompt = prompt.model_copy(update={"panels": {**prompt.panels, last_panel: panel}})
+        elif kind == 1:
+            prompt = prompt.model_copy(update={"style": prompt.style.model_copy(update={"overall_tone": f"tone {i}"})})
+        else:
+            prompt = prompt.model_copy(update={"overall_scene": f"场景 {i}"})
+        edits.append(prompt)
+    return edits
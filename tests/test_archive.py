@@ -0,0 +1,124 @@
+"""Archive backend: compaction, stored text and recovery after a crash."""
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from comic_prompt_gen.core.models import ComicPrompt
+from comic_prompt_gen.core.prompt_generator import generate_prompt
+from comic_prompt_gen.storage.archive import (
+    _RECORD_HEADER,
+    RECORD_PUT,
+    RENDERER_KEY,
+    SEGMENT_MAGIC,
+    ArchiveError,
+    ArchivePromptStorage,
+    SegmentArchive,
+)
+
+from .factories import iter_prompts
+
+
+def test_compact_keeps_latest_records(tmp_path: Path) -> None:
+    storage = ArchivePromptStorage(str(tmp_path))
+    prompts = list(iter_prompts(10))
+    for prompt in prompts:
+        storage.save_prompt(prompt)
+    for prompt in prompts[:5]:
+        prompt.core_concept += " (edited)"
+        storage.save_prompt(prompt)
+    storage.delete_prompts([prompt.id for prompt in prompts[5:8]])
+
+    archive = storage.archive
+    before = archive.stats()
+    assert before["dead_bytes"] > 0
+    reclaimed = archive.compact()
+
+    after = archive.stats()
+    assert reclaimed == before["segment_bytes"] - after["segment_bytes"] > 0
+    assert after == {"prompts": 7, "segment_bytes": tmp_path.joinpath("prompts.seg").stat().st_size, "dead_bytes": 0}
+    live = prompts[:5] + prompts[8:]
+    assert {meta["id"] for meta in storage.list_prompts()} == {prompt.id for prompt in live}
+    for prompt in live:
+        assert storage.load_prompt(prompt.id).core_concept == prompt.core_concept
+
+    # The compacted segment and its sidecar index open again
+    reopened = SegmentArchive(tmp_path)
+    assert reopened.stats() == after
+    assert reopened.get(prompts[0].id)["core_concept"].endswith("(edited)")
+
+
+def test_approved_text_is_stored(tmp_path: Path) -> None:
+    """Approved text is stored as written; other text only with the renderer version."""
+    storage = ArchivePromptStorage(str(tmp_path))
+    draft, approved = iter_prompts(2)
+    for prompt in (draft, approved):
+        prompt.generated_prompt = generate_prompt(prompt)
+    approved.is_approved = True
+    approved.generated_prompt += "\nEdited by hand."
+    storage.save_prompt(draft)
+    storage.save_prompt(approved)
+
+    data = storage.archive.get(draft.id)
+    assert "generated_prompt" not in data and RENDERER_KEY in data
+    assert storage.archive.get(approved.id)["generated_prompt"] == approved.generated_prompt
+    assert storage.load_prompt(draft.id).generated_prompt == draft.generated_prompt
+    assert storage.load_prompt(approved.id).generated_prompt == approved.generated_prompt
+
+
+def _numbered_prompts(count: int) -> List[ComicPrompt]:
+    prompts = list(iter_prompts(count))
+    for n, prompt in enumerate(prompts):
+        prompt.id = f"prompt-{n}"
+    return prompts
+
+
+def test_torn_tail_is_truncated(tmp_path: Path) -> None:
+    *prompts, torn = _numbered_prompts(4)
+    archive = SegmentArchive(tmp_path / "archive")
+    for prompt in prompts:
+        archive.put(prompt)
+    segment = archive.segment_path
+    size = segment.stat().st_size
+
+    # A write cut short halfway through the record of a fourth prompt
+    scratch = SegmentArchive(tmp_path / "scratch")
+    scratch.put(torn)
+    record = scratch.segment_path.read_bytes()[len(SEGMENT_MAGIC):]
+    with open(segment, "ab") as f:
+        f.write(record[: len(record) // 2])
+
+    reopened = SegmentArchive(tmp_path / "archive")
+    assert segment.stat().st_size == size
+    assert {meta["id"] for meta in reopened.metadata()} == {prompt.id for prompt in prompts}
+    reopened.put(torn)
+    reopened.flush()
+    assert SegmentArchive(tmp_path / "archive").get(torn.id)["core_concept"] == torn.core_concept
+
+
+def test_zero_filled_tail_is_truncated(tmp_path: Path) -> None:
+    """A full-length record whose payload never reached the disk does not stop the archive opening."""
+    prompts = _numbered_prompts(3)
+    archive = SegmentArchive(tmp_path)
+    for prompt in prompts:
+        archive.put(prompt)
+    size = archive.segment_path.stat().st_size
+    with open(archive.segment_path, "ab") as f:
+        f.write(_RECORD_HEADER.pack(RECORD_PUT, 200, 0x12345678) + bytes(200))
+
+    reopened = SegmentArchive(tmp_path)
+    assert archive.segment_path.stat().st_size == size
+    assert {meta["id"] for meta in reopened.metadata()} == {prompt.id for prompt in prompts}
+
+
+def test_corrupt_record_before_the_tail_raises(tmp_path: Path) -> None:
+    archive = SegmentArchive(tmp_path)
+    for prompt in _numbered_prompts(2):
+        archive.put(prompt)
+    archive.index_path.unlink(missing_ok=True)
+    with open(archive.segment_path, "r+b") as f:
+        f.seek(len(SEGMENT_MAGIC) + _RECORD_HEADER.size)
+        f.write(b"\xff" * 4)
+
+    with pytest.raises(ArchiveError):
+        SegmentArchive(tmp_path)
@@ -0,0 +1,55 @@
+"""Draft journals: coalesced writes, torn lines and discarding."""
+from pathlib import Path
+
+from comic_prompt_gen.storage.drafts import COMPACT_AFTER, DraftStore, DraftWriter, new_draft_id
+
+
+def test_writer_coalesces_updates(tmp_path: Path) -> None:
+    store = DraftStore(str(tmp_path))
+    writer = DraftWriter(store, interval=60.0)
+    draft_id = new_draft_id()
+    text = ""
+    for char in "abcdefghij":
+        text += char
+        writer.update(draft_id, {"p1_desc": text})
+    writer.update(draft_id, {"line_color": "red"})
+    writer.close()
+
+    assert store.load(draft_id) == {"p1_desc": "abcdefghij", "line_color": "red"}
+    assert writer.writes <= 2
+
+
+def test_torn_line_is_skipped(tmp_path: Path) -> None:
+    store = DraftStore(str(tmp_path))
+    draft_id = new_draft_id()
+    store.append(draft_id, {"p1_desc": "kept"})
+    with open(tmp_path / f"{draft_id}.jsonl", "ab") as f:
+        f.write(b'{"p1_desc": "cut sh')
+
+    reopened = DraftStore(str(tmp_path))
+    assert reopened.load(draft_id) == {"p1_desc": "kept"}
+    reopened.append(draft_id, {"line_color": "red"})
+    assert DraftStore(str(tmp_path)).load(draft_id) == {"p1_desc": "kept", "line_color": "red"}
+
+
+def test_long_journal_is_compacted(tmp_path: Path) -> None:
+    store = DraftStore(str(tmp_path))
+    draft_id = new_draft_id()
+    for i in range(COMPACT_AFTER):
+        store.append(draft_id, {"p1_desc": str(i)})
+
+    assert (tmp_path / f"{draft_id}.jsonl").read_text(encoding="utf-8").count("\n") == 1
+    assert store.load(draft_id) == {"p1_desc": str(COMPACT_AFTER - 1)}
+
+
+def test_discard_drops_pending_changes(tmp_path: Path) -> None:
+    store = DraftStore(str(tmp_path))
+    writer = DraftWriter(store, interval=60.0)
+    draft_id = new_draft_id()
+    writer.update(draft_id, {"p1_desc": "first"})
+    writer.update(draft_id, {"p1_desc": "second"})
+    writer.discard(draft_id)
+    writer.close()
+
+    assert store.load(draft_id) == {}
+    assert not (tmp_path / f"{draft_id}.jsonl").exists()
@@ -0,0 +1,33 @@
+"""Core, storage, the CLI and the server stay importable without Streamlit."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from .factories import SRC_DIR
+
+# Modules that must stay importable without Streamlit
+HEADLESS_MODULES = (
+    "comic_prompt_gen.core.render_cache",
+    "comic_prompt_gen.storage.prompt_storage",
+    "comic_prompt_gen.storage.sqlite_storage",
+    "comic_prompt_gen.storage.archive",
+    "comic_prompt_gen.storage.async_storage",
+    "comic_prompt_gen.utils.translations",
+    "comic_prompt_gen.utils.reference_images",
+    "comic_prompt_gen.cli",
+    "comic_prompt_gen.server",
+)
+
+
+@pytest.mark.parametrize("module", HEADLESS_MODULES)
+def test_does_not_import_streamlit(module: str) -> None:
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys, {module}; print('streamlit' in sys.modules)"],
+        env=dict(os.environ, PYTHONPATH=str(SRC_DIR)),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,72 @@
+"""Prompt rendering: compiled templates, incremental renders, sweeps and compact prompts."""
+from itertools import islice
+
+import pytest
+
+from comic_prompt_gen.core.compact import render_compact
+from comic_prompt_gen.core.layouts import DEFAULT_LAYOUT, LAYOUTS
+from comic_prompt_gen.core.prompt_generator import IncrementalRenderer, generate_prompt
+from comic_prompt_gen.core.variants import PromptSweep
+
+from .baselines import legacy_generate_prompt
+from .factories import edit_sequence, make_prompt
+
+
+@pytest.mark.parametrize("lang", ["en", "zh"])
+def test_generate_prompt_matches_baseline(lang: str) -> None:
+    for n in range(64):
+        prompt = make_prompt(n, lang)
+        assert generate_prompt(prompt).encode("utf-8") == legacy_generate_prompt(prompt).encode("utf-8")
+
+
+def test_generate_prompt_matches_baseline_with_empty_fields() -> None:
+    prompt = make_prompt(2)
+    prompt.comic_title = prompt.narrative_arc = prompt.reader_feeling = None
+    prompt.panels["3"].text = ""
+    assert generate_prompt(prompt) == legacy_generate_prompt(prompt)
+
+
+@pytest.mark.parametrize("layout", sorted(LAYOUTS))
+def test_every_layout_renders_each_panel(layout: str) -> None:
+    prompt = make_prompt(1, "en", layout)
+    for key, panel in prompt.panels.items():
+        panel.desc = f"unique description {key}"
+    text = generate_prompt(prompt)
+    for key in LAYOUTS[layout].panel_keys:
+        assert text.count(f"unique description {key}\n") == 1
+
+
+@pytest.mark.parametrize("layout", sorted(LAYOUTS))
+def test_incremental_renderer_matches_full_render(layout: str) -> None:
+    renderer = IncrementalRenderer()
+    edits = edit_sequence(30, layout)
+    assert [renderer.render(prompt) for prompt in edits] == [generate_prompt(prompt) for prompt in edits]
+    # Each edit touches one section; the first render builds all of them
+    sections = (renderer.rendered + renderer.reused) // len(edits)
+    assert renderer.rendered == sections + len(edits) - 1
+
+
+def test_sweep_matches_generate_prompt() -> None:
+    sweep = PromptSweep(make_prompt(1, "zh"), {
+        "style.palette_style": ["Flat Colors", "Watercolor"],
+        "panels.1.comp": ["Close-up", "Long shot"],
+        "reader_feeling": ["amused", "touched", "surprised"],
+    })
+    assert len(sweep) == 12
+    variants = list(sweep)
+    assert len({variant.prompt for variant in variants}) == 12
+    for variant in variants + list(islice(sweep.sample(5, seed=0), 5)):
+        assert variant.prompt == generate_prompt(sweep.prompt_for(variant.values))
+
+
+@pytest.mark.parametrize("lang", ["en", "zh"])
+def test_compact_prompt_fits_budget(lang: str) -> None:
+    prompt = make_prompt(1, lang, DEFAULT_LAYOUT)
+    full = render_compact(prompt)
+    assert full.tokens < full.full_tokens
+    assert full.trimmed == ()
+
+    trimmed = render_compact(prompt, full.tokens - 20)
+    assert trimmed.trimmed
+    assert trimmed.tokens <= full.tokens - 20 or trimmed.over_budget
+    assert render_compact(prompt, 1).over_budget
@@ -0,0 +1,39 @@
+"""One shared object per location, however its path is spelled."""
+import threading
+from pathlib import Path
+
+import pytest
+
+from comic_prompt_gen.utils.registry import PathRegistry
+
+
+def test_spellings_of_one_location_share_an_object(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "prompts").mkdir()
+    monkeypatch.chdir(tmp_path)
+    registry: PathRegistry[object] = PathRegistry()
+    shared = registry.shared(tmp_path / "prompts", object)
+    assert registry.shared("prompts", object) is shared
+    assert registry.shared("./prompts/", object) is shared
+    assert registry.shared(str(tmp_path / "prompts" / ".." / "prompts"), object) is shared
+    assert registry.shared(tmp_path / "other", object) is not shared
+
+
+def test_factory_runs_once_under_contention(tmp_path: Path) -> None:
+    registry: PathRegistry[object] = PathRegistry()
+    created = []
+    start = threading.Barrier(8)
+
+    def factory() -> object:
+        created.append(object())
+        return created[-1]
+
+    def lookup() -> None:
+        start.wait()
+        registry.shared(tmp_path, factory)
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1
@@ -0,0 +1,129 @@
+"""Full-text search: tokenizing, BM25 ranking and the persisted index."""
+from pathlib import Path
+from typing import Iterable, Optional
+
+import pytest
+
+from comic_prompt_gen.core.models import ComicPrompt
+from comic_prompt_gen.storage.prompt_index import extract_metadata
+from comic_prompt_gen.storage.prompt_storage import create_storage
+from comic_prompt_gen.storage.search_index import (
+    PANEL_FIELD_WEIGHTS,
+    PROMPT_FIELD_WEIGHTS,
+    SearchIndex,
+    prompt_terms,
+    tokenize,
+)
+
+from .factories import iter_prompts, make_prompt
+from .test_storage import BACKENDS
+
+
+def _index(prompts: Iterable[ComicPrompt], path: Optional[Path] = None) -> SearchIndex:
+    index = SearchIndex(path)
+    for prompt in prompts:
+        index.add(prompt, extract_metadata(prompt.model_dump()))
+    return index
+
+
+def _prompt(prompt_id: str, concept: str, desc: str = "") -> ComicPrompt:
+    prompt = make_prompt(0, "zh")
+    prompt.id = prompt_id
+    prompt.core_concept = concept
+    prompt.comic_title = prompt.overall_scene = prompt.content_summary_char = prompt.content_summary_action = ""
+    for panel in prompt.panels.values():
+        panel.desc = panel.text = ""
+    prompt.panels["1"].desc = desc
+    return prompt
+
+
+def test_tokenize_cjk_bigrams() -> None:
+    assert tokenize("猫咪打扰 Mimi's laptop") == ["猫咪", "咪打", "打扰", "mimi", "s", "laptop"]
+    assert tokenize("猫") == ["猫"]
+    assert tokenize("一只猫，主人") == ["一只", "只猫", "主人"]
+
+
+def test_cjk_query_ranking() -> None:
+    index = _index([
+        _prompt("desc", "一个普通的早晨", desc="猫咪打扰主人工作"),
+        _prompt("concept", "猫咪打扰主人工作"),
+        _prompt("partial", "猫咪睡觉", desc="主人工作"),
+        _prompt("other", "狗狗散步"),
+    ])
+
+    # A match in the core concept outweighs the same match in a panel
+    assert [prompt_id for prompt_id, _ in index.search("猫咪打扰")] == ["concept", "desc"]
+    # Every bigram of the query has to match, wherever it is found
+    assert {prompt_id for prompt_id, _ in index.search("猫咪 主人")} == {"concept", "desc", "partial"}
+    assert index.search("猫咪散步") == []
+    # Rarer terms score higher: the only prompt with "睡觉" leads
+    assert index.search("猫咪睡觉")[0][0] == "partial"
+    assert index.search("猫咪", limit=1) == index.search("猫咪")[:1]
+
+
+def test_single_cjk_character_matches_bigrams() -> None:
+    index = _index([_prompt("cat", "一只猫"), _prompt("dog", "一只狗")])
+    assert [prompt_id for prompt_id, _ in index.search("猫")] == ["cat"]
+    assert {prompt_id for prompt_id, _ in index.search("一只")} == {"cat", "dog"}
+
+
+def test_blank_prompt_indexed_first() -> None:
+    """A prompt without any indexable text can be indexed first (it used to divide by zero)."""
+    prompt = make_prompt(1)
+    prompt.id = "blank"
+    for name in PROMPT_FIELD_WEIGHTS:
+        setattr(prompt, name, "")
+    for panel in prompt.panels.values():
+        for name in PANEL_FIELD_WEIGHTS:
+            setattr(panel, name, "")
+    assert not prompt_terms(prompt)
+    other = make_prompt(1)
+    other.id = "other"
+
+    index = _index([prompt, other])
+    assert [prompt_id for prompt_id, _ in index.search("tabby")] == ["other"]
+
+
+def test_removed_prompts_are_not_found(tmp_path: Path) -> None:
+    prompts = list(iter_prompts(6))
+    for n, prompt in enumerate(prompts):
+        prompt.id = f"prompt-{n}"
+    index = _index(prompts, tmp_path / "search.idx")
+    index.remove_many(["prompt-1", "prompt-2"])
+
+    assert {prompt_id for prompt_id, _ in index.search("猫")} == {"prompt-3", "prompt-5"}
+    index._persist()
+    reloaded = SearchIndex(index.path)
+    assert reloaded.search("猫") == index.search("猫")
+    assert reloaded.search("tabby laptop") == index.search("tabby laptop")
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_storage_search(backend: str, tmp_path: Path) -> None:
+    storage = create_storage(backend, str(tmp_path / backend))
+    english, chinese = iter_prompts(2)
+    chinese.is_approved = True
+    storage.save_prompt(english)
+    storage.save_prompt(chinese)
+
+    assert [meta["id"] for meta in storage.search_prompts("咪咪")] == [chinese.id]
+    assert [meta["id"] for meta in storage.search_prompts("tabby", approved=False)] == [english.id]
+    assert storage.search_prompts("tabby", approved=True) == []
+    storage.delete_prompt(chinese.id)
+    assert storage.search_prompts("咪咪") == []
+
+
+def test_persisting_the_index_does_not_rescan_the_prompt_directory(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    storage = create_storage("json", str(tmp_path))
+    storage.save_prompt(make_prompt(0))
+    storage.list_prompts()
+    scans = []
+    monkeypatch.setattr(storage.index, "_scan", lambda: scans.append(1))
+
+    storage.save_prompt(make_prompt(1, "zh"))
+    assert storage.search_prompts("咪咪")
+    assert storage.search_index.path.parent == tmp_path
+    storage.index.refresh()
+    assert scans == []
@@ -0,0 +1,117 @@
+"""HTTP API: requests served over a real socket, and the 4xx answers to bad ones."""
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import pytest
+
+from comic_prompt_gen.server import MAX_BODY_SIZE, PromptServer
+from comic_prompt_gen.storage.async_storage import AsyncPromptStorage
+from comic_prompt_gen.storage.prompt_storage import PromptStorage
+
+from .factories import make_prompt
+
+# (status, headers, decoded JSON body or None)
+Reply = Tuple[int, Dict[str, str], Any]
+Exchange = Callable[..., List[Reply]]
+
+
+def http_request(method: str, path: str, body: bytes = b"", **headers: str) -> bytes:
+    """Encode a request; header names are given with "_" for "-"."""
+    headers.setdefault("Content_Length", str(len(body)))
+    head = f"{method} {path} HTTP/1.1\r\nHost: test\r\n"
+    head += "".join(f"{name.replace('_', '-')}: {value}\r\n" for name, value in headers.items())
+    return head.encode("latin-1") + b"\r\n" + body
+
+
+async def _read_reply(reader: asyncio.StreamReader) -> Reply:
+    status_line, *lines = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").strip().split("\r\n")
+    headers = {name.lower(): value.strip() for name, _, value in (line.partition(":") for line in lines)}
+    body = await reader.readexactly(int(headers["content-length"]))
+    return int(status_line.split(" ")[1]), headers, json.loads(body) if body else None
+
+
+@pytest.fixture
+def exchange(tmp_path: Path) -> Exchange:
+    """Send raw requests on one connection to a fresh server and collect the replies."""
+    def run(*requests: bytes) -> List[Reply]:
+        async def main() -> List[Reply]:
+            async with AsyncPromptStorage(PromptStorage(str(tmp_path / "prompts"))) as storage:
+                server = await asyncio.start_server(PromptServer(storage).handle_connection, "127.0.0.1", 0)
+                async with server:
+                    reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+                    replies = []
+                    for request in requests:
+                        writer.write(request)
+                        replies.append(await _read_reply(reader))
+                    writer.close()
+                    return replies
+
+        return asyncio.run(main())
+
+    return run
+
+
+def _spec() -> bytes:
+    return json.dumps(make_prompt(1).model_dump(mode="json")).encode("utf-8")
+
+
+def test_save_load_and_delete(exchange: Exchange) -> None:
+    created, listed, loaded, deleted, missing = exchange(
+        http_request("PUT", "/prompts/first", _spec()),
+        http_request("GET", "/prompts?limit=10"),
+        http_request("GET", "/prompts/first"),
+        http_request("DELETE", "/prompts/first"),
+        http_request("GET", "/prompts/first"),
+    )
+    assert created[0] == 200 and created[2]["id"] == "first" and created[2]["generated_prompt"]
+    assert listed[0] == 200 and listed[2]["total"] == 1 and listed[2]["items"][0]["id"] == "first"
+    assert loaded[0] == 200 and loaded[2]["core_concept"] == make_prompt(1).core_concept
+    assert deleted[0] == 204 and deleted[2] is None
+    assert missing[0] == 404
+    # One connection served every request
+    assert all(headers["connection"] == "keep-alive" for _, headers, _ in (created, listed, loaded, deleted, missing))
+
+
+@pytest.mark.parametrize(("request_bytes", "status"), [
+    (http_request("POST", "/generate", b"{not json"), 400),
+    (http_request("POST", "/generate", b'{"panels": "none"}'), 422),
+    (http_request("POST", "/prompts", json.dumps({**json.loads(_spec()), "id": "../x"}).encode("utf-8")), 422),
+    (http_request("GET", "/prompts/bad%20id"), 400),
+    (http_request("DELETE", "/prompts/missing"), 404),
+    (http_request("GET", "/prompts?limit=-1"), 400),
+    (http_request("GET", "/prompts?sort=size"), 400),
+    (http_request("GET", "/prompts?approved=maybe"), 400),
+    (http_request("GET", "/prompts/search?q=%20"), 400),
+    (http_request("GET", "/nowhere"), 404),
+    (http_request("DELETE", "/generate"), 405),
+])
+def test_bad_requests_keep_the_connection(exchange: Exchange, request_bytes: bytes, status: int) -> None:
+    (reply_status, headers, body), (after, _, _) = exchange(request_bytes, http_request("GET", "/prompts"))
+    assert reply_status == status
+    assert body["error"]
+    assert headers["connection"] == "keep-alive"
+    assert after == 200
+
+
+@pytest.mark.parametrize(("request_bytes", "status"), [
+    (http_request("POST", "/generate", Content_Length="-5"), 400),
+    (http_request("POST", "/generate", Content_Length="many"), 400),
+    (http_request("POST", "/generate", Content_Length=str(MAX_BODY_SIZE + 1)), 413),
+    (http_request("POST", "/generate", Transfer_Encoding="chunked"), 411),
+    (b"GET /prompts\r\n\r\n", 400),
+    (b"GET /prompts HTTP/2.0\r\n\r\n", 505),
+])
+def test_unreadable_requests_close_the_connection(exchange: Exchange, request_bytes: bytes, status: int) -> None:
+    [(reply_status, headers, body)] = exchange(request_bytes)
+    assert reply_status == status
+    assert body["error"]
+    assert headers["connection"] == "close"
+
+
+def test_generate(exchange: Exchange) -> None:
+    [(status, _, body)] = exchange(http_request("POST", "/generate?token_budget=300", _spec()))
+    assert status == 200
+    assert body["compact"]["token_budget"] == 300
+    assert body["generated_prompt"]
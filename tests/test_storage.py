@@ -0,0 +1,120 @@
+"""Round-trips, listing pages and bulk deletes on every storage backend."""
+from pathlib import Path
+
+import pytest
+
+from comic_prompt_gen.core.models import PromptRecord
+from comic_prompt_gen.storage.base import PromptStore
+from comic_prompt_gen.storage.prompt_storage import _DEFAULT_PATHS, PromptStorage, create_storage
+
+from .factories import iter_prompts, make_prompt
+
+BACKENDS = sorted(_DEFAULT_PATHS)
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request: pytest.FixtureRequest) -> str:
+    return request.param
+
+
+@pytest.fixture
+def storage(backend: str, tmp_path: Path) -> PromptStore:
+    return create_storage(backend, str(tmp_path / backend))
+
+
+def test_save_and_load_round_trip(storage: PromptStore) -> None:
+    prompt = make_prompt(1, "zh")
+    prompt.generated_prompt = "rendered"
+    prompt.is_approved = True
+    prompt_id = storage.save_prompt(prompt)
+
+    assert prompt.id == prompt_id
+    loaded = storage.load_prompt(prompt_id)
+    assert loaded.model_dump() == prompt.model_dump()
+    assert storage.load_prompt(prompt_id, trusted=True).model_dump() == prompt.model_dump()
+
+
+def test_save_replaces_prompt_with_same_id(storage: PromptStore) -> None:
+    prompt = make_prompt(1)
+    prompt_id = storage.save_prompt(prompt)
+    prompt.core_concept = "Edited concept"
+    assert storage.save_prompt(prompt) == prompt_id
+
+    assert storage.load_prompt(prompt_id).core_concept == "Edited concept"
+    assert [meta["core_concept"] for meta in storage.list_prompts()] == ["Edited concept"]
+
+
+def test_load_missing_or_invalid_id(storage: PromptStore) -> None:
+    assert storage.load_prompt("missing") is None
+    assert storage.load_prompt("../outside") is None
+
+
+def test_list_prompts_metadata(storage: PromptStore) -> None:
+    ids = [storage.save_prompt(prompt) for prompt in iter_prompts(3)]
+
+    listing = storage.list_prompts()
+    assert {meta["id"] for meta in listing} == set(ids)
+    assert set(listing[0]) == {"id", "core_concept", "created_at", "updated_at", "is_approved"}
+    record = PromptRecord.from_metadata(listing[0])
+    assert record.id == listing[0]["id"]
+
+
+def test_delete_prompt(storage: PromptStore) -> None:
+    keep, drop = (storage.save_prompt(prompt) for prompt in iter_prompts(2))
+
+    assert storage.delete_prompt(drop)
+    assert not storage.delete_prompt(drop)
+    assert storage.load_prompt(drop) is None
+    assert [meta["id"] for meta in storage.list_prompts()] == [keep]
+    assert storage.count_prompts() == 1
+
+
+def test_pagination(storage: PromptStore) -> None:
+    prompts = list(iter_prompts(25))
+    for n, prompt in enumerate(prompts):
+        prompt.core_concept = f"concept {n:02d}"
+        prompt.is_approved = n % 5 == 0
+        storage.save_prompt(prompt)
+
+    pages = [storage.list_prompts(offset, 10, sort="core_concept", descending=False) for offset in (0, 10, 20)]
+    assert [len(page) for page in pages] == [10, 10, 5]
+    concepts = [meta["core_concept"] for page in pages for meta in page]
+    assert concepts == [f"concept {n:02d}" for n in range(25)]
+    assert storage.list_prompts(30, 10) == []
+
+    newest = storage.list_prompts(0, 3, sort="core_concept", descending=True)
+    assert [meta["core_concept"] for meta in newest] == ["concept 24", "concept 23", "concept 22"]
+
+    assert storage.count_prompts() == 25
+    assert storage.count_prompts(approved=True) == 5
+    approved = storage.list_prompts(0, 2, sort="core_concept", descending=False, approved=True)
+    assert [meta["core_concept"] for meta in approved] == ["concept 00", "concept 05"]
+    assert storage.count_prompts(query="concept 1") == 10
+    assert len(storage.list_prompts(0, None, query="concept 1")) == 10
+
+
+def test_bulk_delete(storage: PromptStore) -> None:
+    ids = [storage.save_prompt(prompt) for prompt in iter_prompts(10)]
+
+    assert storage.delete_prompts(ids[:4] + ["missing", "../outside"]) == 4
+    assert storage.count_prompts() == 6
+    assert {meta["id"] for meta in storage.list_prompts()} == set(ids[4:])
+    assert all(storage.load_prompt(prompt_id) is None for prompt_id in ids[:4])
+    assert storage.delete_prompts([]) == 0
+
+
+def test_reopen_sees_saved_prompts(storage: PromptStore, backend: str, tmp_path: Path) -> None:
+    ids = {storage.save_prompt(prompt) for prompt in iter_prompts(5)}
+
+    reopened = create_storage(backend, str(tmp_path / backend))
+    assert {meta["id"] for meta in reopened.list_prompts()} == ids
+
+
+def test_json_listing_picks_up_outside_changes(tmp_path: Path) -> None:
+    storage = PromptStorage(str(tmp_path))
+    ids = [storage.save_prompt(prompt) for prompt in iter_prompts(3)]
+
+    (tmp_path / f"{ids[0]}.json").unlink()
+    (tmp_path / "broken.json").write_text("{", encoding="utf-8")
+    storage.index.refresh(force=True)
+    assert {meta["id"] for meta in storage.list_prompts()} == set(ids[1:])
@@ -0,0 +1,22 @@
+"""Translator lookups against the original nested fallback chain."""
+import pytest
+
+from comic_prompt_gen.utils.translations import MISSING_KEY_PREFIX, en_translations, get_translator, translations
+
+from .baselines import legacy_get_translator
+
+
+@pytest.mark.parametrize("lang", [*translations, "Klingon"])
+def test_translator_matches_baseline(lang: str) -> None:
+    legacy, current = legacy_get_translator(lang), get_translator(lang)
+    for key in en_translations:
+        assert current(key) == legacy(key)
+
+
+def test_translators_are_shared() -> None:
+    assert get_translator("中文") is get_translator("中文")
+
+
+def test_missing_key() -> None:
+    assert get_translator("English")("no_such_key") == f"{MISSING_KEY_PREFIX}no_such_key"
+    assert get_translator("English").get("no_such_key") is None